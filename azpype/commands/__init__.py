@@ -1,2 +1,39 @@
-from .copy import *
-#from .sync import *
\ No newline at end of file
+# Commands are imported on first attribute access so that importing the package
+# does not pull in every command module and its dependencies up front.
+import importlib
+
+_EXPORTS = {
+    'BaseCommand': '.base_command',
+    'Copy': '.copy',
+    'AsyncCopy': '.copy',
+    'Jobs': '.jobs',
+    'AsyncJobs': '.jobs',
+    'AzCopyStdoutParser': '.stdout_parser',
+    'AzCopyJsonParser': '.stdout_parser',
+    'ProgressSnapshot': '.stdout_parser',
+    'TransferBatch': '.batch',
+    'BatchResult': '.batch',
+    'Sync': '.sync',
+    'AsyncSync': '.sync',
+    'TransferCommand': '.transfer_command',
+    'Bench': '.bench',
+    'List': '.listing',
+    'BlobEntry': '.listing',
+    'Remove': '.remove',
+    'AsyncRemove': '.remove',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,38 +1,53 @@
 import os
-import yaml
 import json
+import re
 import subprocess
+from collections import deque
 from pathlib import Path
 from abc import ABC, abstractmethod
-from rich.console import Console
-from rich.panel import Panel
-from rich.syntax import Syntax
 from azpype.retry import RetryPolicy
-from azpype.resource_paths import get_azcopy_path, ensure_user_config
-from azpype.logging_config import AzpypeLogger
-from azpype.validators import validate_azcopy_envs, validate_login_type, validate_network_available
+from azpype.config import load_profile, resolve_flags, template_flags
+from azpype.resource_paths import get_azcopy_path
+from azpype.logging_config import AzpypeLogger, OutputBatch, output_section
+from azpype.prechecks import run_prechecks
+from azpype.metrics import PhaseTimings
+from azpype.sinks import resolve_sink
+
+# Number of trailing output lines kept in memory when streaming a command
+DEFAULT_TAIL_LINES = 200
+# Longest line kept whole when streaming; longer output is passed on in pieces of this size
+STREAM_LINE_LIMIT = 1024 * 1024
+# Bytes read at a time from an asyncio subprocess pipe
+STREAM_CHUNK = 64 * 1024
+_LINE_BREAK = re.compile(r'\r\n|\r|\n')
 
 
 class BaseCommand(ABC):
-    def __init__(self, command_name: str, retry_policy=None):
+    # Render the resolved configuration flags as a table when building them
+    show_config = True
+    # Take from a profile only the flags declared in this command's config template
+    profile_flags_from_template = False
+
+    def __init__(self, command_name: str, retry_policy=None, profile: str = None, output=None):
         self.command_name = command_name
+        # Where the command's configuration, output and result are shown (see azpype.sinks)
+        self.output = resolve_sink(output)
+        # Seconds spent per phase (config, prechecks, render, spawn, transfer, parse, logging)
+        self.timings = PhaseTimings()
         self.retry_policy = retry_policy or RetryPolicy()
         self.azcopy_path = get_azcopy_path()
         self.logger = AzpypeLogger(command_name).get_logger()
+        # Environment variables set only for this command's azcopy process
+        self.env = {}
+        # Named tuning profile from ~/.azpype/profiles.yaml (falls back to AZPYPE_PROFILE)
+        with self.timings.phase('config'):
+            self.profile = load_profile(profile, self.logger)
+        if self.profile is not None:
+            self.env.update(self.profile.env)
 
 
     def build_flags(self, options: dict):
-        config = {}
-        config_path = ensure_user_config()
-        with open(config_path, 'r') as f:
-            try:
-                config = yaml.safe_load(f)
-            except yaml.YAMLError as exc:
-                self.logger.info(exc)
-
-        # Delete keys with value of NULL or None
-        config = {k: v for k, v in config.items() if v not in ['NULL', None]}
-            
+        filtered_options = None
         if options is not None:
             # Convert underscores to hyphens for CLI compatibility and filter None values
             filtered_options = {
@@ -40,29 +55,19 @@ class BaseCommand(ABC):
                 for k, v in options.items() 
                 if v is not None
             }
-            config.update(filtered_options)
+
+        # Command template, then profile, then explicit options
+        with self.timings.phase('config'):
+            accepted = template_flags(self.command_name) if self.profile_flags_from_template else None
+            config = resolve_flags(self.command_name, self.profile, filtered_options, self.logger, accepted)
         
         # Log detailed config to file only (suppress console output since we have Rich table)
         # We'll skip the logger.info() call here to avoid duplication
         
         # Show pretty config on console if there are any flags
-        if config:
-            console = Console()
-            from rich.table import Table
-            
-            # Calculate sensible width for config table
-            max_flag_length = max(len(f"--{key}") for key in config.keys()) if config else 15
-            max_value_length = max(len(str(value)) for value in config.values()) if config else 15
-            table_width = min(80, max(40, max_flag_length + max_value_length + 10))
-            
-            table = Table(title="🏁 Configuration Flags", title_style="blue", width=table_width)
-            table.add_column("Flag", style="cyan", min_width=15)
-            table.add_column("Value", style="magenta")
-            
-            for key, value in config.items():
-                table.add_row(f"--{key}", str(value))
-            
-            console.print(table)
+        if config and self.show_config:
+            with self.timings.phase('render'):
+                self.output.config(self, config)
         
         return config
 
@@ -70,11 +75,12 @@ class BaseCommand(ABC):
     def run_prechecks(self):
         """
         Run prechecks to ensure that the command can be executed.
+
+        Results are shared process-wide for the TTL of ``azpype.prechecks.precheck_cache``;
+        probes are registered with ``azpype.prechecks.register_probe``.
         """
-        envs_exist = validate_azcopy_envs(['AZCOPY_SPA_CLIENT_SECRET', 'AZCOPY_SPA_APPLICATION_ID', 'AZCOPY_TENANT_ID', 'AZCOPY_AUTO_LOGIN_TYPE'], self.logger)
-        login_spn = validate_login_type(self.logger)
-        network_available = validate_network_available(self.logger)
-        return all ([envs_exist, login_spn, network_available])
+        with self.timings.phase('prechecks'):
+            return all(run_prechecks(self.logger).values())
 
 
     def build_command(self, args: list, options: dict):
@@ -101,6 +107,12 @@ class BaseCommand(ABC):
                 cmd_parts.append(f"--{option}={value}")
         return cmd_parts
 
+    def _process_env(self):
+        """Environment for the azcopy process, or None to inherit ours unchanged."""
+        if not self.env:
+            return None
+        return {**os.environ, **{k: str(v) for k, v in self.env.items()}}
+
     def _format_command_readable(self, args: list, options: dict) -> str:
         """Format command in a readable multi-line format."""
         lines = ["azcopy " + self.command_name + " \\"]
@@ -127,6 +139,203 @@ class BaseCommand(ABC):
         
         return "\n".join(lines)
 
+    def iter_output(self, args: list, options: dict):
+        """
+        Execute the built command and yield its output line by line while it runs.
+
+        Stderr is merged into stdout so a single pipe is read and the child can never
+        block on a full stderr buffer. Carriage-return progress updates are split into
+        separate lines. The exit code is stored on ``self.last_exit_code`` once the
+        iterator is exhausted; closing the iterator early kills the process.
+
+        Parameters
+        ----------
+        args : list
+            List of arguments for the azcopy command.
+        options : dict
+            Dictionary of options for the azcopy command.
+
+        Yields
+        ------
+        str
+            Each line of output without its line terminator.
+        """
+        yield from self._iter_command(self.build_command(args, options))
+
+    def _iter_command(self, command: list):
+        """``iter_output`` for a command that is already built."""
+        self.last_exit_code = None
+        with self.timings.phase('spawn'):
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, env=self._process_env())
+        try:
+            for line in process.stdout:
+                yield line.rstrip('\r\n')
+            self.last_exit_code = process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+    def execute_stream(self, args: list, options: dict, on_output=None, tail_lines: int = DEFAULT_TAIL_LINES):
+        """
+        Execute the built command, surfacing output as it is produced.
+
+        Unlike ``execute``, the output is never held in memory as a whole: each line is
+        logged, echoed and handed to ``on_output`` as it arrives, and only the last
+        ``tail_lines`` lines are retained for the return value.
+
+        Parameters
+        ----------
+        args : list
+            List of arguments for the azcopy command.
+        options : dict
+            Dictionary of options for the azcopy command.
+        on_output : callable, optional
+            Called with each non-empty output line.
+        tail_lines : int, optional
+            Number of trailing lines to return; None keeps the whole output. Default is 200.
+
+        Returns
+        -------
+        tuple
+            A tuple containing the exit code and the tail of the command output.
+        """
+        command = self.build_command(args, options)
+        run, tail, log = self._begin_stream(args, options, command, tail_lines)
+        lines = self._iter_command(command)
+        exit_code = None
+        try:
+            with self.timings.phase('transfer'):
+                for line in lines:
+                    self._handle_stream_line(run, tail, log, line, on_output)
+            exit_code = self.last_exit_code
+        finally:
+            # Kills azcopy if on_output raised
+            lines.close()
+            self._end_stream(run, log, exit_code)
+        return exit_code, "\n".join(tail)
+
+    async def execute_async(self, args: list, options: dict, on_output=None, tail_lines: int = DEFAULT_TAIL_LINES):
+        """
+        Awaitable counterpart of ``execute_stream`` built on asyncio subprocesses.
+
+        Output is read without blocking the event loop, so many commands can be
+        supervised concurrently from one loop. If the awaiting task is cancelled the
+        azcopy process is terminated (then killed if it does not exit) before the
+        cancellation propagates.
+
+        Parameters
+        ----------
+        args : list
+            List of arguments for the azcopy command.
+        options : dict
+            Dictionary of options for the azcopy command.
+        on_output : callable, optional
+            Called with each non-empty output line.
+        tail_lines : int, optional
+            Number of trailing lines to return; None keeps the whole output. Default is 200.
+
+        Returns
+        -------
+        tuple
+            A tuple containing the exit code and the tail of the command output.
+        """
+        import asyncio
+        import codecs
+        command = self.build_command(args, options)
+        run, tail, log = self._begin_stream(args, options, command, tail_lines)
+        exit_code = None
+        process = None
+        try:
+            with self.timings.phase('spawn'):
+                process = await asyncio.create_subprocess_exec(
+                    *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, env=self._process_env()
+                )
+            with self.timings.phase('transfer'):
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                pending = ''
+                while True:
+                    chunk = await process.stdout.read(STREAM_CHUNK)
+                    if not chunk:
+                        break
+                    # Progress updates are separated by carriage returns, other output by newlines
+                    *lines, pending = _LINE_BREAK.split(pending + decoder.decode(chunk))
+                    if len(pending) > STREAM_LINE_LIMIT:
+                        lines.append(pending)
+                        pending = ''
+                    for line in lines:
+                        self._handle_stream_line(run, tail, log, line, on_output)
+                pending += decoder.decode(b'', final=True)
+                self._handle_stream_line(run, tail, log, pending, on_output)
+                exit_code = await process.wait()
+        except asyncio.CancelledError:
+            self.logger.info("Command cancelled")
+            raise
+        finally:
+            # Also stops azcopy when on_output raises, so it is never left running
+            if process is not None:
+                await self._terminate_async(process)
+            self._end_stream(run, log, exit_code)
+        return exit_code, "\n".join(tail)
+
+    @staticmethod
+    async def _terminate_async(process, grace_period: float = 5):
+        """Stop an asyncio subprocess, escalating from terminate to kill."""
+        import asyncio
+        if process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), grace_period)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    def _begin_stream(self, args: list, options: dict, command: list, tail_lines):
+        """Announce a streamed command; return its output sink run, the buffer holding its output tail and its OutputBatch."""
+        with self.timings.phase('render'):
+            run = self.output.open(self, args, options)
+        with self.timings.phase('logging'):
+            self.logger.info("=" * 46 + " COMMAND EXECUTION (STREAM) " + "=" * 45 + f"\nCommand: {' '.join(command)}")
+        return run, deque(maxlen=tail_lines), OutputBatch(self.logger)
+
+    def _handle_stream_line(self, run, tail, log, line: str, on_output=None):
+        """Log, echo and retain one line of streamed output."""
+        if not line.strip():
+            return
+        with self.timings.phase('logging'):
+            log.add(line)
+        with self.timings.phase('render'):
+            run.line(line)
+        tail.append(line)
+        if on_output is not None:
+            on_output(line)
+
+    def _end_stream(self, run, log, exit_code):
+        """Record the outcome of a streamed command."""
+        with self.timings.phase('logging'):
+            log.flush()
+            self.logger.info(f"Exit Code: {exit_code}\n" + "=" * 117)
+        with self.timings.phase('render'):
+            run.finish(exit_code)
+
+    @staticmethod
+    def _log_execution(log, title: str, command: list, exit_code: int, stdout: str, stderr: str):
+        """Log a finished command with its output in one record; see ``azpype.logging_config.output_section``."""
+        padding = 117 - len(title) - 2
+        parts = [
+            "=" * (padding // 2) + f" {title} " + "=" * (padding - padding // 2),
+            f"Command: {' '.join(command)}",
+            f"Exit Code: {exit_code}",
+        ]
+        if stdout and stdout.strip():
+            parts.append(output_section("STDOUT", stdout))
+        if stderr and stderr.strip():
+            parts.append(output_section("STDERR", stderr))
+        parts.append("=" * 117)
+        log("\n".join(parts))
+
     def execute(self, args: list, options: dict):
         """
         Execute the built command and handle any exceptions.
@@ -143,71 +352,34 @@ class BaseCommand(ABC):
         tuple
             A tuple containing the exit code and output of the command execution.
         """
-        console = Console()
         command = self.build_command(args, options)
         
-        # Pretty command display with readable format
-        readable_cmd = self._format_command_readable(args, options)
-        syntax = Syntax(readable_cmd, "bash", theme="monokai", word_wrap=True)
-        console.print(Panel(syntax, title="🚀 Executing Command", border_style="blue", width=min(100, max(60, len(max(readable_cmd.split('\n'), key=len)) + 10))))
+        # Announce the command to the output sink
+        with self.timings.phase('render'):
+            run = self.output.open(self, args, options)
         
+        # The sink run is finished even if azcopy cannot be started
+        exit_code, stdout, stderr = None, None, None
         try:
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
+            with self.timings.phase('transfer'):
+                result = subprocess.run(command, capture_output=True, text=True, check=True, env=self._process_env())
+            exit_code, stdout, stderr = result.returncode, result.stdout, result.stderr
             
-            # Log command execution and output to file
-            self.logger.info("=" * 50 + " COMMAND EXECUTION " + "=" * 50)
-            self.logger.info(f"Command: {' '.join(command)}")
-            self.logger.info(f"Exit Code: {result.returncode}")
-            if result.stdout.strip():
-                self.logger.info("STDOUT:")
-                for line in result.stdout.strip().split('\n'):
-                    self.logger.info(f"  {line}")
-            if result.stderr.strip():
-                self.logger.info("STDERR:")
-                for line in result.stderr.strip().split('\n'):
-                    self.logger.info(f"  {line}")
-            self.logger.info("=" * 117)
+            with self.timings.phase('logging'):
+                # Log command execution and output to file as a single record
+                self._log_execution(self.logger.info, "COMMAND EXECUTION", command, exit_code, stdout, stderr)
             
-            # Pretty console output (Rich panels only, no duplication)
-            if result.stdout:
-                # Calculate sensible width based on content, with min 60 and max 120
-                max_line_length = max(len(line) for line in result.stdout.split('\n')) if result.stdout.strip() else 60
-                panel_width = min(120, max(60, max_line_length + 4))
-                console.print(Panel(result.stdout, title="📋 Command Output", border_style="green", width=panel_width))
-            if result.stderr:
-                max_line_length = max(len(line) for line in result.stderr.split('\n')) if result.stderr.strip() else 60
-                panel_width = min(120, max(60, max_line_length + 4))
-                console.print(Panel(f"[yellow]{result.stderr}[/yellow]", title="⚠️ Warning Output", border_style="yellow", width=panel_width))
-            
-            return result.returncode, result.stdout
+            return exit_code, stdout
             
         except subprocess.CalledProcessError as e:
-            # Log command execution and error to file
-            self.logger.error("=" * 50 + " COMMAND FAILED " + "=" * 52)
-            self.logger.error(f"Command: {' '.join(command)}")
-            self.logger.error(f"Exit Code: {e.returncode}")
-            if e.stdout and e.stdout.strip():
-                self.logger.error("STDOUT:")
-                for line in e.stdout.strip().split('\n'):
-                    self.logger.error(f"  {line}")
-            if e.stderr and e.stderr.strip():
-                self.logger.error("STDERR:")
-                for line in e.stderr.strip().split('\n'):
-                    self.logger.error(f"  {line}")
-            self.logger.error("=" * 117)
-            
-            # Pretty console error display (Rich panels only)
-            error_content = []
-            if e.stdout:
-                error_content.append(f"[white]Stdout:[/white]\n{e.stdout}")
-            if e.stderr:
-                error_content.append(f"[white]Stderr:[/white]\n{e.stderr}")
+            exit_code, stdout, stderr = e.returncode, e.stdout, e.stderr
+            with self.timings.phase('logging'):
+                # Log command execution and error to file as a single record
+                self._log_execution(self.logger.error, "COMMAND FAILED", command, exit_code, stdout, stderr)
             
-            error_text = "\n\n".join(error_content) if error_content else str(e)
-            # Calculate sensible width for error panel
-            max_line_length = max(len(line) for line in error_text.split('\n')) if error_text.strip() else 60
-            panel_width = min(120, max(60, max_line_length + 4))
-            console.print(Panel(f"[red]{error_text}[/red]", title="❌ Command Failed", border_style="red", width=panel_width))
-            
-            return e.returncode, e.stdout
+            return exit_code, stdout
+
+        finally:
+            with self.timings.phase('render'):
+                run.finish(exit_code, stdout, stderr)
 
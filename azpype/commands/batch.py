@@ -0,0 +1,185 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .copy import Copy
+from azpype.system import cpu_count, physical_memory_gb
+
+
+def default_concurrency() -> int:
+    """
+    Machine-wide azcopy concurrency budget.
+
+    Uses AZCOPY_CONCURRENCY_VALUE when set, otherwise azcopy's own default of
+    16 connections per core, at least 32 and at most 300.
+    """
+    value = os.environ.get('AZCOPY_CONCURRENCY_VALUE')
+    if value and value.isdigit():
+        return int(value)
+    return min(300, max(32, 16 * cpu_count()))
+
+
+def default_buffer_gb():
+    """
+    Machine-wide azcopy buffer budget in GB.
+
+    Uses AZCOPY_BUFFER_GB when set, otherwise half of physical memory. Returns None
+    when neither is known, leaving azcopy to pick its own default.
+    """
+    value = os.environ.get('AZCOPY_BUFFER_GB')
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    memory = physical_memory_gb()
+    return round(memory / 2, 2) if memory else None
+
+
+def split_budget(processes: int, total_concurrency: int = None, total_buffer_gb: float = None) -> dict:
+    """
+    Divide the concurrency and buffer budgets evenly across concurrent azcopy processes.
+
+    Parameters
+    ----------
+    processes : int
+        Number of azcopy processes that will run at the same time.
+    total_concurrency : int, optional
+        Total connections across all processes. Default is ``default_concurrency()``.
+    total_buffer_gb : float, optional
+        Total buffer memory across all processes. Default is ``default_buffer_gb()``.
+
+    Returns
+    -------
+    dict
+        Environment variables to set on each process.
+    """
+    processes = max(1, processes)
+    total_concurrency = total_concurrency or default_concurrency()
+    total_buffer_gb = total_buffer_gb or default_buffer_gb()
+    env = {'AZCOPY_CONCURRENCY_VALUE': max(1, total_concurrency // processes)}
+    if total_buffer_gb:
+        env['AZCOPY_BUFFER_GB'] = max(0.1, round(total_buffer_gb / processes, 2))
+    return env
+
+
+class BatchResult:
+    """
+    Aggregated outcome of a TransferBatch run.
+
+    ``results`` holds one parser per transfer in submission order (None when the
+    transfer raised); ``errors`` maps the index of such transfers to their exception.
+    """
+
+    def __init__(self, results: list, errors: dict, elapsed_seconds: float):
+        self.results = results
+        self.errors = errors
+        self.elapsed_seconds = elapsed_seconds
+
+    def _sum(self, attr):
+        return sum(getattr(r, attr) or 0 for r in self.results if r is not None)
+
+    @property
+    def total_bytes_transferred(self) -> int:
+        return self._sum('total_bytes_transferred')
+
+    @property
+    def number_of_file_transfers_completed(self) -> int:
+        return self._sum('number_of_file_transfers_completed')
+
+    @property
+    def number_of_file_transfers_failed(self) -> int:
+        return self._sum('number_of_file_transfers_failed')
+
+    @property
+    def number_of_file_transfers_skipped(self) -> int:
+        return self._sum('number_of_file_transfers_skipped')
+
+    @property
+    def throughput(self) -> float:
+        """Aggregate bytes per second over the wall-clock time of the batch."""
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.total_bytes_transferred / self.elapsed_seconds
+
+    @property
+    def failed(self) -> list:
+        """Indexes of transfers that raised or whose azcopy process exited nonzero."""
+        return [i for i, r in enumerate(self.results) if r is None or r.exit_code != 0]
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.failed
+
+
+class TransferBatch:
+    def __init__(self, max_processes: int = 4, total_concurrency: int = None, total_buffer_gb: float = None):
+        """
+        Run many copy operations concurrently under a global resource budget.
+
+        Parameters
+        ----------
+        max_processes : int, optional
+            Maximum number of azcopy processes running at once. Default is 4.
+        total_concurrency : int, optional
+            Connections shared by all live processes (AZCOPY_CONCURRENCY_VALUE).
+            Default is ``default_concurrency()``.
+        total_buffer_gb : float, optional
+            Buffer memory shared by all live processes (AZCOPY_BUFFER_GB).
+            Default is ``default_buffer_gb()``.
+        """
+        self.max_processes = max_processes
+        self.total_concurrency = total_concurrency
+        self.total_buffer_gb = total_buffer_gb
+        self.transfers = []
+
+    def add(self, source: str, destination: str, sas_token: str = None, **options):
+        """
+        Queue a copy; accepts the same arguments as Copy.
+
+        Returns
+        -------
+        TransferBatch
+            This batch, so calls can be chained.
+        """
+        self.transfers.append((source, destination, sas_token, options))
+        return self
+
+    def run(self) -> BatchResult:
+        """
+        Execute every queued copy and wait for all of them.
+
+        Copies are constructed (validated and configured) up front, then executed on
+        a pool of ``max_processes`` workers, each azcopy process receiving an even
+        share of the concurrency and buffer budgets.
+
+        Returns
+        -------
+        BatchResult
+            Per-transfer parsers plus aggregated bytes, throughput and failures.
+        """
+        started = time.monotonic()
+        results = [None] * len(self.transfers)
+        errors = {}
+
+        workers = max(1, min(self.max_processes, len(self.transfers)))
+        env = split_budget(workers, self.total_concurrency, self.total_buffer_gb)
+
+        copies = {}
+        for index, (source, destination, sas_token, options) in enumerate(self.transfers):
+            try:
+                copy = Copy(source, destination, sas_token=sas_token, **options)
+            except Exception as exc:
+                errors[index] = exc
+                continue
+            copy.env.update(env)
+            copies[index] = copy
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {index: pool.submit(copy.execute) for index, copy in copies.items()}
+            for index, future in futures.items():
+                try:
+                    results[index] = future.result()
+                except Exception as exc:
+                    errors[index] = exc
+
+        return BatchResult(results, errors, time.monotonic() - started)
@@ -0,0 +1,90 @@
+from .base_command import BaseCommand
+from .stdout_parser import AzCopyStdoutParser
+from azpype.logging_config import CopyLogger
+from azpype.prechecks import check_path_or_url
+
+
+class Bench(BaseCommand):
+    def __init__(self, destination: str, sas_token: str = None, profile: str = None, output=None, **options):
+        """
+        Initialize a new instance of the Bench class.
+
+        ``azcopy bench`` uploads (or downloads) auto-generated test data to measure the
+        throughput the current machine and network can sustain with the given settings.
+        Concurrency and buffer size are read from ``self.env``
+        (AZCOPY_CONCURRENCY_VALUE, AZCOPY_BUFFER_GB).
+
+        Parameters
+        ----------
+        destination : str
+            The container or directory URL to benchmark against.
+        sas_token : str, optional
+            SAS token appended to the destination URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml whose flags and environment
+            variables apply to this benchmark. Defaults to the AZPYPE_PROFILE environment variable.
+        output : OutputSink or str, optional
+            Where the configuration, azcopy's output and the result are shown: a sink from
+            ``azpype.sinks`` or one of 'rich', 'tail', 'summary' and 'quiet'. Defaults to
+            the AZPYPE_OUTPUT environment variable, then 'rich'.
+        **options : dict
+            Optional arguments for the benchmark. Available options include:
+
+            - blob-type : str
+                Defines the type of blob at the destination. (default: "Detect")
+            - block-size-mb : float
+                Use this block size (specified in MiB). Default is automatically calculated based on file size.
+            - delete-test-data : bool
+                If true, the benchmark data will be deleted at the end of the benchmark run. (default: True)
+            - file-count : int
+                Number of auto-generated data files to use. (default: 100)
+            - log-level : str
+                Define the log verbosity for the log file, available levels: INFO, WARNING, ERROR, and NONE. (default: "INFO")
+            - mode : str
+                Defines if Azcopy should test uploads or downloads from this target. Valid values are 'upload' and 'download'. (default: "upload")
+            - number-of-folders : int
+                If larger than 0, create folders to divide up the data.
+            - put-md5 : bool
+                Create an MD5 hash of each file, and save the hash as the Content-MD5 property of the destination blob/file.
+            - size-per-file : str
+                Size of each auto-generated data file. Must be a number immediately followed by K, M or G. E.g. 12k or 200G. (default: "250M")
+
+        """
+        super().__init__('bench', profile=profile, output=output)
+        self.run_name, self.run_log_directory, self.logger = CopyLogger(self.command_name).get_logger()
+
+        if sas_token:
+            self.destination = f"{destination}?{sas_token}"
+        else:
+            self.destination = destination
+        if not check_path_or_url(self.destination, self.logger):
+            self.logger.info("Invalid destination passed to Bench command.")
+            raise Exception("Invalid destination passed to Bench command. Failed checks: ['destination']")
+        self.options = self.build_flags(options)
+
+    def execute(self):
+        """
+        Run the benchmark.
+
+        Returns
+        -------
+        AzCopyStdoutParser
+            The parsed job summary; see ``throughput_mbps`` for the measured rate.
+        """
+        exit_code, stdout = super().execute([self.destination], self.options)
+        parsed = AzCopyStdoutParser(stdout)
+        parsed.exit_code = exit_code
+        parsed.raw_stdout = stdout
+        parsed.timings = self.timings.copy()
+        return parsed
+
+
+def throughput_mbps(parsed) -> float:
+    """
+    Megabits per second achieved by a finished job, from its transferred bytes and elapsed time.
+
+    Returns 0.0 when the job did not report both.
+    """
+    if not parsed.total_bytes_transferred or not parsed.elapsed_time:
+        return 0.0
+    return parsed.total_bytes_transferred * 8 / 1e6 / (parsed.elapsed_time * 60)
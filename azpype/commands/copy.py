@@ -1,14 +1,31 @@
-from watchdog.observers import Observer
-from watchdog.observers.polling import PollingObserver
-from watchdog.events import FileSystemEventHandler
+import os
+import tempfile
+import shutil
 import time
-from .base_command import BaseCommand
-from .stdout_parser import AzCopyStdoutParser
-from azpype.logging_config import CopyLogger
-from azpype.validators import validate_azcopy_envs, validate_login_type, is_valid_path_or_url, validate_local_path, validate_network_available
+from contextlib import contextmanager
+from copy import copy as shallow_copy
+from pathlib import Path
+from .transfer_command import TransferCommand, list_of_files
+from .jobs import Jobs
+from .pipe import PipeCopy, DEFAULT_PIPE_CHUNK
 
-class Copy(BaseCommand):
-    def __init__(self, source: str, destination: str, sas_token:str = None, **options):
+
+@contextmanager
+def _staging(directory: str = None):
+    """Yield ``directory``, or a temporary directory that is removed afterwards."""
+    if directory is not None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        yield str(directory)
+        return
+    temporary = tempfile.mkdtemp(prefix='azpype-staging-')
+    try:
+        yield temporary
+    finally:
+        shutil.rmtree(temporary, ignore_errors=True)
+
+
+class Copy(TransferCommand):
+    def __init__(self, source: str, destination: str, sas_token:str = None, profile: str = None, retry_policy=None, output=None, source_sas_token: str = None, **options):
         """
         Initialize a new instance of the Copy class.
 
@@ -18,6 +35,21 @@ class Copy(BaseCommand):
             The source URL or path for the copy operation.
         destination : str
             The destination URL or path for the copy operation.
+        sas_token : str, optional
+            SAS token appended to the destination URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml whose flags and environment
+            variables apply to this copy. Defaults to the AZPYPE_PROFILE environment variable.
+        retry_policy : RetryPolicy, optional
+            Governs how often a failed copy is retried. Retries resume the azcopy job, so
+            only transfers that did not complete are sent again. Default is RetryPolicy().
+        output : OutputSink or str, optional
+            Where the configuration, azcopy's output and the result are shown: a sink from
+            ``azpype.sinks`` or one of 'rich', 'tail', 'summary' and 'quiet'. Defaults to
+            the AZPYPE_OUTPUT environment variable, then 'rich'.
+        source_sas_token : str, optional
+            SAS token appended to the source URL (without the leading '?'). Each endpoint of
+            a URL-to-URL (service-to-service) transfer takes its own token.
         **options : dict
             Optional arguments for the copy operation. Available options include:
 
@@ -49,6 +81,9 @@ class Copy(BaseCommand):
                 Include only these files when copying. This option supports wildcard characters (*). Separate files by using a ';'.
             - include-regex : str
                 Include only the relative path of the files that align with regular expressions. Separate regular expressions with ';'.
+            - output-type : str
+                Format of the command's output: 'text' (default) or 'json'. With 'json' the result is
+                an AzCopyJsonParser decoded from azcopy's structured message stream.
             - log-level : str
                 Define the log verbosity for the log file, available levels: INFO(all requests/responses), WARNING(slow responses), ERROR(only failed requests), and NONE(no output logs). (default: "INFO")
             - metadata : str
@@ -61,51 +96,588 @@ class Copy(BaseCommand):
                 Look into subdirectories recursively when uploading from local file system.
 
         """
-        super().__init__('copy')
-        self.run_name, self.run_log_directory, self.logger = CopyLogger(self.command_name).get_logger()
-        self.logger.info(f"Starting copy operation")
-
-        self.source = source
-        self.sas_token = sas_token
-        if self.sas_token:
-            self.destination = f"{destination}?{self.sas_token}"
-        else:
-            self.destination = destination
-        valid, failed_checks = self.prevalidation()
-        if valid:
-            self.options = self.build_flags(options)
-        else:
-            self.logger.info(f"Invalid options passed to Copy command. Failed checks: {failed_checks}")
-            raise Exception(f"Invalid options passed to Copy command. Failed checks: {failed_checks}")
-        self.logger.info(f"Preliminary checks passed: {self.run_prechecks()}")
-
-    def prevalidation(self):
-        validation_results = {
-            "source": is_valid_path_or_url(self.source, self.logger),
-            "destination": is_valid_path_or_url(self.destination, self.logger)
-        }
-        failed_checks = [check for check, result in validation_results.items() if not result]
-        return not failed_checks, failed_checks
-
-        
-    def execute(self):
+        super().__init__('copy', source, destination, sas_token=sas_token, profile=profile, retry_policy=retry_policy, output=output, source_sas_token=source_sas_token, **options)
+
+    def execute(self, stream: bool = False, on_output=None, on_progress=None):
         """
         Execute the copy command with the given source, destination, and options.
 
+        When azcopy fails, the retry policy is applied: after waiting, the job is
+        resumed with ``azcopy jobs resume <job id>`` rather than started over.
+
+        Parameters
+        ----------
+        stream : bool, optional
+            Read azcopy output line by line while it runs instead of buffering it.
+            Only the last lines of output are kept, so memory stays bounded for
+            long-running jobs. Implied when ``on_output`` or ``on_progress`` is given.
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        on_progress : callable, optional
+            Called with a ProgressSnapshot for every progress message. Switches the
+            run to ``--output-type=json``.
+
         Returns
         -------
-        AzCopyStdoutParser
+        AzCopyStdoutParser or AzCopyJsonParser
             A parsed object containing structured output data with accessible attributes.
-            Raw stdout is available via .raw_stdout attribute.
+            Raw stdout is available via .raw_stdout attribute and the number of resumes
+            via .retries. In streaming mode only the tail of the output is retained in
+            .stdout and .raw_stdout.
         """
         args = [self.source, self.destination]
-        exit_code, stdout = super().execute(args, self.options)
-        
-        # Parse stdout and enhance with additional data
-        parsed = AzCopyStdoutParser(stdout)
-        parsed.exit_code = exit_code
-        parsed.raw_stdout = stdout
-        
-        # No need for summary table - the command output already shows comprehensive results
-        
-        return parsed
\ No newline at end of file
+        return self._run(args, self._run_options(on_progress), stream, on_output, on_progress)
+
+    def _execute_list(self, paths, stream: bool = False, on_output=None, part: bool = False, **overrides):
+        """
+        Copy only the given files with a single azcopy invocation via ``--list-of-files``.
+
+        Parameters
+        ----------
+        paths : iterable of str
+            Paths relative to the source directory.
+        stream : bool, optional
+            Stream azcopy output, as in ``execute``.
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        part : bool, optional
+            The invocation is one part of a larger run and is not recorded; see ``_run``.
+        **overrides : dict
+            Flags replacing this copy's options for this invocation only.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result of the invocation.
+        """
+        options = {**self.options, **{k.replace('_', '-'): v for k, v in overrides.items() if v is not None}}
+        with list_of_files(paths) as (list_path, _):
+            options['list-of-files'] = list_path
+            return self._run([self.source, self.destination], options, stream, on_output, part=part)
+
+    def execute_delta(self, index=None, use_hash: bool = False, stream: bool = False, on_output=None):
+        """
+        Copy only the files that changed since the last successful delta copy to this destination.
+
+        The local source tree is compared against a persistent index of transferred
+        files (size, modification time and optionally MD5), and only new or modified
+        files are handed to azcopy via ``--list-of-files``. azcopy is not launched at
+        all when nothing changed. The index is updated only when the copy succeeds and
+        is not a dry run.
+
+        Parameters
+        ----------
+        index : TransferIndex, optional
+            Index to use. Default is the one at ~/.azpype/transfer_index.db.
+        use_hash : bool, optional
+            Hash files whose modification time changed but size did not, and skip
+            them when the content is identical. Default is False.
+        stream : bool, optional
+            Stream azcopy output, as in ``execute``.
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result. When nothing changed it reports status 'Completed'
+            with zero transfers.
+        """
+        from azpype.transfer_index import TransferIndex
+        if not Path(self.source).is_dir():
+            raise ValueError(f"execute_delta requires a local source directory, got: {self.source}")
+        index = index or TransferIndex()
+
+        with index.diff(self.source, self.destination, use_hash=use_hash) as delta:
+            changed = delta.changed
+            if not changed:
+                self.logger.info("No files changed since the last transfer; skipping azcopy")
+                return self._empty_result()
+
+            self.logger.info(f"Transferring {changed} changed files")
+            result = self._execute_list(delta.changed_paths(), stream=stream, on_output=on_output)
+            # A dry run transfers nothing, so nothing may be recorded as sent
+            if result.exit_code == 0 and not self.options.get('dry-run'):
+                delta.commit()
+            return result
+
+    def retry_from_log(self, job_id: str = None, log_path: str = None, stream: bool = False, on_output=None, **overrides):
+        """
+        Copy again only the files an earlier job of this copy failed on, as recorded in its azcopy log.
+
+        The job log is streamed by ``azpype.log_analyzer`` and the failed files are
+        handed to azcopy via ``--list-of-files``, so the source is not rescanned.
+        azcopy is not launched when the log records no failures under this source.
+
+        Parameters
+        ----------
+        job_id : str, optional
+            The failed job; its log is looked up in ~/.azpype/azcopy_logs.
+        log_path : str, optional
+            The job log to read instead of looking it up by ``job_id``.
+        stream : bool, optional
+            Stream azcopy output, as in ``execute``.
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        **overrides : dict
+            Flags replacing this copy's options for the re-transfer only, e.g. ``block_size_mb=4``.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result of the re-transfer.
+        """
+        from azpype.log_analyzer import JobLogReport, job_log_path
+        if log_path is None:
+            if job_id is None:
+                raise ValueError("retry_from_log requires a job_id or a log_path")
+            log_path = job_log_path(job_id)
+        report = JobLogReport.from_log(log_path)
+        paths = report.relative_paths(self.source)
+        if not paths:
+            self.logger.info(f"No failed files under {self.source} in {log_path}; skipping azcopy")
+            return self._empty_result()
+
+        self.logger.info(f"Re-transferring {len(paths)} failed files from {log_path}")
+        return self._execute_list(paths, stream=stream, on_output=on_output, **overrides)
+
+    def retry_failed(self, job_id: str, destination: str = None, sas_token: str = None, stream: bool = False, on_output=None, **overrides):
+        """
+        Copy again only the transfers that failed in an earlier job of this copy.
+
+        The failed entries are streamed from ``azcopy jobs show --with-status=Failed``
+        and handed to azcopy via ``--list-of-files``, so neither the source nor the
+        other transfers of the job are scanned again. azcopy is not launched when the
+        job has no failed transfers under this source.
+
+        Parameters
+        ----------
+        job_id : str
+            The failed job.
+        destination : str, optional
+            Send the failed files here instead of to this copy's destination.
+        sas_token : str, optional
+            SAS token for ``destination`` (without the leading '?'). The destination
+            and token are validated like those given to the constructor.
+        stream : bool, optional
+            Stream azcopy output, as in ``execute``.
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        **overrides : dict
+            Flags replacing this copy's options for the re-transfer only, e.g.
+            ``block_size_mb=4`` or ``cap_mbps=500``.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result of the re-transfer.
+        """
+        from azpype.log_analyzer import relative_paths
+        target = self
+        if destination is not None:
+            target = shallow_copy(self)
+            target.timings = self.timings.copy()
+            target.sas_token = sas_token
+            target.destination = f"{destination}?{sas_token}" if sas_token else destination
+            valid, failed_checks = target.prevalidation()
+            if not valid:
+                self.logger.info(f"Invalid options passed to {type(self).__name__} command. Failed checks: {failed_checks}")
+                raise Exception(f"Invalid options passed to {type(self).__name__} command. Failed checks: {failed_checks}")
+
+        jobs = self._resume_command(Jobs, {})
+        paths = relative_paths(self.source, (transfer.source for transfer in jobs.failed_transfers(job_id)))
+        if not paths:
+            self.logger.info(f"Job {job_id} has no failed transfers under {self.source}; skipping azcopy")
+            return self._empty_result()
+
+        self.logger.info(f"Re-transferring {len(paths)} failed files of job {job_id}")
+        return target._execute_list(paths, stream=stream, on_output=on_output, **overrides)
+
+    @classmethod
+    def from_stream(cls, data, destination: str, sas_token: str = None, profile: str = None, output=None, chunk_size: int = DEFAULT_PIPE_CHUNK, **options):
+        """
+        Upload ``data`` to a single blob through azcopy's stdin (``--from-to=PipeBlob``).
+
+        ``data`` is handed to azcopy in chunks as it is read, so nothing is staged on
+        disk and memory use is bounded by ``chunk_size`` and the pipe buffer. A stream
+        cannot be replayed, so the retry policy does not apply.
+
+        Parameters
+        ----------
+        data : bytes, file-like or iterable
+            A bytes-like object, an object with ``read(n)`` (an open file, a socket's
+            makefile, ``sys.stdin.buffer``) or an iterable of bytes chunks.
+        destination : str
+            URL of the blob to write.
+        sas_token : str, optional
+            SAS token appended to the destination URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml.
+        output : OutputSink or str, optional
+            Where the configuration, azcopy's output and the result are shown.
+        chunk_size : int, optional
+            Bytes written to azcopy at a time. Default is 4 MiB.
+        **options : dict
+            Copy flags that apply to a single blob, e.g. ``block_size_mb``, ``put_md5``,
+            ``content_type`` or ``metadata``. Directory flags such as ``recursive`` are dropped.
+
+        Returns
+        -------
+        AzCopyStdoutParser
+            The parsed output of azcopy.
+        """
+        pipe = PipeCopy(destination, 'PipeBlob', sas_token=sas_token, profile=profile, output=output, **options)
+        return pipe.upload(data, chunk_size)
+
+    @classmethod
+    def to_stream(cls, source: str, sas_token: str = None, profile: str = None, output=None, chunk_size: int = DEFAULT_PIPE_CHUNK, **options):
+        """
+        Download a single blob through azcopy's stdout (``--from-to=BlobPipe``).
+
+        Returns a generator of bytes chunks. azcopy is only ahead of the consumer by the
+        pipe buffer, so slow consumers slow the download instead of filling memory, and
+        closing the generator early stops azcopy.
+
+        Parameters
+        ----------
+        source : str
+            URL of the blob to read.
+        sas_token : str, optional
+            SAS token appended to the source URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml.
+        output : OutputSink or str, optional
+            Where the configuration and azcopy's messages are shown.
+        chunk_size : int, optional
+            Largest chunk yielded. Default is 4 MiB.
+        **options : dict
+            Copy flags that apply to a single blob, e.g. ``check_md5`` or ``cap_mbps``.
+
+        Returns
+        -------
+        generator of bytes
+            The blob's content. An Exception is raised after the last chunk if azcopy failed.
+        """
+        pipe = PipeCopy(source, 'BlobPipe', sas_token=sas_token, profile=profile, output=output, **options)
+        return pipe.download(chunk_size)
+
+    def execute_sharded(self, shards: int = 4, total_concurrency: int = None, total_buffer_gb: float = None, stream: bool = False):
+        """
+        Split one large upload across several concurrent azcopy processes.
+
+        The local source tree is walked once and its files are partitioned into
+        ``shards`` groups of roughly equal total size. Each group is sent by its own
+        azcopy process via ``--list-of-files``, so enumeration, job planning and
+        transfer run in parallel. The concurrency and buffer budgets are split
+        evenly across the processes. A failed shard is resumed on its own under the
+        retry policy; the other shards are unaffected.
+
+        Parameters
+        ----------
+        shards : int, optional
+            Number of azcopy processes. Default is 4.
+        total_concurrency : int, optional
+            Connections shared by all shards. Default is ``batch.default_concurrency()``.
+        total_buffer_gb : float, optional
+            Buffer memory shared by all shards. Default is ``batch.default_buffer_gb()``.
+        stream : bool, optional
+            Stream each shard's azcopy output, as in ``execute``.
+
+        Returns
+        -------
+        AzCopyStdoutParser
+            The shards' results combined with ``AzCopyStdoutParser.merge``; the
+            per-shard results are in ``.parts``. Phase timings are summed over the shards.
+            Only this combined result reaches the output sink, the run index and the
+            metrics exporters.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from azpype.metrics import PhaseTimings
+        from azpype.sharding import partition_by_size
+        from azpype.transfer_index import scan_tree
+        from .batch import split_budget
+        from .stdout_parser import AzCopyStdoutParser
+
+        if not Path(self.source).is_dir():
+            raise ValueError(f"execute_sharded requires a local source directory, got: {self.source}")
+        groups = partition_by_size(scan_tree(self.source), shards)
+        if not groups:
+            self.logger.info("Source directory is empty; skipping azcopy")
+            return self._empty_result()
+
+        env = split_budget(len(groups), total_concurrency, total_buffer_gb)
+        self.logger.info(f"Copying {sum(len(g) for g in groups)} files in {len(groups)} shards")
+
+        def _send(paths):
+            shard = shallow_copy(self)
+            shard.env = {**self.env, **env}
+            shard.timings = PhaseTimings()
+            return shard._execute_list(paths, stream=stream, part=True)
+
+        self._start_run()
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            results = list(pool.map(_send, groups))
+        merged = AzCopyStdoutParser.merge(results)
+        self.timings.add(merged.timings)
+        return self._record(merged)
+
+    def execute_fanout(self, replicas: list, primary_sas_token: str = None, max_processes: int = 4, total_concurrency: int = None, total_buffer_gb: float = None, stream: bool = False):
+        """
+        Upload the local source once, then replicate it to other destinations with
+        service-to-service copies.
+
+        The source is uploaded to this copy's destination (the primary) as in
+        ``execute``. When that succeeds, azcopy copies the uploaded data from the
+        primary to every replica directly between storage endpoints, through a
+        ``TransferBatch``, so the host sends the bytes only once. Replicas keep the
+        primary's layout: a directory lands under the same name, a file under the same
+        blob name. Each replica that fails is resumed on its own under the retry policy.
+
+        Parameters
+        ----------
+        replicas : list
+            Destination URLs, or (url, sas_token) tuples when each needs its own token.
+        primary_sas_token : str, optional
+            SAS token with read and list permissions used to read the primary during
+            replication. Defaults to this copy's ``sas_token``.
+        max_processes : int, optional
+            Maximum number of replication processes running at once. Default is 4.
+        total_concurrency : int, optional
+            Connections shared by the replication processes. Default is ``batch.default_concurrency()``.
+        total_buffer_gb : float, optional
+            Buffer memory shared by the replication processes. Default is ``batch.default_buffer_gb()``.
+        stream : bool, optional
+            Stream the upload's azcopy output, as in ``execute``.
+
+        Returns
+        -------
+        AzCopyStdoutParser
+            The upload and the replications combined with ``AzCopyStdoutParser.merge``.
+            ``.parts[0]`` is the upload and ``.parts[1:]`` the replicas, in order; their
+            URLs (without SAS) are in ``.destinations``. Replicas are not attempted when
+            the upload fails.
+        """
+        from azpype.validators import is_url
+        from .batch import TransferBatch
+        from .stdout_parser import AzCopyStdoutParser
+
+        if is_url(self.source):
+            raise ValueError(f"execute_fanout requires a local source, got: {self.source.split('?')[0]}")
+        if not is_url(self.destination):
+            raise ValueError(f"execute_fanout requires a URL as the primary destination, got: {self.destination}")
+        replicas = [(replica, None) if isinstance(replica, str) else tuple(replica) for replica in replicas]
+
+        primary = self.execute(stream=stream)
+        primary_url = self.destination.split('?')[0]
+        if primary.exit_code != 0:
+            self.logger.info(f"Upload to {primary_url} failed; not replicating to {len(replicas)} destinations")
+            merged = AzCopyStdoutParser.merge([primary])
+            merged.destinations = [primary_url]
+            return merged
+
+        source, options = self._replication_source()
+        options['output'] = self.output
+        options['retry_policy'] = self.retry_policy
+        options['source_sas_token'] = primary_sas_token or self.sas_token
+        if self.profile is not None:
+            options['profile'] = self.profile.name
+        batch = TransferBatch(max_processes=max_processes, total_concurrency=total_concurrency, total_buffer_gb=total_buffer_gb)
+        for url, sas_token in replicas:
+            batch.add(source, url, sas_token=sas_token, **options)
+        self.logger.info(f"Replicating {source} to {len(replicas)} destinations")
+        replicated = batch.run()
+
+        results = [primary]
+        for index, result in enumerate(replicated.results):
+            if result is None:
+                error = replicated.errors[index]
+                self.logger.error(f"Replication to {replicas[index][0]} failed: {error}")
+                result = self._make_parser(self.options, str(error))
+                result.exit_code = 1
+                result.raw_stdout = str(error)
+                result.final_job_status = 'Failed'
+            results.append(result)
+        merged = AzCopyStdoutParser.merge(results)
+        merged.destinations = [primary_url] + [url.split('?')[0] for url, _ in replicas]
+        return merged
+
+    def _replication_source(self):
+        """Where the upload put the source on the primary, and the flags that copy it on with the same layout."""
+        from urllib.parse import urlparse
+        destination = self.destination.split('?')[0]
+        primary = destination.rstrip('/')
+        name = os.path.basename(os.path.normpath(self.source))
+        options = {'as-subdir': self.options.get('as-subdir'), 'overwrite': self.options.get('overwrite')}
+        if self.source.endswith('*'):
+            return f"{primary}/*", {**options, 'recursive': True}
+        if Path(self.source).is_dir():
+            as_subdir = str(self.options.get('as-subdir', True)).lower() != 'false'
+            return (f"{primary}/{name}" if as_subdir else primary), {**options, 'recursive': True}
+        # A file keeps its name when the destination is a container or a virtual directory
+        if destination.endswith('/') or '/' not in urlparse(destination).path.strip('/'):
+            return f"{primary}/{name}", options
+        return primary, options
+
+    def execute_packed(self, archive_mb: int = 256, archive_format: str = 'tar', staging_dir: str = None, stream: bool = False):
+        """
+        Upload a directory of many small files as a few large archives.
+
+        Per-request latency dominates uploads of small files, so the source is first
+        streamed into uncompressed archives of about ``archive_mb`` each, together with
+        a JSON index per archive and a manifest (see ``azpype.packing``). Only those
+        are uploaded. Use ``execute_unpacked`` on the receiving side, or
+        ``PackManifest.load(url).read_member(path)`` to fetch single files by byte range.
+
+        Parameters
+        ----------
+        archive_mb : int, optional
+            Target archive size in MiB. Default is 256.
+        archive_format : str, optional
+            'tar' or 'zip'. Default is 'tar'.
+        staging_dir : str, optional
+            Where the archives are built. Default is a temporary directory, removed
+            after the upload. A given directory is kept.
+        stream : bool, optional
+            Stream azcopy output, as in ``execute``.
+
+        Returns
+        -------
+        tuple
+            (parsed result of uploading the archives, PackManifest).
+        """
+        from azpype.packing import pack_directory
+        if not Path(self.source).is_dir():
+            raise ValueError(f"execute_packed requires a local source directory, got: {self.source}")
+
+        with _staging(staging_dir) as staging:
+            manifest = pack_directory(self.source, staging, archive_mb=archive_mb, archive_format=archive_format)
+            self.logger.info(f"Packed {manifest.member_count} files into {len(manifest.archives)} archives")
+            result = self._run([os.path.join(staging, '*'), self.destination], self.options, stream)
+        return result, manifest
+
+    def execute_unpacked(self, staging_dir: str = None, stream: bool = False):
+        """
+        Download archives written by ``execute_packed`` and unpack them into the destination.
+
+        The source is the URL the archives were uploaded to; the destination is a
+        local directory that receives the original files with their modification times.
+
+        Parameters
+        ----------
+        staging_dir : str, optional
+            Where the archives are downloaded. Default is a temporary directory,
+            removed afterwards. A given directory is kept.
+        stream : bool, optional
+            Stream azcopy output, as in ``execute``.
+
+        Returns
+        -------
+        tuple
+            (parsed result of the download, number of files unpacked). Nothing is
+            unpacked when the download failed.
+        """
+        from azpype.packing import unpack_directory
+        base, _, query = self.source.partition('?')
+        source = f"{base.rstrip('/')}/*" + (f"?{query}" if query else '')
+
+        with _staging(staging_dir) as staging:
+            result = self._run([source, staging], self.options, stream)
+            unpacked = 0
+            if result.exit_code == 0:
+                unpacked = unpack_directory(staging, self.destination)
+                self.logger.info(f"Unpacked {unpacked} files into {self.destination}")
+        return result, unpacked
+
+    def watch(self, debounce: float = 5.0, max_latency: float = 60.0, max_batch: int = 10000, polling: bool = False, stop_event=None, on_batch=None):
+        """
+        Upload new and modified files from the local source directory as they appear.
+
+        File system events are collected until no new event has arrived for
+        ``debounce`` seconds (or the oldest pending change is ``max_latency`` seconds
+        old, or ``max_batch`` files are pending). Each batch is sent with a single
+        azcopy invocation using ``--list-of-files``, so at most one azcopy process
+        runs at a time regardless of how many files arrive. A batch that still fails
+        after the retry policy is sent again with the next batch. Blocks until
+        ``stop_event`` is set or the process is interrupted; pending changes are
+        flushed before returning.
+
+        Parameters
+        ----------
+        debounce : float, optional
+            Quiet period in seconds that closes a batch. Default is 5.
+        max_latency : float, optional
+            Longest a change may wait before its batch is sent. Default is 60.
+        max_batch : int, optional
+            Most files sent in one invocation. Default is 10000.
+        polling : bool, optional
+            Use watchdog's PollingObserver, e.g. for network file systems. Default is False.
+        stop_event : threading.Event, optional
+            Set it from another thread to stop watching.
+        on_batch : callable, optional
+            Called with the list of relative paths and the parsed result of each batch.
+
+        Returns
+        -------
+        int
+            Number of batches sent.
+
+        Raises
+        ------
+        Exception
+            If batches still pending when watching stops fail once more; the
+            message lists the files that were not uploaded.
+        """
+        from .watch import watch_directory
+        if not Path(self.source).is_dir():
+            raise ValueError(f"watch requires a local source directory, got: {self.source}")
+
+        def _send(paths):
+            self.logger.info(f"Uploading batch of {len(paths)} changed files")
+            result = self._execute_list(paths)
+            if on_batch is not None:
+                on_batch(paths, result)
+            if result.exit_code != 0:
+                self.logger.error(f"Batch of {len(paths)} changed files failed with exit code {result.exit_code}; sending it again with the next batch")
+                return False
+            return True
+
+        return watch_directory(self.source, _send, debounce=debounce, max_latency=max_latency, max_batch=max_batch, polling=polling, stop_event=stop_event)
+
+    def _retry_invocation(self, parsed, args: list, options: dict):
+        """Resume the azcopy job so only transfers that did not complete are sent again."""
+        if not parsed.job_id:
+            self.logger.info("Copy failed before a job was created; nothing to resume")
+            return None
+        jobs = self._resume_command(Jobs, options)
+        return jobs, ['resume', parsed.job_id], jobs.options
+
+
+class AsyncCopy(Copy):
+    """
+    Copy whose ``execute`` is a coroutine.
+
+    Construction (validation, config and prechecks) is identical to Copy; only the
+    transfer itself runs on an asyncio subprocess, so many copies can be awaited
+    concurrently from one event loop and cancelled like any other task.
+    """
+
+    async def execute(self, on_output=None, on_progress=None):
+        """
+        Run the copy on an asyncio subprocess, streaming its output.
+
+        Failed copies are resumed under the retry policy, as in Copy.execute.
+
+        Parameters
+        ----------
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        on_progress : callable, optional
+            Called with a ProgressSnapshot for every progress message. Switches the
+            run to ``--output-type=json``.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result; .stdout and .raw_stdout hold the tail of the output.
+        """
+        return await self._run_async([self.source, self.destination], self._run_options(on_progress), on_output, on_progress)
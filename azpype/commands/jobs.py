@@ -1,48 +1,370 @@
+import os
+import json
 import pathlib
+import re
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from heapq import merge
 from .base_command import BaseCommand
+from .stdout_parser import _parse_timestamp
 from azpype.logging_config import JobsLogger
+from azpype.housekeeping import DEFAULT_RETENTION, RetentionPolicy, default_run_index, plans_directory, prune
+
+# Statuses of jobs that did not transfer everything
+FAILURE_STATUSES = ('Failed', 'Cancelled', 'CompletedwithErrors', 'CompletedWithErrors', 'CompletedWithFailures', 'CompletedWithErrorsAndSkipped')
+# Seconds a job listing stays valid; override with AZPYPE_JOBS_TTL
+DEFAULT_JOBS_TTL = 10
+# "transfer--> source: /data/a.txt destination: https://.../a.txt status Failed"
+_TRANSFER_LINE = re.compile(r'^transfer--> source: (.*) destination: (.*) status (\S+)\s*$')
+
+
+def _plans_signature(directory: pathlib.Path):
+    """Changes whenever a job plan is added or removed."""
+    try:
+        return directory.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+class JobRecord:
+    """One job from ``azcopy jobs list``."""
+    __slots__ = ('job_id', 'start_time', 'command', 'status')
+
+    def __init__(self, job_id: str, start_time: datetime, command: str, status: str):
+        self.job_id = job_id
+        # Timezone-aware (UTC); None if azcopy did not report it
+        self.start_time = start_time
+        self.command = command
+        self.status = status
+
+    @classmethod
+    def from_details(cls, details: dict):
+        """Build a record from an entry of the JobIDDetails list in azcopy's JSON output."""
+        start = details.get('StartTime')
+        if isinstance(start, (int, float)):
+            # Unix time in nanoseconds
+            start = datetime.fromtimestamp(start / 1e9, tz=timezone.utc)
+        else:
+            start = _parse_timestamp(start)
+        return cls(details.get('JobId'), start, details.get('CommandString', ''), str(details.get('JobStatus', '')))
+
+    @property
+    def failed(self) -> bool:
+        return self.status in FAILURE_STATUSES
+
+    def __repr__(self):
+        return f"JobRecord({self.job_id!r}, status={self.status!r}, start_time={self.start_time})"
+
+
+class JobIndex:
+    """
+    The jobs azcopy knows about, newest first, indexed by ID, status and start time.
+
+    Iterating, ``len`` and indexing behave like a list of JobRecord. Queries take
+    O(log n) to locate the time range, so they are cheap enough to run in a loop.
+    """
+
+    def __init__(self, records):
+        # Oldest first; records without a start time sort before all others
+        ordered = sorted(records, key=self._sort_key)
+        self._records = ordered
+        self._newest = ordered[::-1]
+        self._times = [self._sort_key(r) for r in ordered]
+        self._by_id = {r.job_id: r for r in ordered}
+        self._by_status = {}
+        for record in ordered:
+            entries, times = self._by_status.setdefault(record.status, ([], []))
+            entries.append(record)
+            times.append(self._sort_key(record))
+
+    @staticmethod
+    def _sort_key(record) -> float:
+        return record.start_time.timestamp() if record.start_time is not None else float('-inf')
+
+    @classmethod
+    def from_json(cls, stdout: str):
+        """Parse the output of ``azcopy jobs list --output-type=json``."""
+        records = []
+        for line in stdout.splitlines():
+            line = line.strip()
+            if not line.startswith('{'):
+                continue
+            try:
+                message = json.loads(line)
+                content = message.get('MessageContent')
+                content = json.loads(content) if isinstance(content, str) else content
+            except ValueError:
+                continue
+            if isinstance(content, dict) and content.get('JobIDDetails'):
+                records.extend(JobRecord.from_details(d) for d in content['JobIDDetails'])
+        return cls(records)
+
+    def __iter__(self):
+        return iter(self._newest)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, i):
+        return self._newest[i]
+
+    def get(self, job_id: str):
+        """The record of ``job_id``, or None."""
+        return self._by_id.get(job_id)
+
+    @staticmethod
+    def _cutoff(since) -> float:
+        if since is None:
+            return float('-inf')
+        if isinstance(since, timedelta):
+            since = datetime.now(timezone.utc) - since
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return since.timestamp()
+
+    def query(self, status=None, since=None) -> list:
+        """
+        Jobs with the given status(es) that started at or after ``since``, newest first.
+
+        Parameters
+        ----------
+        status : str or iterable of str, optional
+            One status or several; default is any status.
+        since : datetime or timedelta, optional
+            Earliest start time, or how far back to look, e.g. ``timedelta(hours=1)``.
+            Naive datetimes are taken as UTC.
+        """
+        cutoff = self._cutoff(since)
+        if status is None:
+            matches = self._records[bisect_left(self._times, cutoff):]
+        else:
+            statuses = [status] if isinstance(status, str) else status
+            ranges = []
+            for name in statuses:
+                entries, times = self._by_status.get(name, ([], []))
+                ranges.append(entries[bisect_left(times, cutoff):])
+            matches = list(merge(*ranges, key=self._sort_key))
+        return matches[::-1]
+
+    def failed(self, since=None) -> list:
+        """Failed, cancelled or partially completed jobs, newest first; see ``query``."""
+        return self.query(FAILURE_STATUSES, since)
+
+    def __repr__(self):
+        return f"JobIndex({len(self)} jobs)"
+
+
+class JobTransfer:
+    """One transfer of a job, from ``azcopy jobs show --with-status``."""
+    __slots__ = ('source', 'destination', 'status')
+
+    def __init__(self, source: str, destination: str, status: str):
+        self.source = source
+        self.destination = destination
+        self.status = status
+
+    def __repr__(self):
+        return f"JobTransfer({self.source!r}, status={self.status!r})"
+
+
+class JobListCache:
+    """
+    Process-wide store of job listings, each valid for ``ttl`` seconds and only
+    while the plans directory is unchanged, i.e. no job was added or removed.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl if ttl is not None else float(os.environ.get('AZPYPE_JOBS_TTL', DEFAULT_JOBS_TTL))
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key, signature):
+        """The cached JobIndex for ``key``, or None if missing, expired or stale."""
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is None or cached[1] != signature or time.monotonic() - cached[0] >= self.ttl:
+            return None
+        return cached[2]
+
+    def store(self, key, signature, index: JobIndex):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), signature, index)
+
+    def invalidate(self, key=None):
+        """Drop one cached listing, or all of them when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+job_list_cache = JobListCache()
 
 
 class Jobs(BaseCommand):
-    def __init__(self, job_id=None, **options):
-        super().__init__('jobs')
+    def __init__(self, job_id=None, output=None, **options):
+        super().__init__('jobs', output=output)
         # Logger is now configured in BaseCommand __init__
         self.job_id = job_id
         self.options = options
-        
-    def list(self):
+
+    def _list_cache_key(self):
+        return (self.azcopy_path, str(plans_directory()))
+
+    def _list_options(self):
+        return {**self.options, 'output-type': 'json'}
+
+    def _index_listing(self, exit_code, output, key, signature):
+        if exit_code != 0:
+            raise Exception("Failed to list jobs")
+        index = JobIndex.from_json(output)
+        job_list_cache.store(key, signature, index)
+        return index
+
+    def list(self, refresh: bool = False):
         """
         List the jobs.
 
+        Listings are cached for AZPYPE_JOBS_TTL seconds (default 10), and for no
+        longer than the plans directory stays unchanged, so repeated queries do not
+        spawn azcopy each time.
+
+        Parameters
+        ----------
+        refresh : bool, optional
+            Ignore the cache and run ``azcopy jobs list``. Default is False.
+
         Returns
         -------
-        tuple
-            A tuple containing the exit code and output of the command execution.
+        JobIndex
+            The jobs, newest first; see ``JobIndex.query`` and ``JobIndex.failed``.
         """
-        args = ['list']
-        return super().execute(args, self.options)
+        key, signature = self._list_cache_key(), _plans_signature(plans_directory())
+        cached = None if refresh else job_list_cache.lookup(key, signature)
+        if cached is not None:
+            return cached
+        exit_code, output = super().execute(['list'], self._list_options())
+        return self._index_listing(exit_code, output, key, signature)
     
+    def transfers(self, job_id: str, status: str):
+        """
+        Stream the transfers of a job that have ``status`` (e.g. 'Failed', 'Success', 'Skipped').
+
+        ``azcopy jobs show --with-status`` is read line by line, so only the entry being
+        parsed is held in memory however many files the job had.
+
+        Raises
+        ------
+        Exception
+            If azcopy cannot show the job.
+        """
+        for line in self.iter_output(['show', job_id], {'with-status': status}):
+            match = _TRANSFER_LINE.match(line)
+            if match:
+                yield JobTransfer(match.group(1), match.group(2), match.group(3))
+        if self.last_exit_code != 0:
+            raise Exception(f"Failed to show transfers of job {job_id}")
+
+    def failed_transfers(self, job_id: str):
+        """
+        Stream the failed transfers of a job; see ``transfers``.
+
+        Yields
+        ------
+        JobTransfer
+            Source, destination and status of each failed transfer.
+        """
+        return self.transfers(job_id, 'Failed')
+
     def _resume_from_run_id(self, run):
         """
         Takes a run ID and returns the corresponding job ID.
 
         Parameters
         ----------
-        run_id : str: Looks like this: 2023-05-26/11-12-32--snowy-dawn-3904/
+        run_id : str: Looks like this: 2023-05-26/11-12-32--1f3a9c0e/ (``Copy(...).run_name``)
         """
-        # With new simplified logging, we need a different approach for job recovery
-        # For now, we'll use the AzCopy job plan location
-        full_path = pathlib.Path("~/.azpype/plans").expanduser()
-    
-        log_file = list(full_path.glob('*.log'))[0]
+        job_id = default_run_index().latest_job(run)
+        if job_id is None:
+            raise ValueError(f"No azcopy job recorded for run {run}")
+        return job_id
 
-        # Check if a log file exists
-        if not log_file:
-            raise FileNotFoundError(f"No log file found in {full_path}")
+    def _forget(self, job_ids=None):
+        job_list_cache.invalidate(self._list_cache_key())
+        default_run_index().forget(job_ids)
 
-        # Return the name without extension
-        return log_file.stem
+    def remove(self, job_id: str):
+        """
+        Remove a job's plan and log files with ``azcopy jobs rm``.
 
+        Returns
+        -------
+        tuple
+            A tuple containing the exit code and output of the command execution.
+        """
+        exit_code, output = super().execute(['rm', job_id], {})
+        if exit_code == 0:
+            self._forget([job_id])
+        return exit_code, output
+
+    def clean(self, with_status: str = None):
+        """
+        Remove the plan and log files of all jobs, or of those with a given status, with ``azcopy jobs clean``.
+
+        Parameters
+        ----------
+        with_status : str, optional
+            Only remove jobs with this status, e.g. 'Completed' or 'Cancelled'. Default is all jobs.
+
+        Returns
+        -------
+        tuple
+            A tuple containing the exit code and output of the command execution.
+        """
+        options, removed = {}, None
+        if with_status:
+            options['with-status'] = with_status
+            removed = [record.job_id for record in self.list(refresh=True).query(with_status)]
+        exit_code, output = super().execute(['clean'], options)
+        if exit_code == 0:
+            self._forget(removed)
+        return exit_code, output
+
+    def prune(self, plans: RetentionPolicy = DEFAULT_RETENTION, logs: RetentionPolicy = DEFAULT_RETENTION, dry_run: bool = False):
+        """
+        Apply retention policies to the job plans and azcopy logs directories.
+
+        Keeping the plans directory small keeps ``jobs list`` and resumes fast. Plans
+        and logs are pruned independently, so logs, which are usually much larger, can
+        be kept for a shorter time. Pass None to leave a directory alone.
+
+        Parameters
+        ----------
+        plans : RetentionPolicy, optional
+            Policy for ~/.azpype/plans. Default keeps up to 1000 jobs of the last 30 days.
+        logs : RetentionPolicy, optional
+            Policy for ~/.azpype/azcopy_logs. Same default.
+        dry_run : bool, optional
+            Only report what would be deleted. Default is False.
+
+        Returns
+        -------
+        dict
+            'plans' and 'logs' mapped to a PruneResult (or None when skipped).
+        """
+        from azpype.log_analyzer import log_directory
+        results = {'plans': None, 'logs': None}
+        if plans is not None:
+            results['plans'] = prune(plans_directory(), plans, dry_run, self.logger)
+            if not dry_run and results['plans'].job_ids:
+                # Jobs without a plan can no longer be listed or resumed
+                self._forget(results['plans'].job_ids)
+        if logs is not None:
+            results['logs'] = prune(log_directory(), logs, dry_run, self.logger)
+        return results
 
     def resume(self, job_id=None, run_id=None):
         """
@@ -56,10 +378,13 @@ class Jobs(BaseCommand):
         if run_id is not None:
             job_id = self._resume_from_run_id(run_id)
         args = ['resume', job_id]
-        return super().execute(args, self.options)
+        try:
+            return super().execute(args, self.options)
+        finally:
+            # The job's status changes without a plan being added
+            job_list_cache.invalidate(self._list_cache_key())
     
-    # TODO: Update this to use stdout_parser    
-    def last_failed(self):
+    def last_failed(self, since=None):
         """
         Return the last failed job.
 
@@ -68,34 +393,18 @@ class Jobs(BaseCommand):
             Notice the failure modes are:
             'Failed', 'Cancelled', 'CompletedwithErrors','CompletedWithFailures','CompletedWithErrorsAndSkipped'
 
+        Parameters
+        ----------
+        since : datetime or timedelta, optional
+            Only consider jobs started at or after this time, or within this period.
+
         Returns
         -------
         str
-            The Job ID of the last failed job.
+            The Job ID of the most recently started failed job, or None.
         """
-        exit_code, output = self.list()
-        if exit_code != 0:
-            raise Exception("Failed to list jobs")
-
-        failure_modes = ['Failed', 'Cancelled', 'CompletedwithErrors','CompletedWithFailures','CompletedWithErrorsAndSkipped']
-
-        # Split the output into lines
-        lines = output.split('\n')
-        
-        current_job_id = None
-        for line in lines:
-            # New job starts
-            if 'JobId' in line:
-                current_job_id = line.split(":")[1].strip()
-
-            # Job Status
-            elif 'Status' in line:
-                current_status = line.split(":")[1].strip()
-                if current_status in failure_modes:
-                    return current_job_id
-
-        # No failed jobs found
-        return None
+        failed = self.list().failed(since)
+        return failed[0].job_id if failed else None
         
     def recover_last_failed(self):
         """
@@ -111,3 +420,67 @@ class Jobs(BaseCommand):
             raise Exception("No failed jobs to recover")
             
         return self.resume(last_failed_job)
+
+
+class AsyncJobs(Jobs):
+    """Jobs whose azcopy invocations are coroutines running on asyncio subprocesses."""
+
+    async def list(self, refresh: bool = False):
+        """
+        List the jobs; cached like ``Jobs.list``.
+
+        Returns
+        -------
+        JobIndex
+            The jobs, newest first.
+        """
+        key, signature = self._list_cache_key(), _plans_signature(plans_directory())
+        cached = None if refresh else job_list_cache.lookup(key, signature)
+        if cached is not None:
+            return cached
+        exit_code, output = await self.execute_async(['list'], self._list_options(), tail_lines=None)
+        return self._index_listing(exit_code, output, key, signature)
+
+    async def resume(self, job_id=None, run_id=None):
+        """
+        Resume a specific job.
+
+        Returns
+        -------
+        tuple
+            A tuple containing the exit code and output of the command execution.
+        """
+        if run_id is not None:
+            job_id = self._resume_from_run_id(run_id)
+        args = ['resume', job_id]
+        try:
+            return await self.execute_async(args, self.options)
+        finally:
+            job_list_cache.invalidate(self._list_cache_key())
+
+    async def last_failed(self, since=None):
+        """
+        Return the last failed job.
+
+        Returns
+        -------
+        str
+            The Job ID of the most recently started failed job, or None.
+        """
+        failed = (await self.list()).failed(since)
+        return failed[0].job_id if failed else None
+
+    async def recover_last_failed(self):
+        """
+        Recover the last failed job by resuming it.
+
+        Returns
+        -------
+        tuple
+            A tuple containing the exit code and output of the command execution.
+        """
+        last_failed_job = await self.last_failed()
+        if last_failed_job is None:
+            raise Exception("No failed jobs to recover")
+
+        return await self.resume(last_failed_job)
@@ -0,0 +1,137 @@
+import json
+from collections import deque
+from .base_command import BaseCommand
+from .stdout_parser import _number, _parse_timestamp
+from azpype.logging_config import CopyLogger
+from azpype.prechecks import check_path_or_url
+from azpype.validators import is_url
+
+# Blob properties requested from azcopy for every entry
+LIST_PROPERTIES = ('LastModifiedTime', 'ContentMD5', 'BlobType', 'BlobAccessTier')
+
+
+class BlobEntry:
+    """One blob (or directory) reported by ``azcopy list``."""
+    __slots__ = ('name', 'size', 'last_modified', 'content_md5', 'blob_type', 'access_tier')
+
+    def __init__(self, name: str, size: int, last_modified, content_md5: str, blob_type: str = None, access_tier: str = None):
+        # Path relative to the listed URL
+        self.name = name
+        # Bytes; None for directories
+        self.size = size
+        # Timezone-aware datetime, or None if azcopy did not report it
+        self.last_modified = last_modified
+        # Base64 Content-MD5 as stored on the blob, or None
+        self.content_md5 = content_md5
+        self.blob_type = blob_type
+        self.access_tier = access_tier
+
+    @classmethod
+    def from_json(cls, content: dict):
+        """Build an entry from the content of a ListObject message."""
+        return cls(
+            content.get('Path'),
+            _number(content.get('ContentLength'), int),
+            _parse_timestamp(content.get('LastModifiedTime')),
+            content.get('ContentMD5') or None,
+            content.get('BlobType') or None,
+            content.get('BlobAccessTier') or None,
+        )
+
+    def __repr__(self):
+        return f"BlobEntry({self.name!r}, size={self.size})"
+
+
+class List(BaseCommand):
+    # azcopy list rejects the transfer tuning flags profiles set for copy and sync
+    profile_flags_from_template = True
+
+    def __init__(self, url: str, sas_token: str = None, profile: str = None, output=None, **options):
+        """
+        Initialize a new instance of the List class.
+
+        Parameters
+        ----------
+        url : str
+            The container or virtual directory to list.
+        sas_token : str, optional
+            SAS token appended to the URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml.
+        output : OutputSink or str, optional
+            Where the configuration is shown: a sink from ``azpype.sinks`` or one of
+            'rich', 'tail', 'summary' and 'quiet'. Defaults to the AZPYPE_OUTPUT
+            environment variable, then 'rich'. Listed entries are never rendered.
+        **options : dict
+            Optional arguments for the list operation. Available options include:
+
+            - properties : str
+                Additional properties to report, separated by ';'. LastModifiedTime,
+                ContentMD5, BlobType and BlobAccessTier are always requested.
+            - log-level : str
+                Define the log verbosity for the log file, available levels: INFO, WARNING, ERROR, and NONE.
+        """
+        super().__init__('list', profile=profile, output=output)
+        self.run_name, self.run_log_directory, self.logger = CopyLogger(self.command_name).get_logger()
+        self.url = f"{url}?{sas_token}" if sas_token else url
+        if not (is_url(self.url) and check_path_or_url(self.url, self.logger)):
+            self.logger.info(f"Invalid options passed to {type(self).__name__} command. Failed checks: ['url']")
+            raise Exception(f"Invalid options passed to {type(self).__name__} command. Failed checks: ['url']")
+        self.options = self.build_flags(options)
+        self.logger.info(f"Preliminary checks passed: {self.run_prechecks()}")
+
+    def _list_options(self):
+        properties = dict.fromkeys(LIST_PROPERTIES)
+        if self.options.get('properties'):
+            properties.update(dict.fromkeys(p.strip() for p in str(self.options['properties']).split(';') if p.strip()))
+        # Sizes in bytes, one JSON message per line
+        return {**self.options, 'properties': ';'.join(properties), 'machine-readable': True, 'output-type': 'json'}
+
+    def execute(self):
+        """
+        List the URL lazily.
+
+        azcopy's JSON output is parsed line by line as it streams, so memory use stays
+        flat however many blobs there are. Nothing runs until the first entry is
+        requested, and closing the generator early stops azcopy.
+
+        Yields
+        ------
+        BlobEntry
+            Name, size, last-modified time and Content-MD5 of each blob.
+
+        Raises
+        ------
+        Exception
+            After the last entry, if azcopy could not list the URL.
+        """
+        url = self.url.split('?')[0]
+        # Messages other than entries; the last ones explain a failure
+        messages = deque(maxlen=10)
+        count, total_bytes = 0, 0
+        for line in self.iter_output([self.url], self._list_options()):
+            if not line.startswith('{'):
+                if line.strip():
+                    messages.append(line.strip())
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if message.get('MessageType') != 'ListObject':
+                if message.get('MessageType') in ('Error', 'Info') and message.get('MessageContent'):
+                    messages.append(str(message['MessageContent']).strip())
+                continue
+            content = message.get('MessageContent')
+            entry = BlobEntry.from_json(json.loads(content) if isinstance(content, str) else content)
+            count += 1
+            total_bytes += entry.size or 0
+            yield entry
+
+        if self.last_exit_code != 0:
+            self.logger.error(f"Listing {url} failed with exit code {self.last_exit_code}: " + " | ".join(messages))
+            raise Exception(f"Failed to list {url}: {messages[-1] if messages else f'exit code {self.last_exit_code}'}")
+        self.logger.info(f"Listed {count} entries ({total_bytes} bytes) under {url}")
+
+    def __iter__(self):
+        return self.execute()
@@ -0,0 +1,193 @@
+import subprocess
+import threading
+from .base_command import BaseCommand
+from .stdout_parser import AzCopyStdoutParser
+from .transfer_command import ResultRecorder
+from azpype.logging_config import CopyLogger
+from azpype.prechecks import check_path_or_url
+from azpype.validators import is_url
+
+# Bytes moved per read or write between Python and azcopy
+DEFAULT_PIPE_CHUNK = 4 * 1024 * 1024
+# Copy flags that apply to a single piped blob; other configured flags (recursive,
+# overwrite=ifSourceNewer, include/exclude filters, ...) have no meaning for a pipe
+PIPE_FLAGS = (
+    'block-size-mb', 'blob-type', 'block-blob-tier', 'metadata', 'content-type', 'content-encoding',
+    'content-disposition', 'cache-control', 'put-md5', 'check-md5', 'cap-mbps', 'log-level', 'blob-tags',
+)
+
+
+def iter_chunks(data, chunk_size: int = DEFAULT_PIPE_CHUNK):
+    """
+    Yield ``data`` as bytes chunks of at most ``chunk_size``.
+
+    Parameters
+    ----------
+    data : bytes, file-like or iterable
+        A bytes-like object, an object with ``read(n)``, or an iterable of bytes
+        (or str, encoded as UTF-8) chunks, such as a generator.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+        return
+    if hasattr(data, 'read'):
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+    for chunk in data:
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+class PipeCopy(ResultRecorder, BaseCommand):
+    """
+    ``azcopy copy`` between a single blob and this process, with ``--from-to=PipeBlob``
+    (upload from stdin) or ``--from-to=BlobPipe`` (download to stdout).
+
+    Nothing is staged on disk. Pipes give backpressure both ways: a writer blocks while
+    azcopy is busy, and azcopy blocks until the reader takes the next chunk. Use it
+    through ``Copy.from_stream`` and ``Copy.to_stream``.
+    """
+
+    def __init__(self, url: str, from_to: str, sas_token: str = None, profile: str = None, output=None, **options):
+        """
+        Parameters
+        ----------
+        url : str
+            The blob to write or read.
+        from_to : str
+            'PipeBlob' to upload from stdin or 'BlobPipe' to download to stdout.
+        sas_token : str, optional
+            SAS token appended to the blob URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml.
+        output : OutputSink or str, optional
+            Where the configuration, azcopy's output and the result are shown; see ``Copy``.
+        **options : dict
+            Copy flags; only those in PIPE_FLAGS, and ``overwrite`` when it is true or
+            false, are passed on.
+        """
+        super().__init__('copy', profile=profile, output=output)
+        self.run_name, self.run_log_directory, self.logger = CopyLogger(self.command_name).get_logger()
+        self.logger.info(f"Starting {from_to} {self.command_name} operation")
+        self.url = f"{url}?{sas_token}" if sas_token else url
+        if not (is_url(self.url) and check_path_or_url(self.url, self.logger)):
+            self.logger.info(f"Invalid options passed to {type(self).__name__} command. Failed checks: ['url']")
+            raise Exception(f"Invalid options passed to {type(self).__name__} command. Failed checks: ['url']")
+        flags = self.build_flags(options)
+        self.options = {k: v for k, v in flags.items() if k in PIPE_FLAGS}
+        if str(flags.get('overwrite')).lower() in ('true', 'false'):
+            self.options['overwrite'] = flags['overwrite']
+        self.options['from-to'] = from_to
+        self.logger.info(f"Preliminary checks passed: {self.run_prechecks()}")
+
+    def upload(self, data, chunk_size: int = DEFAULT_PIPE_CHUNK):
+        """
+        Send ``data`` to the blob through azcopy's stdin.
+
+        A writer thread feeds the pipe while this thread reads azcopy's output, so
+        neither side can deadlock on a full pipe. If reading ``data`` fails, azcopy is
+        killed before it commits the blob and the error is raised.
+
+        Returns
+        -------
+        AzCopyStdoutParser
+            The parsed output of azcopy, with ``exit_code`` set.
+        """
+        args = [self.url]
+        command = self.build_command(args, self.options)
+        with self.timings.phase('render'):
+            run = self.output.open(self, args, self.options)
+        exit_code, stdout = None, None
+        try:
+            with self.timings.phase('spawn'):
+                process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=self._process_env())
+            errors = []
+
+            def _feed():
+                try:
+                    for chunk in iter_chunks(data, chunk_size):
+                        process.stdin.write(chunk)
+                except BrokenPipeError:
+                    # azcopy exited early; its exit code and output say why
+                    pass
+                except BaseException as e:
+                    errors.append(e)
+                    process.kill()
+                finally:
+                    try:
+                        process.stdin.close()
+                    except OSError:
+                        pass
+
+            writer = threading.Thread(target=_feed, name='azpype-pipe-writer', daemon=True)
+            with self.timings.phase('transfer'):
+                writer.start()
+                stdout = process.stdout.read().decode('utf-8', errors='replace')
+                process.stdout.close()
+                exit_code = process.wait()
+                writer.join()
+            if errors:
+                self.logger.error(f"Reading the upload stream failed: {errors[0]!r}")
+                raise errors[0]
+
+            with self.timings.phase('logging'):
+                self._log_execution(self.logger.info if exit_code == 0 else self.logger.error,
+                                    "COMMAND EXECUTION (PIPE)", command, exit_code, stdout, None)
+        finally:
+            with self.timings.phase('render'):
+                run.finish(exit_code, stdout)
+        with self.timings.phase('parse'):
+            parsed = AzCopyStdoutParser(stdout)
+        parsed.exit_code = exit_code
+        parsed.raw_stdout = stdout
+        return self._record(parsed)
+
+    def download(self, chunk_size: int = DEFAULT_PIPE_CHUNK):
+        """
+        Yield the blob's bytes from azcopy's stdout in chunks of up to ``chunk_size``.
+
+        Raises
+        ------
+        Exception
+            After the last chunk, if azcopy exited with an error. Closing the generator
+            early stops azcopy.
+        """
+        args = [self.url]
+        command = self.build_command(args, self.options)
+        with self.timings.phase('render'):
+            run = self.output.open(self, args, self.options)
+        exit_code, stderr = None, ''
+        try:
+            with self.timings.phase('spawn'):
+                process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=self._process_env())
+            messages = []
+            # azcopy's own messages go to stderr; drain it so it can never fill up
+            reader = threading.Thread(target=lambda: messages.append(process.stderr.read()), name='azpype-pipe-stderr', daemon=True)
+            reader.start()
+            try:
+                while True:
+                    chunk = process.stdout.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+                exit_code = process.wait()
+            finally:
+                # Also reached when the consumer closes the generator early
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                # Closed before joining the reader so nothing is left blocked writing to it
+                process.stdout.close()
+                reader.join()
+                process.stderr.close()
+                stderr = b''.join(messages).decode('utf-8', errors='replace')
+                self._log_execution(self.logger.info if exit_code == 0 else self.logger.error,
+                                    "COMMAND EXECUTION (PIPE)", command, exit_code, None, stderr)
+        finally:
+            run.finish(exit_code, None, stderr)
+        if exit_code != 0:
+            raise Exception(f"azcopy exited with code {exit_code} while streaming {self.url.split('?')[0]}: {stderr.strip()}")
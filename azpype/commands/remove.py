@@ -0,0 +1,134 @@
+from contextlib import contextmanager
+from .transfer_command import TransferCommand, list_of_files
+from .jobs import Jobs
+from azpype.prechecks import check_path_or_url
+from azpype.validators import is_url
+
+
+class Remove(TransferCommand):
+    # azcopy remove rejects the transfer tuning flags profiles set for copy and sync
+    profile_flags_from_template = True
+
+    def __init__(self, target: str, sas_token: str = None, profile: str = None, retry_policy=None, output=None, **options):
+        """
+        Initialize a new instance of the Remove class.
+
+        Parameters
+        ----------
+        target : str
+            URL of the blob, virtual directory or container to remove from.
+        sas_token : str, optional
+            SAS token appended to the target URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml whose flags and environment
+            variables apply to this removal. Defaults to the AZPYPE_PROFILE environment variable.
+        retry_policy : RetryPolicy, optional
+            Governs how often a failed removal is retried. Retries resume the azcopy job, so
+            only the blobs that were not removed are attempted again. Default is RetryPolicy().
+        output : OutputSink or str, optional
+            Where the configuration, azcopy's output and the result are shown: a sink from
+            ``azpype.sinks`` or one of 'rich', 'tail', 'summary' and 'quiet'. Defaults to
+            the AZPYPE_OUTPUT environment variable, then 'rich'.
+        **options : dict
+            Optional arguments for the remove operation. Available options include:
+
+            - dry-run : bool
+                Prints the paths that would be removed by this command without removing them.
+            - exclude-path : str
+                Exclude these paths when removing. This option doesn't support wildcard characters (*). Checks relative path prefix.
+            - exclude-pattern : str
+                Exclude these files when removing. This option supports wildcard characters (*).
+            - include-path : str
+                Include only these paths when removing. This option doesn't support wildcard characters (*). Checks relative path prefix.
+            - include-pattern : str
+                Include only these files when removing. This option supports wildcard characters (*). Separate files by using a ';'.
+            - list-of-files : str
+                A file listing the paths, relative to the target, to remove; see also ``execute(paths=...)``.
+            - log-level : str
+                Define the log verbosity for the log file, available levels: INFO, WARNING, ERROR, and NONE.
+            - recursive : bool
+                Look into sub-directories recursively when removing.
+        """
+        super().__init__('remove', target, None, profile=profile, retry_policy=retry_policy, output=output, source_sas_token=sas_token, **options)
+
+    @property
+    def target(self) -> str:
+        return self.source
+
+    def prevalidation(self):
+        if is_url(self.source) and check_path_or_url(self.source, self.logger):
+            return True, []
+        return False, ['target']
+
+    def execute(self, paths=None, stream: bool = False, on_output=None, **overrides):
+        """
+        Remove the target, or only the given paths under it.
+
+        Parameters
+        ----------
+        paths : iterable of str, optional
+            Paths relative to the target to remove with a single azcopy invocation via
+            ``--list-of-files``. Any iterable works, e.g. names streamed from ``List``;
+            they are written to the list file as they are consumed. azcopy is not
+            launched when ``paths`` is empty.
+        stream : bool, optional
+            Read azcopy output line by line while it runs instead of buffering it.
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        **overrides : dict
+            Flags replacing this removal's options for this invocation only, e.g.
+            ``include_pattern='*.tmp'``.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result, with the number of retries in .retries.
+        """
+        with self._invocation(paths, overrides) as options:
+            if options is None:
+                return self._empty_result()
+            return self._run([self.source], options, stream, on_output)
+
+    @contextmanager
+    def _invocation(self, paths, overrides: dict):
+        """Options for one removal, with ``paths`` in a list file; None when there is nothing to remove."""
+        options = {**self.options, **{k.replace('_', '-'): v for k, v in overrides.items() if v is not None}}
+        if paths is None:
+            yield options
+            return
+        with list_of_files(paths) as (list_path, count):
+            if count == 0:
+                self.logger.info("No paths to remove; skipping azcopy")
+                yield None
+                return
+            self.logger.info(f"Removing {count} paths under {self.source.split('?')[0]}")
+            options['list-of-files'] = list_path
+            yield options
+
+    def _retry_invocation(self, parsed, args: list, options: dict):
+        """Resume the azcopy job so only the blobs that were not removed are attempted again."""
+        if not parsed.job_id:
+            self.logger.info("Remove failed before a job was created; nothing to resume")
+            return None
+        jobs = self._resume_command(Jobs, options)
+        return jobs, ['resume', parsed.job_id], jobs.options
+
+
+class AsyncRemove(Remove):
+    """Remove whose ``execute`` is a coroutine running azcopy on an asyncio subprocess; see AsyncCopy."""
+
+    async def execute(self, paths=None, on_output=None, **overrides):
+        """
+        Remove the target, or only the given paths under it, on an asyncio subprocess.
+
+        Parameters are as for ``Remove.execute``; output is always streamed.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result; .stdout and .raw_stdout hold the tail of the output.
+        """
+        with self._invocation(paths, overrides) as options:
+            if options is None:
+                return self._empty_result()
+            return await self._run_async([self.source], options, on_output)
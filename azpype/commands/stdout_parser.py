@@ -1,57 +1,107 @@
-from rich.console import Console
-from rich.table import Table
+import json
+import re
+from datetime import datetime
+from azpype.metrics import PhaseTimings
 
-class AzCopyStdoutParser(object):
-    def __init__(self, stdout):
-        self.stdout = stdout
-        self.job_id = None
-        self.total_bytes_transferred = None
-        self.final_job_status = None
-        self.elapsed_time = None
-        self.number_of_file_transfers = None
-        self.number_of_folder_property_transfers = None
-        self.number_of_symlink_transfers = None
-        self.total_number_of_transfers = None
-        self.number_of_file_transfers_completed = None
-        self.number_of_folder_transfers_completed = None
-        self.number_of_file_transfers_failed = None
-        self.number_of_folder_transfers_failed = None
-        self.number_of_file_transfers_skipped = None
-        self.number_of_folder_transfers_skipped = None
+# Summary line label -> (attribute, type) for the text output of azcopy
+SUMMARY_FIELDS = {
+    "TotalBytesTransferred": ("total_bytes_transferred", int),
+    "Final Job Status": ("final_job_status", str),
+    "Elapsed Time (Minutes)": ("elapsed_time", float),
+    "Number of File Transfers": ("number_of_file_transfers", int),
+    "Number of Folder Property Transfers": ("number_of_folder_property_transfers", int),
+    "Number of Symlink Transfers": ("number_of_symlink_transfers", int),
+    "Total Number of Transfers": ("total_number_of_transfers", int),
+    "Number of File Transfers Completed": ("number_of_file_transfers_completed", int),
+    "Number of Folder Transfers Completed": ("number_of_folder_transfers_completed", int),
+    "Number of File Transfers Failed": ("number_of_file_transfers_failed", int),
+    "Number of Folder Transfers Failed": ("number_of_folder_transfers_failed", int),
+    "Number of File Transfers Skipped": ("number_of_file_transfers_skipped", int),
+    "Number of Folder Transfers Skipped": ("number_of_folder_transfers_skipped", int),
+}
 
-        self._parse_stdout()
+# ListJobSummaryResponse key -> (attribute, type) for the JSON output of azcopy
+JSON_SUMMARY_FIELDS = {
+    "JobID": ("job_id", str),
+    "TotalBytesTransferred": ("total_bytes_transferred", int),
+    "FileTransfers": ("number_of_file_transfers", int),
+    "FolderPropertyTransfers": ("number_of_folder_property_transfers", int),
+    "SymlinkTransfers": ("number_of_symlink_transfers", int),
+    "TotalTransfers": ("total_number_of_transfers", int),
+    "TransfersCompleted": ("number_of_file_transfers_completed", int),
+    "FoldersCompleted": ("number_of_folder_transfers_completed", int),
+    "TransfersFailed": ("number_of_file_transfers_failed", int),
+    "FoldersFailed": ("number_of_folder_transfers_failed", int),
+    "TransfersSkipped": ("number_of_file_transfers_skipped", int),
+    "FoldersSkipped": ("number_of_folder_transfers_skipped", int),
+}
 
-    def _parse_stdout(self):
-        lines = self.stdout.split('\n')
-        for line in lines:
-            self._general_extract(line)
+_FRACTION = re.compile(r"\.(\d{6})\d+")
+
+# Final job statuses from best to worst, for combining several jobs into one result
+_STATUS_ORDER = (
+    "Completed", "CompletedWithSkipped", "CompletedWithErrors",
+    "CompletedWithErrorsAndSkipped", "Cancelled", "Failed",
+)
+
+
+def _status_rank(status: str) -> int:
+    try:
+        return _STATUS_ORDER.index(status)
+    except ValueError:
+        return len(_STATUS_ORDER)
 
-    def _general_extract(self, line):
-        extract_info = {
-            "Job": {"attr": "job_id", "type": str},
-            "TotalBytesTransferred:": {"attr": "total_bytes_transferred", "type": int},
-            "Final Job Status:": {"attr": "final_job_status", "type": str},
-            "Elapsed Time (Minutes):": {"attr": "elapsed_time", "type": float},
-            "Number of File Transfers:": {"attr": "number_of_file_transfers", "type": int},
-            "Number of Folder Property Transfers:": {"attr": "number_of_folder_property_transfers", "type": int},
-            "Number of Symlink Transfers:": {"attr": "number_of_symlink_transfers", "type": int},
-            "Total Number of Transfers:": {"attr": "total_number_of_transfers", "type": int},
-            "Number of File Transfers Completed:": {"attr": "number_of_file_transfers_completed", "type": int},
-            "Number of Folder Transfers Completed:": {"attr": "number_of_folder_transfers_completed", "type": int},
-            "Number of File Transfers Failed:": {"attr": "number_of_file_transfers_failed", "type": int},
-            "Number of Folder Transfers Failed:": {"attr": "number_of_folder_transfers_failed", "type": int},
-            "Number of File Transfers Skipped:": {"attr": "number_of_file_transfers_skipped", "type": int},
-            "Number of Folder Transfers Skipped:": {"attr": "number_of_folder_transfers_skipped", "type": int}
-        }
-
-        for key, info in extract_info.items():
-            if key in line:
-                attr = info["attr"]
-                value = line.split(":")[1].strip() if ":" in line else line.split()[1]
-                setattr(self, attr, info["type"](value))
+
+def _parse_timestamp(value):
+    """Parse an RFC3339 timestamp as emitted by Go, which may carry nanoseconds."""
+    if not value:
+        return None
+    value = _FRACTION.sub(r".\1", value).replace("Z", "+00:00")
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _number(value, cast=float):
+    """azcopy serialises most counters as JSON strings; accept either form."""
+    if value in (None, ""):
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TransferSummary(object):
+    """Shared presentation for parsed transfer results."""
+    __slots__ = ()
+
+    @property
+    def elapsed_seconds(self):
+        """Job duration reported by azcopy, in seconds."""
+        if self.elapsed_time is None:
+            return None
+        return self.elapsed_time * 60
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Average transfer rate of the job; 0.0 when it reported no duration."""
+        if not self.elapsed_seconds:
+            return 0.0
+        return (self.total_bytes_transferred or 0) / self.elapsed_seconds
+
+    @property
+    def files_per_second(self) -> float:
+        """Average rate of completed file transfers; 0.0 when the job reported no duration."""
+        if not self.elapsed_seconds:
+            return 0.0
+        return (self.number_of_file_transfers_completed or 0) / self.elapsed_seconds
 
     def summary(self) -> str:
         """Return Rich-formatted summary of the transfer operation."""
+        from rich.console import Console
+        from rich.table import Table
         console = Console()
         
         # Determine status icon and color
@@ -93,3 +143,243 @@ class AzCopyStdoutParser(object):
             console.print(table)
         
         return capture.get()
+
+
+class AzCopyStdoutParser(TransferSummary):
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.job_id = None
+        self.total_bytes_transferred = None
+        self.final_job_status = None
+        self.elapsed_time = None
+        self.number_of_file_transfers = None
+        self.number_of_folder_property_transfers = None
+        self.number_of_symlink_transfers = None
+        self.total_number_of_transfers = None
+        self.number_of_file_transfers_completed = None
+        self.number_of_folder_transfers_completed = None
+        self.number_of_file_transfers_failed = None
+        self.number_of_folder_transfers_failed = None
+        self.number_of_file_transfers_skipped = None
+        self.number_of_folder_transfers_skipped = None
+        self.timings = None
+
+        self._parse_stdout()
+
+    def _parse_stdout(self):
+        lines = self.stdout.split('\n')
+        for line in lines:
+            self._general_extract(line)
+
+    def feed(self, line):
+        """Parse a single line of output, for use while a command is still streaming."""
+        self._general_extract(line)
+
+    @classmethod
+    def merge(cls, results: list):
+        """
+        Combine the results of several azcopy jobs that together make up one transfer.
+
+        Counters are summed, the elapsed time is that of the slowest job, and the
+        final status and exit code are the worst among the jobs. The individual
+        results are kept in ``.parts`` and their job ids in ``.job_ids``.
+
+        Parameters
+        ----------
+        results : list
+            AzCopyStdoutParser or AzCopyJsonParser objects.
+
+        Returns
+        -------
+        AzCopyStdoutParser
+            The combined result.
+        """
+        merged = cls('')
+        merged.parts = list(results)
+        merged.job_ids = [r.job_id for r in results if r.job_id]
+        for attr, cast in SUMMARY_FIELDS.values():
+            if cast is int:
+                values = [getattr(r, attr) for r in results if getattr(r, attr) is not None]
+                setattr(merged, attr, sum(values) if values else None)
+        elapsed = [r.elapsed_time for r in results if r.elapsed_time is not None]
+        merged.elapsed_time = max(elapsed) if elapsed else None
+        statuses = [r.final_job_status for r in results if r.final_job_status]
+        merged.final_job_status = max(statuses, key=_status_rank) if statuses else None
+        exit_codes = [getattr(r, 'exit_code', 0) for r in results]
+        merged.exit_code = next((code for code in exit_codes if code != 0), 0)
+        merged.raw_stdout = "\n".join(getattr(r, 'raw_stdout', r.stdout) or '' for r in results)
+        merged.retries = sum(getattr(r, 'retries', 0) for r in results)
+        merged.timings = PhaseTimings()
+        for r in results:
+            if r.timings is not None:
+                merged.timings.add(r.timings)
+        return merged
+
+    def _general_extract(self, line):
+        line = line.strip()
+        label, sep, value = line.partition(":")
+        if sep:
+            field = SUMMARY_FIELDS.get(label)
+            if field is not None:
+                attr, cast = field
+                value = value.strip()
+                if value:
+                    setattr(self, attr, cast(value))
+                return
+        # "Job <id> has started" / "Job <id> summary"
+        if line.startswith("Job "):
+            parts = line.split()
+            if len(parts) > 2:
+                self.job_id = parts[1]
+
+
+class ProgressSnapshot(object):
+    """
+    A point-in-time view of a running azcopy job, decoded from a JSON Progress message.
+
+    ``throughput_mbps`` is derived from the bytes sent over the wire since the
+    previous snapshot, matching the "2-sec Throughput (Mb/s)" figure of the text output.
+    """
+    __slots__ = (
+        "timestamp", "job_id", "job_status", "percent_complete",
+        "total_transfers", "transfers_completed", "transfers_failed", "transfers_skipped",
+        "bytes_over_wire", "total_bytes_transferred", "total_bytes_expected",
+        "average_iops", "server_busy_percentage", "network_error_percentage",
+        "throughput_mbps",
+    )
+
+    def __init__(self, content: dict, timestamp=None, previous=None):
+        self.timestamp = timestamp
+        self.job_id = content.get("JobID")
+        self.job_status = content.get("JobStatus")
+        self.percent_complete = _number(content.get("PercentComplete"))
+        self.total_transfers = _number(content.get("TotalTransfers"), int)
+        self.transfers_completed = _number(content.get("TransfersCompleted"), int)
+        self.transfers_failed = _number(content.get("TransfersFailed"), int)
+        self.transfers_skipped = _number(content.get("TransfersSkipped"), int)
+        self.bytes_over_wire = _number(content.get("BytesOverWire"), int)
+        self.total_bytes_transferred = _number(content.get("TotalBytesTransferred"), int)
+        self.total_bytes_expected = _number(content.get("TotalBytesExpected"), int)
+        self.average_iops = _number(content.get("AverageIOPS"))
+        self.server_busy_percentage = _number(content.get("ServerBusyPercentage"))
+        self.network_error_percentage = _number(content.get("NetworkErrorPercentage"))
+        self.throughput_mbps = None
+        if previous is not None and previous.timestamp and self.timestamp:
+            seconds = (self.timestamp - previous.timestamp).total_seconds()
+            if seconds > 0 and self.bytes_over_wire is not None and previous.bytes_over_wire is not None:
+                self.throughput_mbps = (self.bytes_over_wire - previous.bytes_over_wire) * 8 / 1_000_000 / seconds
+
+    def __repr__(self):
+        return (f"ProgressSnapshot(job_id={self.job_id!r}, percent_complete={self.percent_complete}, "
+                f"transfers_completed={self.transfers_completed}, throughput_mbps={self.throughput_mbps})")
+
+
+class AzCopyJsonParser(TransferSummary):
+    """
+    Parser for azcopy's ``--output-type=json`` message stream.
+
+    Each line is decoded once and dispatched on its MessageType (Init, Progress,
+    EndOfJob, Error). Exposes the same result attributes as AzCopyStdoutParser,
+    plus the latest ProgressSnapshot and any error messages.
+    """
+    __slots__ = (
+        "stdout", "raw_stdout", "exit_code",
+        "job_id", "total_bytes_transferred", "final_job_status", "elapsed_time",
+        "number_of_file_transfers", "number_of_folder_property_transfers", "number_of_symlink_transfers",
+        "total_number_of_transfers",
+        "number_of_file_transfers_completed", "number_of_folder_transfers_completed",
+        "number_of_file_transfers_failed", "number_of_folder_transfers_failed",
+        "number_of_file_transfers_skipped", "number_of_folder_transfers_skipped",
+        "log_file_location", "progress", "errors", "started_at", "finished_at", "retries", "timings",
+    )
+
+    def __init__(self, stdout=""):
+        self.stdout = stdout
+        self.raw_stdout = stdout
+        self.exit_code = None
+        self.job_id = None
+        self.total_bytes_transferred = None
+        self.final_job_status = None
+        self.elapsed_time = None
+        self.number_of_file_transfers = None
+        self.number_of_folder_property_transfers = None
+        self.number_of_symlink_transfers = None
+        self.total_number_of_transfers = None
+        self.number_of_file_transfers_completed = None
+        self.number_of_folder_transfers_completed = None
+        self.number_of_file_transfers_failed = None
+        self.number_of_folder_transfers_failed = None
+        self.number_of_file_transfers_skipped = None
+        self.number_of_folder_transfers_skipped = None
+        self.log_file_location = None
+        self.progress = None
+        self.errors = []
+        self.started_at = None
+        self.finished_at = None
+        self.retries = 0
+        self.timings = None
+
+        for line in stdout.split('\n'):
+            self.feed(line)
+
+    def feed(self, line):
+        """
+        Decode one JSON message.
+
+        Returns
+        -------
+        ProgressSnapshot or None
+            The new snapshot if the line was a Progress message.
+        """
+        line = line.strip()
+        if not line.startswith("{"):
+            return None
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return None
+
+        message_type = message.get("MessageType")
+        content = message.get("MessageContent")
+        timestamp = _parse_timestamp(message.get("TimeStamp"))
+        if self.started_at is None:
+            self.started_at = timestamp
+
+        if message_type == "Error":
+            self.errors.append(content)
+            return None
+        if message_type not in ("Init", "Progress", "EndOfJob"):
+            return None
+
+        if isinstance(content, str):
+            try:
+                content = json.loads(content)
+            except ValueError:
+                # EndOfJob may carry a plain message, e.g. when the job failed to start
+                if message_type == "EndOfJob" and content:
+                    self.errors.append(content)
+                return None
+        if not isinstance(content, dict):
+            return None
+
+        if message_type == "Init":
+            self.job_id = content.get("JobID", self.job_id)
+            self.log_file_location = content.get("LogFileLocation")
+            return None
+
+        self._apply_summary(content)
+        if message_type == "Progress":
+            self.progress = ProgressSnapshot(content, timestamp, self.progress)
+            return self.progress
+
+        self.final_job_status = content.get("JobStatus", self.final_job_status)
+        self.finished_at = timestamp
+        if self.started_at and self.finished_at:
+            self.elapsed_time = round((self.finished_at - self.started_at).total_seconds() / 60, 4)
+        return None
+
+    def _apply_summary(self, content):
+        for key, (attr, cast) in JSON_SUMMARY_FIELDS.items():
+            value = content.get(key)
+            if value not in (None, ""):
+                setattr(self, attr, _number(value, cast) if cast is not str else value)
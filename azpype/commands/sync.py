@@ -0,0 +1,132 @@
+from pathlib import Path
+from .transfer_command import TransferCommand
+
+
+class Sync(TransferCommand):
+    def __init__(self, source: str, destination: str, sas_token: str = None, profile: str = None, retry_policy=None, output=None, source_sas_token: str = None, **options):
+        """
+        Initialize a new instance of the Sync class.
+
+        Parameters
+        ----------
+        source : str
+            The source URL or path for the sync operation.
+        destination : str
+            The destination URL or path for the sync operation.
+        sas_token : str, optional
+            SAS token appended to the destination URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml whose flags and environment
+            variables apply to this sync. Defaults to the AZPYPE_PROFILE environment variable.
+        retry_policy : RetryPolicy, optional
+            Governs how often a failed sync is retried. azcopy cannot resume sync jobs,
+            so a retry runs the sync again; files already in place are skipped by its
+            comparison. Default is RetryPolicy().
+        output : OutputSink or str, optional
+            Where the configuration, azcopy's output and the result are shown: a sink from
+            ``azpype.sinks`` or one of 'rich', 'tail', 'summary' and 'quiet'. Defaults to
+            the AZPYPE_OUTPUT environment variable, then 'rich'.
+        source_sas_token : str, optional
+            SAS token appended to the source URL (without the leading '?'). Each endpoint of
+            a URL-to-URL (service-to-service) transfer takes its own token.
+        **options : dict
+            Optional arguments for the sync operation. Available options include:
+
+            - block-size-mb : float
+                Use this block size (specified in MiB) when uploading to Azure Storage, and downloading from Azure Storage.
+            - compare-hash : str
+                Compare files by hash when their last modified times differ. Possible values include 'None' and 'MD5'. (default: "None")
+            - delete-destination : str
+                Delete extra files from the destination that are not present at the source. Possible values include 'true', 'false', and 'prompt'. (default: "false")
+            - dry-run : bool
+                Prints the file paths that would be synced by this command. This flag doesn't sync the actual files.
+            - exclude-path : str
+                Exclude these paths when syncing. Checks relative path prefix.
+            - exclude-pattern : str
+                Exclude these files when syncing. This option supports wildcard characters (*).
+            - include-pattern : str
+                Include only these files when syncing. This option supports wildcard characters (*).
+            - log-level : str
+                Define the log verbosity for the log file, available levels: INFO, WARNING, ERROR, and NONE. (default: "INFO")
+            - mirror-mode : bool
+                Disable last-modified-time based comparison and overwrite the conflicting files and blobs at the destination.
+            - put-md5 : bool
+                Create an MD5 hash of each file, and save the hash as the Content-MD5 property of the destination blob or file. Only available when uploading.
+            - recursive : bool
+                Look into subdirectories recursively when syncing between directories. (default: True)
+
+        """
+        super().__init__('sync', source, destination, sas_token=sas_token, profile=profile, retry_policy=retry_policy, output=output, source_sas_token=source_sas_token, **options)
+
+    def execute(self, stream: bool = False, on_output=None, on_progress=None, skip_unchanged: bool = False, index=None):
+        """
+        Execute the sync command with the given source, destination, and options.
+
+        Parameters
+        ----------
+        stream : bool, optional
+            Read azcopy output line by line while it runs instead of buffering it.
+            Implied when ``on_output`` or ``on_progress`` is given.
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        on_progress : callable, optional
+            Called with a ProgressSnapshot for every progress message. Switches the
+            run to ``--output-type=json``.
+        skip_unchanged : bool, optional
+            Compare a local source against the transfer index before launching azcopy,
+            and skip the sync entirely when no file was added, modified or (with
+            ``delete-destination``) removed since the last successful sync. Only
+            changes made through azpype are known to the index, so leave this off if
+            the destination may be modified by other means. Default is False.
+        index : TransferIndex, optional
+            Index used by ``skip_unchanged``. Default is the one at ~/.azpype/transfer_index.db.
+            Sync keeps its records apart from those of ``Copy.execute_delta``.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result. A skipped sync reports status 'Completed' with zero transfers.
+        """
+        if not skip_unchanged:
+            return super().execute(stream=stream, on_output=on_output, on_progress=on_progress)
+
+        from azpype.transfer_index import TransferIndex
+        if not Path(self.source).is_dir():
+            raise ValueError(f"skip_unchanged requires a local source directory, got: {self.source}")
+        index = index or TransferIndex()
+        deletes = str(self.options.get('delete-destination', 'false')).lower() == 'true'
+        use_hash = str(self.options.get('compare-hash', 'None')).upper() == 'MD5'
+
+        # Kept apart from Copy.execute_delta's records: a file copied there was never compared by sync
+        with index.diff(self.source, self.destination, use_hash=use_hash, namespace=self.command_name) as delta:
+            if not delta.changed and not (deletes and delta.deleted):
+                self.logger.info("No files changed since the last sync; skipping azcopy")
+                return self._empty_result()
+
+            result = super().execute(stream=stream, on_output=on_output, on_progress=on_progress)
+            if result.exit_code == 0 and not self.options.get('dry-run'):
+                delta.commit(include_deleted=deletes)
+            return result
+
+
+class AsyncSync(Sync):
+    """Sync whose ``execute`` is a coroutine running azcopy on an asyncio subprocess; see AsyncCopy."""
+
+    async def execute(self, on_output=None, on_progress=None):
+        """
+        Run the sync on an asyncio subprocess, streaming its output.
+
+        Parameters
+        ----------
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        on_progress : callable, optional
+            Called with a ProgressSnapshot for every progress message. Switches the
+            run to ``--output-type=json``.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result; .stdout and .raw_stdout hold the tail of the output.
+        """
+        return await self._run_async([self.source, self.destination], self._run_options(on_progress), on_output, on_progress)
@@ -0,0 +1,308 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from .base_command import BaseCommand
+from .stdout_parser import AzCopyStdoutParser, AzCopyJsonParser
+from azpype.logging_config import CopyLogger
+from azpype.prechecks import check_path_or_url
+from azpype.validators import validate_transfer_pair
+from azpype.metrics import export
+from azpype.housekeeping import default_run_index
+
+
+@contextmanager
+def list_of_files(paths):
+    """
+    Write ``paths`` to a temporary file for azcopy's ``--list-of-files``, one per line.
+
+    Yields
+    ------
+    tuple
+        The file's path and the number of paths written. The file is removed afterwards.
+    """
+    count = 0
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', prefix='azpype-list-', delete=False, encoding='utf-8') as f:
+        for path in paths:
+            f.write(Path(path).as_posix() + '\n')
+            count += 1
+        list_path = f.name
+    try:
+        yield list_path, count
+    finally:
+        os.remove(list_path)
+
+
+class ResultRecorder:
+    """
+    Hands a finished run's result to the run index, the output sink and the metrics
+    exporters. Used by commands that produce a transfer result; they provide
+    ``run_name``, ``timings``, ``output``, ``logger`` and ``command_name``.
+    """
+
+    def _record(self, parsed):
+        """Attach the phase timings to a finished run's result and hand it to the output sink and the metrics exporters."""
+        parsed.timings = self.timings.copy()
+        self._remember_jobs(getattr(parsed, 'job_ids', None) or [parsed.job_id])
+        self.output.result(self, parsed)
+        export(self.command_name, parsed, self.logger)
+        return parsed
+
+    def _remember_jobs(self, job_ids: list):
+        """Map this run's name to the jobs it started, so ``Jobs.resume(run_id=...)`` is a lookup."""
+        job_ids = [job_id for job_id in job_ids if job_id]
+        if not job_ids:
+            return
+        try:
+            default_run_index().record(self.run_name, job_ids)
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"Could not record jobs {', '.join(job_ids)} of run {self.run_name}: {e}")
+
+
+class TransferCommand(ResultRecorder, BaseCommand):
+    """
+    Shared plumbing of the azcopy commands that move data from a source to a
+    destination: SAS handling, validation, flag resolution, output parsing and retries.
+    """
+
+    # Timings of the construction phases, taken when the first run starts
+    _setup_timings = None
+
+    def __init__(self, command_name: str, source: str, destination: str, sas_token: str = None, profile: str = None, retry_policy=None, output=None, source_sas_token: str = None, **options):
+        """
+        Validate the endpoints and resolve the flags of a source-to-destination command.
+
+        Parameters
+        ----------
+        command_name : str
+            The azcopy command, e.g. 'copy' or 'sync'.
+        source : str
+            The source URL or path.
+        destination : str
+            The destination URL or path.
+        sas_token : str, optional
+            SAS token appended to the destination URL (without the leading '?').
+        profile : str, optional
+            Name of a tuning profile in ~/.azpype/profiles.yaml.
+        retry_policy : RetryPolicy, optional
+            Governs how often a failed command is retried. Default is RetryPolicy().
+        output : OutputSink or str, optional
+            Where the configuration, azcopy's output and the result are shown: a sink from
+            ``azpype.sinks`` or one of 'rich', 'tail', 'summary' and 'quiet'. Defaults to
+            the AZPYPE_OUTPUT environment variable, then 'rich'.
+        source_sas_token : str, optional
+            SAS token appended to the source URL (without the leading '?'), for
+            downloads and service-to-service copies between URLs.
+        **options : dict
+            Flags for the command; underscores are converted to hyphens.
+        """
+        super().__init__(command_name, retry_policy=retry_policy, profile=profile, output=output)
+        self.run_name, self.run_log_directory, self.logger = CopyLogger(self.command_name).get_logger()
+        self.logger.info(f"Starting {self.command_name} operation")
+
+        self.source_sas_token = source_sas_token
+        self.source = f"{source}?{source_sas_token}" if source_sas_token else source
+        self.sas_token = sas_token
+        if self.sas_token:
+            self.destination = f"{destination}?{self.sas_token}"
+        else:
+            self.destination = destination
+        valid, failed_checks = self.prevalidation()
+        if valid:
+            self.options = self.build_flags(options)
+        else:
+            self.logger.info(f"Invalid options passed to {type(self).__name__} command. Failed checks: {failed_checks}")
+            raise Exception(f"Invalid options passed to {type(self).__name__} command. Failed checks: {failed_checks}")
+        self.logger.info(f"Preliminary checks passed: {self.run_prechecks()}")
+
+    def prevalidation(self):
+        validation_results = {
+            "source": check_path_or_url(self.source, self.logger),
+            "destination": check_path_or_url(self.destination, self.logger),
+            "pair": validate_transfer_pair(self.source, self.destination, self.logger),
+        }
+        failed_checks = [check for check, result in validation_results.items() if not result]
+        return not failed_checks, failed_checks
+
+    def _make_parser(self, options: dict, stdout: str = ''):
+        """Return the parser matching the output type azcopy was asked to produce."""
+        if options.get('output-type') == 'json':
+            return AzCopyJsonParser(stdout)
+        return AzCopyStdoutParser(stdout)
+
+    def execute(self, stream: bool = False, on_output=None, on_progress=None):
+        """
+        Execute the command with the given source, destination, and options.
+
+        When azcopy fails, the retry policy is applied.
+
+        Parameters
+        ----------
+        stream : bool, optional
+            Read azcopy output line by line while it runs instead of buffering it.
+            Implied when ``on_output`` or ``on_progress`` is given.
+        on_output : callable, optional
+            Called with each line of output as it is produced.
+        on_progress : callable, optional
+            Called with a ProgressSnapshot for every progress message. Switches the
+            run to ``--output-type=json``.
+
+        Returns
+        -------
+        AzCopyStdoutParser or AzCopyJsonParser
+            The parsed result, with the number of retries in .retries.
+        """
+        args = [self.source, self.destination]
+        return self._run(args, self._run_options(on_progress), stream, on_output, on_progress)
+
+    def _run(self, args: list, options: dict, stream: bool = False, on_output=None, on_progress=None, part: bool = False):
+        """
+        Run one invocation, then retry it for as long as the retry policy allows.
+
+        A ``part`` is one piece of a larger run, such as a shard: it is neither timed
+        from scratch nor recorded, as the caller records the combined result.
+        """
+        if not part:
+            self._start_run()
+        parsed = self._invoke(self, args, options, stream, on_output, on_progress)
+        retry_count = 0
+        while self.retry_policy.should_retry(parsed.exit_code, parsed.stdout, retry_count):
+            retry = self._retry_invocation(parsed, args, options)
+            if retry is None:
+                break
+            command, retry_args, retry_options = retry
+            job_id = parsed.job_id
+            retry_count += 1
+            self._log_retry(parsed, retry_args, retry_count)
+            self.retry_policy.wait_before_retry(retry_count)
+            parsed = self._invoke(command, retry_args, retry_options, stream, on_output, on_progress)
+            parsed.job_id = parsed.job_id or job_id
+        parsed.retries = retry_count
+        if part:
+            parsed.timings = self.timings.copy()
+            return parsed
+        return self._record(parsed)
+
+    async def _run_async(self, args: list, options: dict, on_output=None, on_progress=None):
+        """Awaitable ``_run``: each invocation runs on an asyncio subprocess and is retried through ``_retry_invocation``."""
+        import asyncio
+        self._start_run()
+        parsed = await self._invoke_async(self, args, options, on_output, on_progress)
+        retry_count = 0
+        while self.retry_policy.should_retry(parsed.exit_code, parsed.stdout, retry_count):
+            retry = self._retry_invocation(parsed, args, options)
+            if retry is None:
+                break
+            command, retry_args, retry_options = retry
+            job_id = parsed.job_id
+            retry_count += 1
+            self._log_retry(parsed, retry_args, retry_count)
+            await asyncio.sleep(self.retry_policy.wait_time(retry_count))
+            parsed = await self._invoke_async(command, retry_args, retry_options, on_output, on_progress)
+            parsed.job_id = parsed.job_id or job_id
+        parsed.retries = retry_count
+        return self._record(parsed)
+
+    def _start_run(self):
+        """Begin a top-level run: its timings are the construction phases plus its own, never an earlier run's."""
+        if self._setup_timings is None:
+            self._setup_timings = self.timings.copy()
+        self.timings = self._setup_timings.copy()
+
+    def _log_retry(self, parsed, retry_args: list, retry_count: int):
+        self.logger.info(f"{self.command_name.capitalize()} job {parsed.job_id} exited with code {parsed.exit_code}; retrying with '{' '.join(retry_args[:2])}' (attempt {retry_count} of {self.retry_policy.max_retries})")
+
+    def _retry_invocation(self, parsed, args: list, options: dict):
+        """
+        Decide how to retry a failed invocation.
+
+        Returns
+        -------
+        tuple or None
+            (command, args, options) for the next attempt, or None to give up.
+            By default the same invocation is run again.
+        """
+        return self, args, options
+
+    def _resume_command(self, jobs_class, options: dict):
+        """A jobs command able to resume this command's job: same environment, SAS, output type and sink."""
+        resume_options = {}
+        if self.sas_token:
+            resume_options['destination-sas'] = self.sas_token
+        if self.source_sas_token:
+            resume_options['source-sas'] = self.source_sas_token
+        if 'output-type' in options:
+            resume_options['output-type'] = options['output-type']
+        jobs = jobs_class(output=self.output, **resume_options)
+        jobs.env.update(self.env)
+        # Time the resumed run as part of this command
+        self.timings.add(jobs.timings)
+        jobs.timings = self.timings
+        return jobs
+
+    def _invoke(self, command: BaseCommand, args: list, options: dict, stream: bool = False, on_output=None, on_progress=None):
+        """Run a single azcopy invocation through ``command`` and parse its output."""
+        if stream or on_output is not None or on_progress is not None:
+            parsed = self._make_parser(options)
+            exit_code, stdout = command.execute_stream(args, options, on_output=self._stream_consumer(parsed, on_output, on_progress))
+            return self._finish(parsed, exit_code, stdout)
+
+        exit_code, stdout = BaseCommand.execute(command, args, options)
+        
+        # Parse stdout and enhance with additional data
+        with self.timings.phase('parse'):
+            parsed = self._make_parser(options, stdout)
+        parsed.exit_code = exit_code
+        parsed.raw_stdout = stdout
+        
+        # No need for summary table - the command output already shows comprehensive results
+        
+        return parsed
+
+    async def _invoke_async(self, command: BaseCommand, args: list, options: dict, on_output=None, on_progress=None):
+        """Run a single azcopy invocation on an asyncio subprocess and parse its output."""
+        parsed = self._make_parser(options)
+        exit_code, stdout = await command.execute_async(args, options, on_output=self._stream_consumer(parsed, on_output, on_progress))
+        return self._finish(parsed, exit_code, stdout)
+
+    def _run_options(self, on_progress=None):
+        """Options for one run; progress snapshots require azcopy's JSON output."""
+        if on_progress is not None:
+            return {**self.options, 'output-type': 'json'}
+        return self.options
+
+    def _stream_consumer(self, parsed, on_output=None, on_progress=None):
+        """Build the per-line callback that feeds the parser and the user's hooks."""
+        timings = self.timings
+
+        def _consume(line):
+            with timings.phase('parse'):
+                snapshot = parsed.feed(line)
+            if on_progress is not None and snapshot is not None:
+                on_progress(snapshot)
+            if on_output is not None:
+                on_output(line)
+        return _consume
+
+    @staticmethod
+    def _finish(parsed, exit_code, stdout):
+        """Attach the run outcome to a parser that was fed incrementally."""
+        parsed.stdout = stdout
+        parsed.exit_code = exit_code
+        parsed.raw_stdout = stdout
+        return parsed
+
+    def _empty_result(self):
+        """A successful result for a run that had nothing to transfer."""
+        self._start_run()
+        parsed = self._make_parser(self.options)
+        parsed.exit_code = 0
+        parsed.raw_stdout = ''
+        parsed.final_job_status = 'Completed'
+        parsed.number_of_file_transfers = 0
+        parsed.total_number_of_transfers = 0
+        parsed.total_bytes_transferred = 0
+        parsed.retries = 0
+        parsed.timings = self.timings.copy()
+        return parsed
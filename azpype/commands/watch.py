@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from pathlib import Path
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
+
+
+class ChangeBatcher(FileSystemEventHandler):
+    """
+    Collects created, modified and moved-in files under a root directory into batches.
+
+    Paths are kept relative to the root, deduplicated and in arrival order.
+    """
+
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = Path(root).resolve()
+        self._pending = {}
+        self._first_event = None
+        self._last_event = None
+        self._changed = threading.Condition()
+
+    def _add(self, path):
+        try:
+            relative = Path(os.fsdecode(path)).resolve().relative_to(self.root)
+        except ValueError:
+            return
+        with self._changed:
+            now = time.monotonic()
+            self._pending[relative.as_posix()] = None
+            if self._first_event is None:
+                self._first_event = now
+            self._last_event = now
+            self._changed.notify_all()
+
+    @property
+    def pending(self) -> int:
+        """Number of changed files not yet handed out in a batch."""
+        with self._changed:
+            return len(self._pending)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._add(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._add(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._add(event.dest_path)
+
+    def requeue(self, paths: list):
+        """Hand back a batch that could not be sent; it is sent first in the next batch, after the debounce."""
+        with self._changed:
+            now = time.monotonic()
+            self._pending = {**dict.fromkeys(paths), **self._pending}
+            if self._first_event is None:
+                self._first_event = now
+            self._last_event = now
+            self._changed.notify_all()
+
+    def next_batch(self, debounce: float, max_latency: float, max_batch: int, stop_event: threading.Event) -> list:
+        """
+        Block until a batch is ready and return it; returns what is pending once ``stop_event`` is set.
+
+        A batch is ready when no event arrived for ``debounce`` seconds, the oldest
+        pending change is ``max_latency`` seconds old, or ``max_batch`` files are pending.
+        Files deleted since their event are dropped.
+        """
+        with self._changed:
+            while not stop_event.is_set():
+                if self._pending:
+                    now = time.monotonic()
+                    quiet_for = now - self._last_event
+                    waited = now - self._first_event
+                    if quiet_for >= debounce or waited >= max_latency or len(self._pending) >= max_batch:
+                        break
+                    timeout = min(debounce - quiet_for, max_latency - waited)
+                else:
+                    timeout = debounce
+                self._changed.wait(max(0.05, min(timeout, 1.0)))
+
+            batch = list(self._pending)[:max_batch]
+            for path in batch:
+                del self._pending[path]
+            self._first_event = time.monotonic() if self._pending else None
+
+        return [path for path in batch if (self.root / path).is_file()]
+
+
+def watch_directory(root: str, send, debounce: float = 5.0, max_latency: float = 60.0, max_batch: int = 10000, polling: bool = False, stop_event=None) -> int:
+    """
+    Watch ``root`` recursively and call ``send(paths)`` with each batch of changed files.
+
+    Returns the number of batches sent once ``stop_event`` is set or the process is
+    interrupted. Batches are sent one at a time from the calling thread. When ``send``
+    returns False the batch failed and its files are sent again with the next batch;
+    files whose last attempt fails while stopping are raised as an Exception.
+    """
+    stop_event = stop_event or threading.Event()
+    batcher = ChangeBatcher(root)
+    observer = PollingObserver() if polling else Observer()
+    observer.schedule(batcher, str(batcher.root), recursive=True)
+    observer.start()
+    batches = 0
+    try:
+        while not stop_event.is_set():
+            paths = batcher.next_batch(debounce, max_latency, max_batch, stop_event)
+            if not paths:
+                continue
+            if send(paths) is False:
+                batcher.requeue(paths)
+            else:
+                batches += 1
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        observer.stop()
+        observer.join()
+
+    # Flush changes that arrived while stopping; each gets one last attempt
+    unsent = []
+    while batcher.pending:
+        paths = batcher.next_batch(debounce, max_latency, max_batch, stop_event)
+        if not paths:
+            continue
+        if send(paths) is False:
+            unsent.extend(paths)
+        else:
+            batches += 1
+    if unsent:
+        raise Exception(f"{len(unsent)} changed files under {root} were not sent: {unsent[:10]}")
+    return batches
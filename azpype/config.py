@@ -0,0 +1,200 @@
+import os
+import threading
+from pathlib import Path
+from azpype.resource_paths import config_template, ensure_user_config, ensure_user_profiles
+
+# Environment variable naming the profile used when a command does not pass one
+PROFILE_ENV_VAR = 'AZPYPE_PROFILE'
+
+# path -> ((mtime_ns, size), parsed YAML document)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _drop_nulls(flags: dict) -> dict:
+    # Delete keys with value of NULL or None
+    return {k: v for k, v in flags.items() if v not in ['NULL', None]}
+
+
+def _load_yaml(path, logger=None) -> dict:
+    """
+    Parse a YAML mapping, cached for the lifetime of the process.
+
+    The file is only re-read when its modification time or size changes. A missing
+    file yields an empty mapping; an unparsable one is logged and also yields one.
+    The returned mapping is shared and must not be modified.
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return {}
+
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    import yaml
+    document = {}
+    with open(path, 'r') as f:
+        try:
+            document = yaml.safe_load(f) or {}
+        except yaml.YAMLError as exc:
+            if logger is not None:
+                logger.info(exc)
+
+    with _cache_lock:
+        _cache[path] = (signature, document)
+    return document
+
+
+def load_config(path, logger=None) -> dict:
+    """
+    Return the flags defined in a YAML config file.
+
+    Parameters
+    ----------
+    path : str or Path
+        Location of the YAML file.
+    logger : Logger, optional
+        Receives YAML parse errors; an unparsable file yields an empty config.
+
+    Returns
+    -------
+    dict
+        Flag name to value, without NULL entries. The caller owns the returned dict.
+    """
+    return _drop_nulls(_load_yaml(path, logger))
+
+
+class Profile:
+    """
+    A named set of tuning settings from ~/.azpype/profiles.yaml.
+
+    ``flags`` apply to every command, ``command_flags`` only to the named command,
+    and ``env`` is set on the azcopy process.
+    """
+
+    def __init__(self, name: str, settings: dict):
+        self.name = name
+        self.flags = _drop_nulls(settings.get('flags') or {})
+        self.env = {k: str(v) for k, v in (settings.get('env') or {}).items() if v not in ['NULL', None]}
+        self.command_flags = {
+            command: _drop_nulls(value or {})
+            for command, value in settings.items()
+            if command not in ('flags', 'env')
+        }
+
+    def flags_for(self, command_name: str) -> dict:
+        """Flags this profile sets for a command."""
+        return {**self.flags, **self.command_flags.get(command_name, {})}
+
+    def __repr__(self):
+        return f"Profile({self.name!r})"
+
+
+def list_profiles(logger=None) -> list:
+    """Names of the profiles defined in the user's profiles file."""
+    return sorted(_load_yaml(ensure_user_profiles(), logger))
+
+
+def load_profile(name: str = None, logger=None):
+    """
+    Look up a profile by name.
+
+    Parameters
+    ----------
+    name : str, optional
+        Profile name. Defaults to the AZPYPE_PROFILE environment variable.
+    logger : Logger, optional
+        Receives YAML parse errors.
+
+    Returns
+    -------
+    Profile or None
+        The profile, or None when no name was given and AZPYPE_PROFILE is unset.
+
+    Raises
+    ------
+    ValueError
+        If the named profile is not defined.
+    """
+    name = name or os.environ.get(PROFILE_ENV_VAR)
+    if not name:
+        return None
+    profiles = _load_yaml(ensure_user_profiles(), logger)
+    if name not in profiles:
+        raise ValueError(f"Unknown profile '{name}'. Available profiles: {sorted(profiles)}")
+    return Profile(name, profiles[name] or {})
+
+
+def save_profile(name: str, settings: dict, logger=None) -> Path:
+    """
+    Add or replace a profile in the user's profiles file.
+
+    A new profile is appended, leaving the rest of the file (including comments)
+    untouched; replacing an existing profile rewrites the whole file.
+
+    Parameters
+    ----------
+    name : str
+        Profile name.
+    settings : dict
+        Profile body: ``flags``, ``env`` and per-command sections.
+    logger : Logger, optional
+        Receives YAML parse errors.
+
+    Returns
+    -------
+    Path
+        Location of the profiles file.
+    """
+    import yaml
+    path = Path(ensure_user_profiles())
+    profiles = _load_yaml(path, logger)
+    if name in profiles:
+        document = {**profiles, name: settings}
+        path.write_text(yaml.safe_dump(document, sort_keys=False))
+    else:
+        existing = path.read_text() if path.exists() else ''
+        separator = '\n' if existing and not existing.endswith('\n') else ''
+        path.write_text(existing + separator + yaml.safe_dump({name: settings}, sort_keys=False))
+    with _cache_lock:
+        _cache.pop(path, None)
+    return path
+
+
+def template_flags(command_name: str) -> set:
+    """Flags declared in the bundled config template of a command."""
+    return set(_load_yaml(config_template(command_name)))
+
+
+def resolve_flags(command_name: str, profile: Profile = None, options: dict = None, logger=None, accepted: set = None) -> dict:
+    """
+    Merge the layers that make up a command's flags.
+
+    Precedence, lowest to highest: the command's config template
+    (~/.azpype/<command>_config.yaml), the profile, then explicit options.
+    When ``accepted`` is given, profile flags outside it are left out, so a profile
+    tuned for copies cannot pass a flag the command rejects.
+    """
+    flags = load_config(ensure_user_config(command_name), logger)
+    if profile is not None:
+        profile_flags = profile.flags_for(command_name)
+        if accepted is not None:
+            ignored = sorted(set(profile_flags) - set(accepted))
+            if ignored and logger is not None:
+                logger.info(f"Ignoring flags of profile '{profile.name}' that {command_name} does not accept: {ignored}")
+            profile_flags = {k: v for k, v in profile_flags.items() if k in accepted}
+        flags.update(profile_flags)
+    if options:
+        flags.update(options)
+    return flags
+
+
+def clear_config_cache():
+    """Forget every cached file so the next lookup re-reads from disk."""
+    with _cache_lock:
+        _cache.clear()
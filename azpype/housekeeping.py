@@ -0,0 +1,234 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+# azcopy names plan and log files after the job: "<job id>--00000.steV17", "<job id>.log", "<job id>-scanning.log"
+_JOB_FILE = re.compile(r'^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})')
+
+
+def plans_directory() -> Path:
+    """Where azcopy keeps its job plans: AZCOPY_JOB_PLAN_LOCATION, which AzpypeLogger sets to ~/.azpype/plans."""
+    return Path(os.environ.get('AZCOPY_JOB_PLAN_LOCATION') or Path('~/.azpype/plans').expanduser())
+
+
+class JobFiles:
+    """The files one job left in a plans or logs directory."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.paths = []
+        self.size = 0
+        # Newest modification time of any of the files
+        self.mtime = 0.0
+
+    def add(self, path: str, size: int, mtime: float):
+        self.paths.append(path)
+        self.size += size
+        self.mtime = max(self.mtime, mtime)
+
+    def __repr__(self):
+        return f"JobFiles({self.job_id!r}, {len(self.paths)} files, {self.size} bytes)"
+
+
+def job_files(directory) -> list:
+    """
+    Group the files of a plans or logs directory by job, newest job first.
+
+    Files whose names do not start with a job ID are ignored, so they are never pruned.
+    """
+    jobs = {}
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return []
+    with entries:
+        for entry in entries:
+            match = _JOB_FILE.match(entry.name)
+            if match is None:
+                continue
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            job_id = match.group(1).lower()
+            jobs.setdefault(job_id, JobFiles(job_id)).add(entry.path, stat.st_size, stat.st_mtime)
+    return sorted(jobs.values(), key=lambda job: job.mtime, reverse=True)
+
+
+class RetentionPolicy:
+    def __init__(self, max_age_days: float = None, max_jobs: int = None, max_total_mb: float = None, min_age_minutes: float = 60):
+        """
+        Which jobs' plans or logs to keep.
+
+        Jobs are considered newest first. A job is pruned when it is older than
+        ``max_age_days``, when ``max_jobs`` newer jobs are already kept, or when keeping
+        it would exceed ``max_total_mb``. Limits left at None do not apply.
+
+        Parameters
+        ----------
+        max_age_days : float, optional
+            Drop jobs whose files were last modified longer ago than this.
+        max_jobs : int, optional
+            Keep at most this many jobs.
+        max_total_mb : float, optional
+            Keep at most this many MiB of files.
+        min_age_minutes : float, optional
+            Never drop jobs modified more recently than this, so running jobs are left
+            alone. Default is 60.
+        """
+        self.max_age_days = max_age_days
+        self.max_jobs = max_jobs
+        self.max_total_mb = max_total_mb
+        self.min_age_minutes = min_age_minutes
+
+    def select(self, jobs: list, now: float = None) -> list:
+        """Return the jobs to prune from ``jobs``, which must be ordered newest first."""
+        now = time.time() if now is None else now
+        kept, kept_bytes, pruned = 0, 0, []
+        for job in jobs:
+            age = now - job.mtime
+            expired = (
+                (self.max_age_days is not None and age > self.max_age_days * 86400)
+                or (self.max_jobs is not None and kept >= self.max_jobs)
+                or (self.max_total_mb is not None and kept_bytes + job.size > self.max_total_mb * 1024 * 1024)
+            )
+            if expired and age >= self.min_age_minutes * 60:
+                pruned.append(job)
+            else:
+                kept += 1
+                kept_bytes += job.size
+        return pruned
+
+    def __repr__(self):
+        return (f"RetentionPolicy(max_age_days={self.max_age_days}, max_jobs={self.max_jobs}, "
+                f"max_total_mb={self.max_total_mb}, min_age_minutes={self.min_age_minutes})")
+
+
+# Used by Jobs.prune when no policy is given
+DEFAULT_RETENTION = RetentionPolicy(max_age_days=30, max_jobs=1000)
+
+
+class PruneResult:
+    """What a prune removed, or would remove on a dry run."""
+
+    def __init__(self, jobs: list, dry_run: bool):
+        self.job_ids = [job.job_id for job in jobs]
+        self.files = sum(len(job.paths) for job in jobs)
+        self.bytes_freed = sum(job.size for job in jobs)
+        self.dry_run = dry_run
+
+    def __repr__(self):
+        return f"PruneResult({len(self.job_ids)} jobs, {self.files} files, {self.bytes_freed} bytes, dry_run={self.dry_run})"
+
+
+def prune(directory, policy: RetentionPolicy, dry_run: bool = False, logger=None) -> PruneResult:
+    """
+    Delete the files of the jobs in ``directory`` that ``policy`` does not keep.
+
+    Files are removed directly rather than through one ``azcopy jobs rm`` per job,
+    which would spawn azcopy thousands of times on a neglected directory.
+
+    Parameters
+    ----------
+    directory : str or Path
+        A plans or azcopy logs directory.
+    policy : RetentionPolicy
+        Which jobs to keep.
+    dry_run : bool, optional
+        Only report what would be deleted. Default is False.
+    logger : optional
+        Receives a summary line.
+    """
+    pruned = policy.select(job_files(directory))
+    if not dry_run:
+        for job in pruned:
+            for path in job.paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+    result = PruneResult(pruned, dry_run)
+    if logger is not None and pruned:
+        action = "Would prune" if dry_run else "Pruned"
+        logger.info(f"{action} {len(result.job_ids)} jobs ({result.bytes_freed} bytes) from {directory}")
+    return result
+
+
+class RunIndex:
+    def __init__(self, path=None):
+        """
+        Persistent map from azpype run IDs to the azcopy jobs they started.
+
+        Parameters
+        ----------
+        path : str or Path, optional
+            SQLite database location. Default is ~/.azpype/run_index.db.
+        """
+        self.path = Path(path) if path else Path("~/.azpype/run_index.db").expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT NOT NULL, job_id TEXT NOT NULL, recorded_at REAL NOT NULL, "
+                "PRIMARY KEY (run_id, job_id)) WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS runs_by_job ON runs (job_id)")
+            self._conn.commit()
+
+    @staticmethod
+    def _key(run_id: str) -> str:
+        # Run IDs look like '2023-05-26/11-12-32--1f3a9c0e', with or without a trailing slash
+        return run_id.strip('/')
+
+    def record(self, run_id: str, job_ids):
+        """Remember that ``run_id`` started the given jobs."""
+        now = time.time()
+        rows = [(self._key(run_id), job_id, now) for job_id in job_ids if job_id]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO runs (run_id, job_id, recorded_at) VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def job_ids(self, run_id: str) -> list:
+        """The jobs of a run, most recently recorded first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM runs WHERE run_id = ? ORDER BY recorded_at DESC", (self._key(run_id),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def latest_job(self, run_id: str):
+        """The job most recently recorded for a run, or None."""
+        job_ids = self.job_ids(run_id)
+        return job_ids[0] if job_ids else None
+
+    def forget(self, job_ids=None):
+        """Drop the given jobs from the index, or every run when no jobs are given."""
+        with self._lock:
+            if job_ids is None:
+                self._conn.execute("DELETE FROM runs")
+            else:
+                self._conn.executemany("DELETE FROM runs WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def default_run_index() -> RunIndex:
+    """The process-wide RunIndex at ~/.azpype/run_index.db, opened on first use."""
+    return RunIndex()
@@ -0,0 +1,253 @@
+import mmap
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+# HTTP statuses with which the storage service throttles requests
+THROTTLING_STATUSES = (429, 503)
+# Error codes with which the storage service throttles requests
+THROTTLING_ERROR_CODES = ('ServerBusy', 'TooManyRequests')
+
+# "2024/01/01 10:00:00 ..." starts every log entry; continuation lines are indented
+_ENTRY = re.compile(rb'^(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) ')
+# "ERR: [P#0-T#3] UPLOADFAILED: /data/a.txt : 403 : 403 This request is not authorized..."
+_FAILED = re.compile(rb'\] ([A-Z]+)FAILED: (.*?) : (\d{3}) : (.*)')
+# "==> REQUEST/RESPONSE (Try=1/3.1s[SLOW >3s], OpTime=3.2s) -- RESPONSE STATUS CODE ERROR"
+_REQUEST = re.compile(rb'==> REQUEST/RESPONSE \(Try=(\d+)/([^,\[]+)(\[SLOW[^\]]*\])?, OpTime=([^)]+)\) -- (.*)')
+_METHOD = re.compile(rb'^\s+(GET|PUT|POST|HEAD|DELETE|PATCH) (\S+)')
+_STATUS = re.compile(rb'RESPONSE Status: (\d{3})')
+_ERROR_CODE = re.compile(rb'X-Ms-Error-Code: \[([^\]]*)\]')
+_DESTINATION = re.compile(rb'Dst: (\S+)')
+_DURATION = re.compile(r'(\d+(?:\.\d+)?)(h|ms|m|s|us|µs|ns)')
+_DURATION_UNITS = {'h': 3600, 'm': 60, 's': 1, 'ms': 1e-3, 'us': 1e-6, 'µs': 1e-6, 'ns': 1e-9}
+
+
+def _text(raw: bytes) -> str:
+    return raw.decode('utf-8', errors='replace').strip()
+
+
+def _timestamp(raw: bytes):
+    return datetime.strptime(raw.decode('ascii'), '%Y/%m/%d %H:%M:%S')
+
+
+def _duration(text: str) -> float:
+    """Seconds in a Go duration such as '1m2.5s' or '71.2981ms'."""
+    return sum(float(value) * _DURATION_UNITS[unit] for value, unit in _DURATION.findall(text))
+
+
+def log_directory() -> Path:
+    """Where azcopy writes its job logs: AZCOPY_LOG_LOCATION, which AzpypeLogger sets to ~/.azpype/azcopy_logs."""
+    return Path(os.environ.get('AZCOPY_LOG_LOCATION') or Path('~/.azpype/azcopy_logs').expanduser())
+
+
+def job_log_path(job_id: str, log_dir=None) -> Path:
+    """
+    Path of the log azcopy wrote for a job.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no log for the job.
+    """
+    path = Path(log_dir or log_directory()) / f"{job_id}.log"
+    if not path.is_file():
+        raise FileNotFoundError(f"No azcopy log found for job {job_id} at {path}")
+    return path
+
+
+class FailedTransfer:
+    """One file azcopy gave up on, as reported by an ``...FAILED:`` log entry."""
+    __slots__ = ('timestamp', 'operation', 'source', 'destination', 'status', 'message')
+
+    def __init__(self, timestamp, operation: str, source: str, destination: str, status: int, message: str):
+        self.timestamp = timestamp
+        # UPLOAD, DOWNLOAD, COPY, ...
+        self.operation = operation
+        self.source = source
+        self.destination = destination
+        # HTTP status; 0 when the request never got a response
+        self.status = status
+        self.message = message
+
+    def __repr__(self):
+        return f"FailedTransfer({self.operation} {self.source!r}, status={self.status})"
+
+
+class RequestEvent:
+    """A request azcopy logged because it failed, was throttled or was slow."""
+    __slots__ = ('timestamp', 'method', 'url', 'status', 'error_code', 'attempt', 'try_seconds', 'op_seconds', 'slow')
+
+    def __init__(self, timestamp, attempt: int, try_seconds: float, op_seconds: float, slow: bool):
+        self.timestamp = timestamp
+        self.method = None
+        self.url = None
+        self.status = None
+        self.error_code = None
+        self.attempt = attempt
+        self.try_seconds = try_seconds
+        self.op_seconds = op_seconds
+        self.slow = slow
+
+    @property
+    def throttled(self) -> bool:
+        return self.status in THROTTLING_STATUSES or self.error_code in THROTTLING_ERROR_CODES
+
+    def __repr__(self):
+        return f"RequestEvent({self.method} {self.url!r}, status={self.status}, try_seconds={self.try_seconds})"
+
+
+def iter_log_events(path):
+    """
+    Stream the noteworthy entries of an azcopy job log.
+
+    The log is memory-mapped and read line by line, so memory use does not grow with
+    its size; only lines that start an entry of interest are decoded.
+
+    Parameters
+    ----------
+    path : str or Path
+        An azcopy job log, e.g. from ``job_log_path``.
+
+    Yields
+    ------
+    FailedTransfer or RequestEvent
+        Each failed file and each logged request, in log order.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pending = None
+            for line in iter(mapped.readline, b''):
+                entry = _ENTRY.match(line)
+                if entry is None:
+                    # Continuation of the entry in progress
+                    if pending is None:
+                        continue
+                    if isinstance(pending, RequestEvent):
+                        _continue_request(pending, line)
+                    elif pending.destination is None:
+                        destination = _DESTINATION.search(line)
+                        if destination:
+                            pending.destination = _text(destination.group(1))
+                    continue
+
+                if pending is not None:
+                    yield pending
+                    pending = None
+                failed = _FAILED.search(line, entry.end())
+                if failed:
+                    message = _text(failed.group(4))
+                    destination = None
+                    if ' Dst: ' in message:
+                        message, _, destination = message.partition(' Dst: ')
+                    pending = FailedTransfer(_timestamp(entry.group(1)), failed.group(1).decode('ascii'), _text(failed.group(2)),
+                                             destination, int(failed.group(3)), message.strip())
+                    continue
+                request = _REQUEST.search(line, entry.end())
+                if request:
+                    pending = RequestEvent(_timestamp(entry.group(1)), int(request.group(1)), _duration(_text(request.group(2))),
+                                           _duration(_text(request.group(4))), request.group(3) is not None)
+            if pending is not None:
+                yield pending
+
+
+def _continue_request(event: RequestEvent, line: bytes):
+    if event.method is None:
+        method = _METHOD.match(line)
+        if method:
+            event.method = method.group(1).decode('ascii')
+            event.url = _text(method.group(2))
+            return
+    if event.status is None:
+        status = _STATUS.search(line)
+        if status:
+            event.status = int(status.group(1))
+            return
+    if event.error_code is None:
+        code = _ERROR_CODE.search(line)
+        if code:
+            event.error_code = _text(code.group(1))
+
+
+class JobLogReport:
+    """
+    What an azcopy job log says about a job: the files that failed, the HTTP statuses
+    of logged requests, and the throttled and slow requests.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.failures = []
+        # HTTP status -> number of logged responses
+        self.status_counts = Counter()
+        self.throttled = []
+        self.slow = []
+
+    @classmethod
+    def from_log(cls, path):
+        """Build a report by streaming ``path`` once."""
+        report = cls(path)
+        for event in iter_log_events(path):
+            if isinstance(event, FailedTransfer):
+                report.failures.append(event)
+                continue
+            if event.status is not None:
+                report.status_counts[event.status] += 1
+            if event.throttled:
+                report.throttled.append(event)
+            if event.slow:
+                report.slow.append(event)
+        return report
+
+    @classmethod
+    def for_job(cls, job_id: str, log_dir=None):
+        """Build a report from the log of ``job_id`` in ``log_dir`` (default: ``log_directory()``)."""
+        return cls.from_log(job_log_path(job_id, log_dir))
+
+    def relative_paths(self, source: str) -> list:
+        """
+        The failed files as paths relative to ``source``, ready for a ``--list-of-files``
+        re-transfer. Failures outside ``source`` are left out; each path appears once.
+
+        Parameters
+        ----------
+        source : str
+            The source of the original transfer: a local directory or a URL.
+        """
+        return relative_paths(source, (failure.source for failure in self.failures))
+
+    def __repr__(self):
+        return (f"JobLogReport({self.path.name}: {len(self.failures)} failed files, "
+                f"{len(self.throttled)} throttled, {len(self.slow)} slow requests)")
+
+
+def _comparable(location: str) -> str:
+    """A URL without its query string, or an absolute local path, with forward slashes."""
+    if '://' in location:
+        parts = urlsplit(location)
+        return f"{parts.scheme}://{parts.netloc}{unquote(parts.path)}"
+    return os.path.abspath(location).replace('\\', '/')
+
+
+def relative_paths(source: str, locations) -> list:
+    """
+    ``locations`` (local paths or URLs, e.g. failed transfer sources) as paths relative
+    to ``source``, for a ``--list-of-files``. Locations outside ``source`` are left out;
+    each path appears once, in order.
+    """
+    base = _comparable(source).rstrip('/*').rstrip('/') + '/'
+    paths = {}
+    for location in locations:
+        location = _comparable(location)
+        if location.startswith(base):
+            paths[location[len(base):]] = None
+    return list(paths)
+
+
+def analyze_log(path) -> JobLogReport:
+    """Stream an azcopy job log into a JobLogReport; see ``iter_log_events``."""
+    return JobLogReport.from_log(path)
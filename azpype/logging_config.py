@@ -1,7 +1,33 @@
 import os
+import threading
+import time
+import uuid
 from pathlib import Path
 from loguru import logger
 
+# Base directories whose sinks, folders and environment have already been set up
+_configured_dirs = set()
+_setup_lock = threading.Lock()
+
+# Command output longer than this (in characters) is written to its own file under
+# ~/.azpype/outputs and referenced from the log instead of being logged inline
+OUTPUT_ATTACH_CHARS = 1024 * 1024
+# Streamed output is logged in records of at most this many lines
+OUTPUT_BATCH_LINES = 500
+# Days attached output files are kept, matching the log file retention
+OUTPUT_RETENTION_DAYS = 7
+
+
+def _format(record):
+    """Log line layout; the run is shown for commands that have one."""
+    run = " | {extra[run]}" if "run" in record["extra"] else ""
+    return "{time:YYYY-MM-DD HH:mm:ss} | {level} | {extra[command]}" + run + " | {message}\n{exception}"
+
+
+def _is_azpype_record(record):
+    # Only records from loggers bound by AzpypeLogger; other loguru users keep their own sinks
+    return "command" in record["extra"]
+
 
 class AzpypeLogger:
     """
@@ -9,14 +35,18 @@ class AzpypeLogger:
     
     Creates logs in ~/.azpype/ with daily rotation and compression.
     Sets up AzCopy environment variables for job plans and logs.
+    The setup runs once per process; later instances only bind a command name.
     """
     
     def __init__(self, command_name="azpype"):
         self.command_name = command_name
         self.base_dir = Path("~/.azpype").expanduser()
-        self._setup_directories()
-        self._configure_logger()
-        self._set_azcopy_envs()
+        with _setup_lock:
+            if self.base_dir not in _configured_dirs:
+                self._setup_directories()
+                self._configure_logger()
+                self._set_azcopy_envs()
+                _configured_dirs.add(self.base_dir)
     
     def _setup_directories(self):
         """Create necessary directories for logging and AzCopy."""
@@ -27,11 +57,24 @@ class AzpypeLogger:
         azcopy_logs_dir.mkdir(exist_ok=True, parents=True)
         
         (self.base_dir / "plans").mkdir(exist_ok=True, parents=True)
+
+        outputs_dir = self.base_dir / "outputs"
+        outputs_dir.mkdir(exist_ok=True, parents=True)
+        _remove_older_than(outputs_dir, OUTPUT_RETENTION_DAYS)
     
     def _configure_logger(self):
-        """Configure loguru with file rotation only (no console output to avoid duplication with Rich)."""
-        # Remove default handler
-        logger.remove()
+        """
+        Add the rotating log file sink (no console output to avoid duplication with Rich).
+
+        Records are written by loguru's background thread (``enqueue=True``), so
+        logging never blocks a command on file I/O or on other threads' records.
+        Only loguru's default stderr handler is removed; sinks added by the
+        application are left in place.
+        """
+        try:
+            logger.remove(0)
+        except ValueError:
+            pass
         
         # File handler with daily rotation and compression
         logger.add(
@@ -39,7 +82,9 @@ class AzpypeLogger:
             rotation="1 day",
             compression="gz",
             retention="7 days",
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {extra[command]} | {message}",
+            format=_format,
+            filter=_is_azpype_record,
+            enqueue=True,
             level="INFO"
         )
     
@@ -53,6 +98,55 @@ class AzpypeLogger:
         return logger.bind(command=self.command_name.upper())
 
 
+def _remove_older_than(directory: Path, days: float):
+    cutoff = time.time() - days * 86400
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                continue
+
+
+def output_section(label: str, text: str) -> str:
+    """
+    Command output formatted for a single log record: each line indented under
+    ``label``, or, beyond OUTPUT_ATTACH_CHARS, a reference to a file holding it.
+    """
+    if len(text) > OUTPUT_ATTACH_CHARS:
+        path = Path("~/.azpype/outputs").expanduser() / f"{time.strftime('%Y-%m-%d_%H-%M-%S')}-{uuid.uuid4().hex[:8]}-{label.lower()}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        return f"{label}: {len(text)} characters, written to {path}"
+    body = text.strip().replace('\n', '\n  ')
+    return f"{label}:\n  {body}"
+
+
+class OutputBatch:
+    """Logs streamed output lines in records of up to OUTPUT_BATCH_LINES lines instead of one record per line."""
+
+    def __init__(self, bound_logger, batch_lines: int = OUTPUT_BATCH_LINES):
+        self.logger = bound_logger
+        self.batch_lines = batch_lines
+        self.lines = []
+
+    def add(self, line: str):
+        self.lines.append(line)
+        if len(self.lines) >= self.batch_lines:
+            self.flush()
+
+    def flush(self):
+        if self.lines:
+            self.logger.info("  " + "\n  ".join(self.lines))
+            self.lines = []
+
+
+def new_run_id() -> str:
+    """A unique name for one command's run, e.g. '2023-05-26/11-12-32--1f3a9c0e'."""
+    return f"{time.strftime('%Y-%m-%d/%H-%M-%S')}--{uuid.uuid4().hex[:8]}"
+
+
 # Legacy aliases for backward compatibility
 class CopyLogger(AzpypeLogger):
     """Legacy alias for Copy commands."""
@@ -61,9 +155,8 @@ class CopyLogger(AzpypeLogger):
     
     def get_logger(self):
         """Return logger in legacy format (run_name, run_log_directory, logger)."""
-        bound_logger = super().get_logger()
-        # Return simplified values - no more complex run directories
-        return "simplified", str(self.base_dir), bound_logger
+        run_name = new_run_id()
+        return run_name, str(self.base_dir), super().get_logger().bind(run=run_name)
 
 
 class JobsLogger(AzpypeLogger):
@@ -0,0 +1,194 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Phases recorded by the commands, in the order they usually occur
+PHASES = ('config', 'prechecks', 'render', 'spawn', 'transfer', 'parse', 'logging')
+# Phases spent waiting on azcopy rather than in azpype itself
+TRANSFER_PHASES = ('spawn', 'transfer')
+
+
+class PhaseTimings:
+    """
+    Wall-clock seconds spent in each phase of a command.
+
+    Phases may nest; a phase's time excludes the time of phases opened inside it, so
+    the phases add up to the total time measured. Timings are cumulative for the
+    object they are recorded on.
+    """
+
+    def __init__(self, seconds: dict = None):
+        self.seconds = dict(seconds or {})
+        self._local = threading.local()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as ``name``."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        started = time.perf_counter()
+        stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = stack.pop()
+            self.seconds[name] = self.seconds.get(name, 0.0) + elapsed - nested
+            if stack:
+                stack[-1] += elapsed
+
+    def add(self, other):
+        """Accumulate another set of timings into this one."""
+        for name, seconds in other.seconds.items():
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def copy(self):
+        return PhaseTimings(self.seconds)
+
+    @property
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+    @property
+    def overhead(self) -> float:
+        """Seconds spent in azpype itself rather than waiting on azcopy."""
+        return sum(s for name, s in self.seconds.items() if name not in TRANSFER_PHASES)
+
+    def as_dict(self) -> dict:
+        return dict(self.seconds)
+
+    def __repr__(self):
+        phases = ", ".join(f"{name}={seconds:.4f}" for name, seconds in self.seconds.items())
+        return f"PhaseTimings({phases})"
+
+
+class TransferMetrics:
+    """
+    Throughput and wrapper overhead of one finished command, as handed to exporters.
+
+    Parameters
+    ----------
+    command_name : str
+        The azcopy command, e.g. 'copy'.
+    result : AzCopyStdoutParser or AzCopyJsonParser
+        The parsed result, with ``timings`` attached.
+    """
+
+    def __init__(self, command_name: str, result):
+        self.command_name = command_name
+        self.job_id = result.job_id
+        self.status = result.final_job_status
+        self.exit_code = getattr(result, 'exit_code', None)
+        self.bytes_transferred = result.total_bytes_transferred or 0
+        self.files_completed = result.number_of_file_transfers_completed or 0
+        self.files_failed = result.number_of_file_transfers_failed or 0
+        self.files_skipped = result.number_of_file_transfers_skipped or 0
+        self.bytes_per_second = result.bytes_per_second
+        self.files_per_second = result.files_per_second
+        self.timings = getattr(result, 'timings', None) or PhaseTimings()
+
+    def as_dict(self) -> dict:
+        return {
+            'command': self.command_name,
+            'job_id': self.job_id,
+            'status': self.status,
+            'exit_code': self.exit_code,
+            'bytes_transferred': self.bytes_transferred,
+            'files_completed': self.files_completed,
+            'files_failed': self.files_failed,
+            'files_skipped': self.files_skipped,
+            'bytes_per_second': self.bytes_per_second,
+            'files_per_second': self.files_per_second,
+            'overhead_seconds': self.timings.overhead,
+            'phase_seconds': self.timings.as_dict(),
+        }
+
+
+class PrometheusTextfileExporter:
+    """
+    Write the latest metrics per command to a file for node_exporter's textfile collector.
+
+    The file is replaced atomically on every export, so the collector never reads a
+    partial file.
+    """
+
+    def __init__(self, path, prefix: str = 'azpype'):
+        self.path = str(path)
+        self.prefix = prefix
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: TransferMetrics):
+        with self._lock:
+            self._latest[metrics.command_name] = metrics
+            self._write()
+
+    def _write(self):
+        p = self.prefix
+        gauges = {
+            f'{p}_bytes_transferred': ('Bytes transferred by the last job.', lambda m: m.bytes_transferred),
+            f'{p}_files_completed': ('Files completed by the last job.', lambda m: m.files_completed),
+            f'{p}_files_failed': ('Files failed in the last job.', lambda m: m.files_failed),
+            f'{p}_bytes_per_second': ('Transfer throughput of the last job.', lambda m: m.bytes_per_second),
+            f'{p}_files_per_second': ('File rate of the last job.', lambda m: m.files_per_second),
+            f'{p}_exit_code': ('azcopy exit code of the last job.', lambda m: m.exit_code),
+            f'{p}_overhead_seconds': ('Seconds spent in azpype rather than azcopy during the last job.', lambda m: m.timings.overhead),
+        }
+        lines = []
+        for name, (help_text, value) in gauges.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            for command, metrics in sorted(self._latest.items()):
+                lines.append(f'{name}{{command="{command}"}} {float(value(metrics) or 0)}')
+        name = f'{p}_phase_seconds'
+        lines += [f'# HELP {name} Seconds spent in each phase of the last job.', f'# TYPE {name} gauge']
+        for command, metrics in sorted(self._latest.items()):
+            for phase, seconds in metrics.timings.seconds.items():
+                lines.append(f'{name}{{command="{command}",phase="{phase}"}} {seconds}')
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix='.azpype-metrics-')
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temporary, self.path)
+
+
+# callable(TransferMetrics), called after every command run
+_exporters = []
+_exporters_lock = threading.Lock()
+
+
+def register_exporter(exporter):
+    """
+    Send the metrics of every finished command to ``exporter``.
+
+    An exporter is any callable taking a TransferMetrics, e.g. a
+    PrometheusTextfileExporter or a function recording OpenTelemetry instruments.
+    """
+    with _exporters_lock:
+        if exporter not in _exporters:
+            _exporters.append(exporter)
+
+
+def unregister_exporter(exporter):
+    """Stop sending metrics to a previously registered exporter."""
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+
+
+def export(command_name: str, result, logger=None):
+    """Hand a finished command's metrics to every registered exporter; exporter errors are logged, not raised."""
+    with _exporters_lock:
+        exporters = list(_exporters)
+    if not exporters:
+        return
+    metrics = TransferMetrics(command_name, result)
+    for exporter in exporters:
+        try:
+            exporter(metrics)
+        except Exception as exc:
+            if logger is not None:
+                logger.warning(f"Metrics exporter {exporter!r} failed: {exc}")
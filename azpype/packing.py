@@ -0,0 +1,251 @@
+import bisect
+import json
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+from azpype.transfer_index import scan_tree
+
+# Name of the manifest written next to the archives
+MANIFEST_NAME = 'azpype-manifest.json'
+MANIFEST_VERSION = 1
+ARCHIVE_FORMATS = ('tar', 'zip')
+DEFAULT_ARCHIVE_MB = 256
+COPY_CHUNK = 1024 * 1024
+
+
+class _ArchiveWriter:
+    """Append uncompressed members to a tar or zip file and report where their data lands."""
+
+    def __init__(self, path: Path, archive_format: str):
+        self.path = path
+        self.format = archive_format
+        if archive_format == 'tar':
+            self._archive = tarfile.open(path, 'w', format=tarfile.PAX_FORMAT)
+        else:
+            self._archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    @property
+    def size(self) -> int:
+        if self.format == 'tar':
+            return self._archive.offset
+        return self._archive.fp.tell()
+
+    def add(self, file_path: str, name: str, size: int) -> int:
+        """Store a file under ``name`` and return the offset of its data in the archive."""
+        if self.format == 'tar':
+            info = self._archive.gettarinfo(file_path, arcname=name)
+            with open(file_path, 'rb') as f:
+                self._archive.addfile(info, f)
+            padded = -(-info.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+            return self._archive.offset - padded
+        self._archive.write(file_path, arcname=name)
+        return self._archive.fp.tell() - size
+
+    def close(self):
+        self._archive.close()
+
+
+class PackManifest:
+    """
+    Description of a set of archives produced by ``pack_directory``.
+
+    The manifest lists each archive with the first and last member path it holds;
+    members are packed in path order, so a member's archive is found by bisection
+    and its offset from that archive's JSON index.
+    """
+
+    def __init__(self, document: dict, base=None):
+        self.document = document
+        self.base = base
+        self.archives = document['archives']
+        self._firsts = [a['first'] for a in self.archives]
+        self._indexes = {}
+
+    @classmethod
+    def load(cls, location, sas_token: str = None):
+        """
+        Read a manifest from a local directory or a blob container/directory URL.
+
+        Parameters
+        ----------
+        location : str or Path
+            Directory holding the archives, or the URL they were uploaded to.
+        sas_token : str, optional
+            SAS token for reading from a URL (without the leading '?').
+        """
+        location = str(location)
+        if location.startswith(('http://', 'https://')):
+            base = location.split('?', 1)[0].rstrip('/')
+            document = json.loads(_http_get(f"{base}/{MANIFEST_NAME}", sas_token))
+            return cls(document, (base, sas_token))
+        with open(Path(location) / MANIFEST_NAME, encoding='utf-8') as f:
+            return cls(json.load(f), Path(location))
+
+    @property
+    def member_count(self) -> int:
+        return sum(a['members'] for a in self.archives)
+
+    def _is_remote(self) -> bool:
+        return isinstance(self.base, tuple)
+
+    def index(self, archive: dict) -> dict:
+        """Member path -> [offset, size, mtime_ns] for one archive, loaded on first use."""
+        name = archive['index']
+        if name not in self._indexes:
+            if self._is_remote():
+                base, sas_token = self.base
+                self._indexes[name] = json.loads(_http_get(f"{base}/{name}", sas_token))
+            else:
+                with open(self.base / name, encoding='utf-8') as f:
+                    self._indexes[name] = json.load(f)
+        return self._indexes[name]
+
+    def locate(self, member: str) -> tuple:
+        """
+        Find a member.
+
+        Returns
+        -------
+        tuple
+            (archive name, offset, size) of the member's data.
+
+        Raises
+        ------
+        KeyError
+            If the member was not packed.
+        """
+        position = bisect.bisect_right(self._firsts, member) - 1
+        if position >= 0:
+            archive = self.archives[position]
+            entry = self.index(archive).get(member)
+            if entry is not None:
+                return archive['name'], entry[0], entry[1]
+        raise KeyError(member)
+
+    def read_member(self, member: str) -> bytes:
+        """
+        Read one member's content without reading or downloading the rest of its archive.
+
+        From a URL this is a single HTTP Range request against the archive blob.
+        """
+        name, offset, size = self.locate(member)
+        if size == 0:
+            return b''
+        if self._is_remote():
+            base, sas_token = self.base
+            return _http_get(f"{base}/{name}", sas_token, byte_range=(offset, offset + size - 1))
+        with open(self.base / name, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+
+
+def _http_get(url: str, sas_token: str = None, byte_range: tuple = None) -> bytes:
+    from urllib.request import Request, urlopen
+    if sas_token:
+        url = f"{url}?{sas_token}"
+    headers = {'x-ms-version': '2021-08-06'}
+    if byte_range is not None:
+        headers['Range'] = f"bytes={byte_range[0]}-{byte_range[1]}"
+    with urlopen(Request(url, headers=headers)) as response:
+        return response.read()
+
+
+def pack_directory(source: str, staging_dir: str, archive_mb: int = DEFAULT_ARCHIVE_MB, archive_format: str = 'tar') -> PackManifest:
+    """
+    Stream the files of a directory into uncompressed archives of about ``archive_mb`` each.
+
+    Files are added in path order; an archive is closed once it reaches the target
+    size, so a file larger than the target gets an archive to itself. Each archive
+    gets a JSON index (``<archive>.index.json``) mapping member paths to the offset
+    and size of their data, and a manifest (``azpype-manifest.json``) lists the archives.
+
+    Parameters
+    ----------
+    source : str
+        Local directory to pack.
+    staging_dir : str
+        Directory receiving the archives, indexes and manifest.
+    archive_mb : int, optional
+        Target archive size in MiB. Default is 256.
+    archive_format : str, optional
+        'tar' or 'zip' (stored, not compressed). Default is 'tar'.
+
+    Returns
+    -------
+    PackManifest
+        The manifest of the archives written.
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"archive_format must be one of {ARCHIVE_FORMATS}, got: {archive_format}")
+    staging = Path(staging_dir)
+    staging.mkdir(parents=True, exist_ok=True)
+    target = archive_mb * 1024 * 1024
+    files = sorted(scan_tree(source))
+
+    archives = []
+    writer, index = None, {}
+
+    def _close():
+        writer.close()
+        index_name = f"{writer.path.name}.index.json"
+        with open(staging / index_name, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        archives.append({
+            'name': writer.path.name, 'index': index_name, 'size': writer.path.stat().st_size,
+            'members': len(index), 'first': next(iter(index)), 'last': next(reversed(index)),
+        })
+
+    for path, size, mtime_ns in files:
+        if writer is None:
+            writer = _ArchiveWriter(staging / f"pack-{len(archives):05d}.{archive_format}", archive_format)
+            index = {}
+        offset = writer.add(os.path.join(source, path), path, size)
+        index[path] = [offset, size, mtime_ns]
+        if writer.size >= target:
+            _close()
+            writer = None
+    if writer is not None:
+        _close()
+
+    document = {'version': MANIFEST_VERSION, 'format': archive_format, 'archives': archives}
+    with open(staging / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=1)
+    return PackManifest(document, staging)
+
+
+def unpack_directory(staging_dir: str, destination: str) -> int:
+    """
+    Recreate the packed files from downloaded archives.
+
+    Members are copied out by the offsets in the archive indexes, and their
+    modification times are restored. Member paths that would escape ``destination``
+    are rejected.
+
+    Returns
+    -------
+    int
+        Number of files written.
+    """
+    manifest = PackManifest.load(staging_dir)
+    root = Path(destination).resolve()
+    written = 0
+    for archive in manifest.archives:
+        with open(Path(staging_dir) / archive['name'], 'rb') as src:
+            for member, (offset, size, mtime_ns) in manifest.index(archive).items():
+                target = (root / member).resolve()
+                if root not in target.parents:
+                    raise ValueError(f"Refusing to unpack member outside the destination: {member}")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                src.seek(offset)
+                remaining = size
+                with open(target, 'wb') as dst:
+                    while remaining:
+                        chunk = src.read(min(COPY_CHUNK, remaining))
+                        if not chunk:
+                            raise ValueError(f"Archive {archive['name']} is truncated at member {member}")
+                        dst.write(chunk)
+                        remaining -= len(chunk)
+                os.utime(target, ns=(mtime_ns, mtime_ns))
+                written += 1
+    return written
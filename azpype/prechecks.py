@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from functools import partial
+from azpype.validators import validate_azcopy_envs, validate_login_type, validate_network_available, is_valid_path_or_url
+
+# Seconds a precheck result stays valid; override with AZPYPE_PRECHECK_TTL
+DEFAULT_TTL = 300
+
+AUTH_ENV_VARS = ['AZCOPY_SPA_CLIENT_SECRET', 'AZCOPY_SPA_APPLICATION_ID', 'AZCOPY_TENANT_ID', 'AZCOPY_AUTO_LOGIN_TYPE']
+
+
+class PrecheckCache:
+    """
+    Process-wide store of precheck results, each valid for ``ttl`` seconds.
+
+    Probes for the same key never run concurrently: a thread that finds an
+    expired entry re-runs the probe while others wait for its result.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl if ttl is not None else float(os.environ.get('AZPYPE_PRECHECK_TTL', DEFAULT_TTL))
+        self._results = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key, probe):
+        """Return the cached result for ``key``, running ``probe()`` if it is missing or expired."""
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            cached = self._results.get(key)
+            now = time.monotonic()
+            if cached is not None and now - cached[0] < self.ttl:
+                return cached[1]
+            result = probe()
+            self._results[key] = (time.monotonic(), result)
+            return result
+
+    def invalidate(self, key=None):
+        """Drop one cached result, or all of them when no key is given."""
+        with self._lock:
+            if key is None:
+                self._results.clear()
+            else:
+                self._results.pop(key, None)
+
+
+precheck_cache = PrecheckCache()
+
+
+def _azcopy_envs_probe(logger):
+    return validate_azcopy_envs(AUTH_ENV_VARS, logger) is True
+
+
+def network_probe(host: str = "8.8.8.8", port: int = 53, timeout: float = 3):
+    """
+    Build a network probe for a specific endpoint.
+
+    For example ``network_probe("myaccount.blob.core.windows.net", 443)`` checks the
+    storage endpoint itself, and ``network_probe("127.0.0.1", 10000)`` a local emulator.
+    """
+    def probe(logger):
+        return validate_network_available(logger, host=host, port=port, timeout=timeout)
+    return probe
+
+
+# name -> callable(logger) -> bool
+_probes = {
+    'azcopy_envs': _azcopy_envs_probe,
+    'login_type': validate_login_type,
+    'network': network_probe(
+        os.environ.get('AZPYPE_PRECHECK_HOST', '8.8.8.8'),
+        int(os.environ.get('AZPYPE_PRECHECK_PORT', 53)),
+    ),
+}
+
+
+def register_probe(name: str, probe):
+    """
+    Add or replace a precheck.
+
+    Parameters
+    ----------
+    name : str
+        Probe name; replacing 'network' retargets the connectivity check.
+    probe : callable
+        Called with a logger, returns True when the check passes.
+    """
+    _probes[name] = probe
+    precheck_cache.invalidate(name)
+
+
+def unregister_probe(name: str):
+    """Remove a precheck so commands no longer run it."""
+    _probes.pop(name, None)
+    precheck_cache.invalidate(name)
+
+
+def run_prechecks(logger) -> dict:
+    """
+    Run every registered probe, reusing results younger than the cache TTL.
+
+    Returns
+    -------
+    dict
+        Probe name to result.
+    """
+    return {name: precheck_cache.get(name, partial(probe, logger)) for name, probe in list(_probes.items())}
+
+
+def check_path_or_url(path: str, logger) -> bool:
+    """
+    Cached ``is_valid_path_or_url``; local paths are keyed on the working directory.
+
+    Only successful checks are kept, so a path created moments after a failed
+    check is found on the next attempt.
+    """
+    key = ('path_or_url', os.getcwd(), path)
+    valid = precheck_cache.get(key, partial(is_valid_path_or_url, path, logger))
+    if not valid:
+        precheck_cache.invalidate(key)
+    return valid
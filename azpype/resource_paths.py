@@ -1,3 +1,5 @@
+import os
+from functools import lru_cache
 from pathlib import Path
 import platform
 import stat
@@ -9,6 +11,21 @@ def _assets_root() -> Path:
 
 
 def get_azcopy_path() -> str:
+    """
+    Path of the azcopy executable.
+
+    The AZPYPE_AZCOPY_PATH environment variable takes precedence, e.g. to use a
+    system-wide azcopy or a stand-in for testing; otherwise the bundled binary is used.
+    """
+    override = os.environ.get('AZPYPE_AZCOPY_PATH')
+    if override:
+        return override
+    return _bundled_azcopy_path()
+
+
+@lru_cache(maxsize=None)
+def _bundled_azcopy_path() -> str:
+    """Path of the bundled azcopy binary, made executable on first call and cached afterwards."""
     system = platform.system()
     machine = platform.machine()
     base = _assets_root() / 'bin'
@@ -35,11 +52,29 @@ def get_azcopy_path() -> str:
     return str(path)
 
 
-def ensure_user_config() -> Path:
-    src = _assets_root() / 'config_templates' / 'copy_config.yaml'
+def _ensure_user_file(name: str) -> Path:
+    """Return ~/.azpype/<name>, seeding it from the bundled template if it does not exist yet."""
+    src = _assets_root() / 'config_templates' / name
     dst_dir = Path.home() / '.azpype'
     dst_dir.mkdir(parents=True, exist_ok=True)
-    dst = dst_dir / 'copy_config.yaml'
+    dst = dst_dir / name
     if not dst.exists() and src.exists():
         dst.write_bytes(src.read_bytes())
     return dst
+
+
+def config_template(command_name: str) -> Path:
+    """Path of the bundled config template of a command."""
+    return _assets_root() / 'config_templates' / f'{command_name}_config.yaml'
+
+
+@lru_cache(maxsize=None)
+def ensure_user_config(command_name: str = 'copy') -> Path:
+    """Path of the user's config for a command, seeded from the bundled template once per process."""
+    return _ensure_user_file(f'{command_name}_config.yaml')
+
+
+@lru_cache(maxsize=None)
+def ensure_user_profiles() -> Path:
+    """Path of the user's tuning profiles, seeded from the bundled template once per process."""
+    return _ensure_user_file('profiles.yaml')
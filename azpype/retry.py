@@ -40,6 +40,22 @@ class RetryPolicy:
             return False
         return result_code != 0
 
+    def wait_time(self, retry_count):
+        """
+        Returns the number of seconds to wait before the given retry.
+
+        Parameters
+        ----------
+        retry_count : int
+            The number of times the operation has been retried.
+
+        Returns
+        -------
+        float
+            The wait time in seconds.
+        """
+        return self.initial_wait_time * (self.backoff_factor ** (retry_count - 1))
+
     def wait_before_retry(self, retry_count):
         """
         Waits for a certain amount of time before retrying the operation.
@@ -49,5 +65,4 @@ class RetryPolicy:
         retry_count : int
             The number of times the operation has been retried.
         """
-        wait_time = self.initial_wait_time * (self.backoff_factor ** (retry_count - 1))
-        time.sleep(wait_time)
\ No newline at end of file
+        time.sleep(self.wait_time(retry_count))
\ No newline at end of file
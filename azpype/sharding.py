@@ -0,0 +1,34 @@
+import heapq
+
+
+def partition_by_size(files, shards: int) -> list:
+    """
+    Split files into shards of roughly equal total size.
+
+    Files are assigned largest first, each to the shard with the fewest bytes so far
+    (longest-processing-time scheduling), which keeps the largest shard within 4/3 of
+    the optimum.
+
+    Parameters
+    ----------
+    files : iterable of tuple
+        (path, size) pairs; further tuple items are ignored.
+    shards : int
+        Number of shards to produce.
+
+    Returns
+    -------
+    list of list
+        The paths of each non-empty shard, largest shard first.
+    """
+    if shards < 1:
+        raise ValueError(f"shards must be at least 1, got: {shards}")
+    ordered = sorted(((f[1], f[0]) for f in files), reverse=True)
+    buckets = [[] for _ in range(shards)]
+    heap = [(0, i) for i in range(shards)]
+    for size, path in ordered:
+        total, i = heapq.heappop(heap)
+        buckets[i].append(path)
+        heapq.heappush(heap, (total + size, i))
+    totals = dict((i, total) for total, i in heap)
+    return [buckets[i] for i in sorted(range(shards), key=lambda i: -totals[i]) if buckets[i]]
@@ -0,0 +1,273 @@
+import os
+import threading
+from collections import deque
+
+# Environment variable naming the sink used when a command does not set one
+OUTPUT_ENV_VAR = 'AZPYPE_OUTPUT'
+# Lines shown by TailSink unless configured otherwise
+DEFAULT_TAIL = 20
+
+
+def _console():
+    """Create a Rich console; rich is imported on first use to keep imports cheap."""
+    from rich.console import Console
+    return Console()
+
+
+def _panel_width(text: str, minimum: int = 60, maximum: int = 120) -> int:
+    longest = max((len(line) for line in text.split('\n')), default=0) if text.strip() else minimum
+    return min(maximum, max(minimum, longest + 4))
+
+
+class OutputSink:
+    """
+    Receives what a command shows to the user: its configuration, the command line,
+    azcopy's output and the parsed result.
+
+    ``open`` is called once per azcopy invocation and returns the object receiving that
+    invocation's ``line`` and ``finish`` calls; sinks without per-run state return
+    themselves. All hooks do nothing by default, so subclasses override only what
+    they display.
+    """
+
+    def config(self, command, flags: dict):
+        """The resolved flags of a command, once it is constructed."""
+
+    def open(self, command, args: list, options: dict):
+        """An invocation is starting; return the receiver of its output."""
+        return self
+
+    def line(self, line: str):
+        """One line of output from a streamed invocation."""
+
+    def finish(self, exit_code: int, stdout: str = None, stderr: str = None):
+        """
+        The invocation ended. Buffered invocations pass their whole output; streamed
+        ones pass None, having delivered it through ``line``.
+        """
+
+    def result(self, command, parsed):
+        """The parsed result of a transfer, after any retries."""
+
+
+class QuietSink(OutputSink):
+    """Show nothing, e.g. for batch jobs and services. The log file still records everything."""
+
+
+class RichSink(OutputSink):
+    """
+    Interactive rendering: the configuration table, the command panel, every
+    streamed line, and the complete output of buffered invocations in a panel.
+    """
+
+    def __init__(self):
+        self._console = None
+
+    @property
+    def console(self):
+        if self._console is None:
+            self._console = _console()
+        return self._console
+
+    def config(self, command, flags: dict):
+        from rich.table import Table
+
+        # Calculate sensible width for config table
+        max_flag_length = max(len(f"--{key}") for key in flags.keys()) if flags else 15
+        max_value_length = max(len(str(value)) for value in flags.values()) if flags else 15
+        table_width = min(80, max(40, max_flag_length + max_value_length + 10))
+
+        title = "🏁 Configuration Flags"
+        if command.profile is not None:
+            title += f" (profile: {command.profile.name})"
+        table = Table(title=title, title_style="blue", width=table_width)
+        table.add_column("Flag", style="cyan", min_width=15)
+        table.add_column("Value", style="magenta")
+
+        for key, value in flags.items():
+            table.add_row(f"--{key}", str(value))
+
+        self.console.print(table)
+
+    def open(self, command, args: list, options: dict):
+        self._print_command_panel(command, args, options)
+        return self
+
+    def _print_command_panel(self, command, args: list, options: dict):
+        """Render the command about to be executed."""
+        from rich.panel import Panel
+        from rich.syntax import Syntax
+        readable_cmd = command._format_command_readable(args, options)
+        syntax = Syntax(readable_cmd, "bash", theme="monokai", word_wrap=True)
+        self.console.print(Panel(syntax, title="🚀 Executing Command", border_style="blue", width=min(100, max(60, len(max(readable_cmd.split('\n'), key=len)) + 10))))
+
+    def line(self, line: str):
+        self.console.print(line, markup=False, highlight=False)
+
+    def finish(self, exit_code: int, stdout: str = None, stderr: str = None):
+        from rich.panel import Panel
+        console = self.console
+        if exit_code != 0:
+            error_content = []
+            if stdout:
+                error_content.append(f"[white]Stdout:[/white]\n{stdout}")
+            if stderr:
+                error_content.append(f"[white]Stderr:[/white]\n{stderr}")
+            if error_content:
+                error_text = "\n\n".join(error_content)
+                console.print(Panel(f"[red]{error_text}[/red]", title="❌ Command Failed", border_style="red", width=_panel_width(error_text)))
+            else:
+                console.print(Panel(f"[red]Command exited with code {exit_code}[/red]", title="❌ Command Failed", border_style="red", width=60))
+            return
+        if stdout:
+            console.print(Panel(stdout, title="📋 Command Output", border_style="green", width=_panel_width(stdout)))
+        if stderr:
+            console.print(Panel(f"[yellow]{stderr}[/yellow]", title="⚠️ Warning Output", border_style="yellow", width=_panel_width(stderr)))
+
+
+class _TailRun:
+    def __init__(self, sink, lines: int):
+        self.sink = sink
+        self.tail = deque(maxlen=lines)
+
+    def line(self, line: str):
+        self.tail.append(line)
+
+    def finish(self, exit_code: int, stdout: str = None, stderr: str = None):
+        from rich.panel import Panel
+        n = self.tail.maxlen
+        if stdout is not None:
+            # Only the end of a large output is split, never the whole of it
+            self.tail.extend(stdout.rstrip('\n').rsplit('\n', n)[-n:])
+        if stderr:
+            self.tail.extend(stderr.rstrip('\n').rsplit('\n', n)[-n:])
+        text = "\n".join(self.tail)
+        if exit_code != 0:
+            title, style = f"❌ Command Failed (exit code {exit_code}, last {n} lines)", "red"
+        else:
+            title, style = f"📋 Command Output (last {n} lines)", "green"
+        self.sink.console.print(Panel(text, title=title, border_style=style, width=_panel_width(text)))
+
+
+class TailSink(RichSink):
+    """Like RichSink, but shows only the last ``lines`` lines of output, once the invocation ends."""
+
+    def __init__(self, lines: int = DEFAULT_TAIL):
+        super().__init__()
+        self.lines = lines
+
+    def open(self, command, args: list, options: dict):
+        self._print_command_panel(command, args, options)
+        return _TailRun(self, self.lines)
+
+
+class SummarySink(OutputSink):
+    """Show only the summary table of each transfer's parsed result."""
+
+    def result(self, command, parsed):
+        # summary() is already rendered by Rich
+        print(parsed.summary(), end='')
+
+
+class _FileRun:
+    def __init__(self, sink):
+        self.sink = sink
+        self.parts = []
+        self.finished = False
+
+    def line(self, line: str):
+        self.parts.append(line + '\n')
+
+    def finish(self, exit_code: int, stdout: str = None, stderr: str = None):
+        if self.finished:
+            return
+        self.finished = True
+        if stdout:
+            self.parts.append(stdout)
+        if stderr:
+            self.parts.append(stderr)
+        self.sink._append(''.join(self.parts))
+        self.parts = []
+
+
+class FileSink(OutputSink):
+    """
+    Write raw output to a file. Each invocation's output is collected in memory and
+    appended in a single write when it finishes, so retries and concurrent shards
+    never interleave and the file is only locked for that write.
+    """
+
+    def __init__(self, path, append: bool = True, buffer_size: int = 1024 * 1024):
+        self.path = os.fspath(path)
+        self.append = append
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        # Truncate on the first write only, so later invocations are appended
+        self._truncate = not append
+
+    def open(self, command, args: list, options: dict):
+        return _FileRun(self)
+
+    def _append(self, text: str):
+        with self._lock:
+            mode = 'w' if self._truncate else 'a'
+            self._truncate = False
+            with open(self.path, mode, buffering=self.buffer_size, encoding='utf-8') as f:
+                f.write(text)
+
+
+class _TeeRun:
+    def __init__(self, runs: list):
+        self.runs = runs
+
+    def line(self, line: str):
+        for run in self.runs:
+            run.line(line)
+
+    def finish(self, exit_code: int, stdout: str = None, stderr: str = None):
+        for run in self.runs:
+            run.finish(exit_code, stdout, stderr)
+
+
+class TeeSink(OutputSink):
+    """Forward everything to several sinks, e.g. ``TeeSink(TailSink(), FileSink('out.log'))``."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def config(self, command, flags: dict):
+        for sink in self.sinks:
+            sink.config(command, flags)
+
+    def open(self, command, args: list, options: dict):
+        return _TeeRun([sink.open(command, args, options) for sink in self.sinks])
+
+    def result(self, command, parsed):
+        for sink in self.sinks:
+            sink.result(command, parsed)
+
+
+_NAMED_SINKS = {
+    'rich': RichSink,
+    'tail': TailSink,
+    'summary': SummarySink,
+    'quiet': QuietSink,
+}
+
+
+def resolve_sink(output=None) -> OutputSink:
+    """
+    Turn an ``output`` argument into a sink.
+
+    Parameters
+    ----------
+    output : OutputSink or str, optional
+        A sink, or one of 'rich', 'tail', 'summary' and 'quiet'. Defaults to the
+        AZPYPE_OUTPUT environment variable, then 'rich'.
+    """
+    if isinstance(output, OutputSink):
+        return output
+    name = output or os.environ.get(OUTPUT_ENV_VAR) or 'rich'
+    if name not in _NAMED_SINKS:
+        raise ValueError(f"Unknown output sink '{name}'. Available sinks: {sorted(_NAMED_SINKS)}")
+    return _NAMED_SINKS[name]()
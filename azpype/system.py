@@ -0,0 +1,14 @@
+import os
+
+
+def cpu_count() -> int:
+    """Number of CPUs, at least 1."""
+    return os.cpu_count() or 1
+
+
+def physical_memory_gb():
+    """Physical memory in GiB, or None where it cannot be read."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / (1024 ** 3)
+    except (AttributeError, ValueError, OSError):
+        return None
@@ -0,0 +1,284 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+# Rows sent to SQLite per executemany call while scanning
+SCAN_CHUNK = 10000
+
+# Values of the staging table's ``state`` column
+UNCHANGED, CHANGED, REFRESH = 0, 1, 2
+
+
+def destination_key(destination: str, namespace: str = None) -> str:
+    """
+    Identify a destination independently of its SAS token or other query parameters.
+
+    Records kept under different ``namespace`` values never match each other, so
+    commands that track the same destination differently do not read each other's.
+    """
+    parts = urlsplit(destination)
+    if parts.scheme and parts.netloc:
+        key = urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip('/'), '', ''))
+    else:
+        key = str(Path(destination).resolve())
+    return f"{namespace}:{key}" if namespace else key
+
+
+def file_md5(path, chunk_size: int = 4 * 1024 * 1024) -> str:
+    """Hex MD5 of a file, read in chunks."""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_tree(root: str):
+    """
+    Walk a directory tree with os.scandir.
+
+    Yields
+    ------
+    tuple
+        (relative posix path, size, mtime_ns) for every regular file.
+        Symlinked directories are not followed.
+    """
+    root = os.path.abspath(root)
+    prefix_length = len(root) + 1
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        relative = entry.path[prefix_length:].replace(os.sep, '/')
+                        yield relative, stat.st_size, stat.st_mtime_ns
+                except OSError:
+                    continue
+
+
+class IndexDelta:
+    """
+    Difference between a local tree and what the index recorded for a destination.
+
+    The scanned tree lives in a temporary SQLite table, so memory use does not grow
+    with the number of files. Use as a context manager, or call ``close()``.
+    """
+
+    def __init__(self, index, table: str, source: str, destination: str, use_hash: bool):
+        self.index = index
+        self.table = table
+        self.source = source
+        self.destination = destination
+        self.use_hash = use_hash
+
+    @property
+    def changed(self) -> int:
+        """Number of new or modified files."""
+        return self.index._scalar(f"SELECT COUNT(*) FROM {self.table} WHERE state = ?", (CHANGED,))
+
+    @property
+    def deleted(self) -> int:
+        """Number of previously transferred files that no longer exist locally."""
+        return self.index._scalar(
+            f"SELECT COUNT(*) FROM transfers t WHERE t.destination = ? "
+            f"AND NOT EXISTS (SELECT 1 FROM {self.table} s WHERE s.path = t.path)",
+            (self.destination,),
+        )
+
+    def changed_paths(self):
+        """Yield the relative paths of new or modified files."""
+        yield from self.index._iter_column(f"SELECT path FROM {self.table} WHERE state = ? ORDER BY path", (CHANGED,))
+
+    def deleted_paths(self):
+        """Yield the relative paths recorded for the destination that no longer exist locally."""
+        yield from self.index._iter_column(
+            f"SELECT t.path FROM transfers t WHERE t.destination = ? "
+            f"AND NOT EXISTS (SELECT 1 FROM {self.table} s WHERE s.path = t.path) ORDER BY t.path",
+            (self.destination,),
+        )
+
+    def commit(self, include_deleted: bool = False):
+        """
+        Record the changed files as transferred.
+
+        Call only after the transfer succeeded. With ``include_deleted`` the entries of
+        files removed locally are dropped as well, e.g. after a sync that deleted them
+        at the destination.
+        """
+        self.index._commit_delta(self, include_deleted)
+
+    def close(self):
+        """Drop the staging table."""
+        self.index._drop(self.table)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TransferIndex:
+    def __init__(self, path=None):
+        """
+        Persistent record of the files successfully transferred to each destination.
+
+        Parameters
+        ----------
+        path : str or Path, optional
+            SQLite database location. Default is ~/.azpype/transfer_index.db.
+        """
+        self.path = Path(path) if path else Path("~/.azpype/transfer_index.db").expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transfers ("
+                "destination TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL, "
+                "mtime_ns INTEGER NOT NULL, hash TEXT, transferred_at REAL NOT NULL, "
+                "PRIMARY KEY (destination, path)) WITHOUT ROWID"
+            )
+            self._conn.commit()
+
+    def diff(self, source: str, destination: str, use_hash: bool = False, namespace: str = None) -> IndexDelta:
+        """
+        Compare a local tree against the index.
+
+        A file is changed when it was never recorded for the destination or its size
+        or modification time differ. With ``use_hash``, files whose size matches but
+        whose modification time differs are hashed and count as unchanged when the
+        hash matches the recorded one.
+
+        Parameters
+        ----------
+        source : str
+            Local directory.
+        destination : str
+            Destination URL or path; any SAS token is ignored.
+        use_hash : bool, optional
+            Confirm changes by MD5 and record hashes on commit. Default is False.
+        namespace : str, optional
+            Keep these records apart from those of other namespaces for the same
+            destination, e.g. 'sync'. Default is None, the namespace of
+            ``Copy.execute_delta``.
+
+        Returns
+        -------
+        IndexDelta
+            The staged comparison.
+        """
+        destination = destination_key(destination, namespace)
+        table = f"scan_{uuid.uuid4().hex}"
+        with self._lock:
+            self._conn.execute(
+                f"CREATE TEMP TABLE {table} (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+                f"state INTEGER DEFAULT {UNCHANGED}, hash TEXT) WITHOUT ROWID"
+            )
+            chunk = []
+            for row in scan_tree(source):
+                chunk.append(row)
+                if len(chunk) >= SCAN_CHUNK:
+                    self._conn.executemany(f"INSERT INTO {table} (path, size, mtime_ns) VALUES (?, ?, ?)", chunk)
+                    chunk = []
+            if chunk:
+                self._conn.executemany(f"INSERT INTO {table} (path, size, mtime_ns) VALUES (?, ?, ?)", chunk)
+
+            self._conn.execute(
+                f"UPDATE {table} SET state = ? WHERE NOT EXISTS ("
+                f"SELECT 1 FROM transfers t WHERE t.destination = ? AND t.path = {table}.path "
+                f"AND t.size = {table}.size AND t.mtime_ns = {table}.mtime_ns)",
+                (CHANGED, destination),
+            )
+            if use_hash:
+                self._confirm_by_hash(table, source, destination)
+            self._conn.commit()
+        return IndexDelta(self, table, source, destination, use_hash)
+
+    def _confirm_by_hash(self, table: str, source: str, destination: str):
+        """Downgrade size-equal, time-different files to REFRESH when their content is unchanged."""
+        candidates = self._conn.execute(
+            f"SELECT s.path, t.hash FROM {table} s JOIN transfers t ON t.destination = ? AND t.path = s.path "
+            f"WHERE s.state = ? AND t.size = s.size AND t.hash IS NOT NULL",
+            (destination, CHANGED),
+        ).fetchall()
+        for path, recorded in candidates:
+            try:
+                digest = file_md5(os.path.join(source, path))
+            except OSError:
+                continue
+            if digest == recorded:
+                self._conn.execute(f"UPDATE {table} SET state = ?, hash = ? WHERE path = ?", (REFRESH, digest, path))
+
+    def _commit_delta(self, delta: IndexDelta, include_deleted: bool):
+        now = time.time()
+        with self._lock:
+            if delta.use_hash:
+                paths = [row[0] for row in self._conn.execute(f"SELECT path FROM {delta.table} WHERE state = ? AND hash IS NULL", (CHANGED,))]
+                for path in paths:
+                    try:
+                        digest = file_md5(os.path.join(delta.source, path))
+                    except OSError:
+                        continue
+                    self._conn.execute(f"UPDATE {delta.table} SET hash = ? WHERE path = ?", (digest, path))
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO transfers (destination, path, size, mtime_ns, hash, transferred_at) "
+                f"SELECT ?, path, size, mtime_ns, hash, ? FROM {delta.table} WHERE state IN (?, ?)",
+                (delta.destination, now, CHANGED, REFRESH),
+            )
+            if include_deleted:
+                self._conn.execute(
+                    f"DELETE FROM transfers WHERE destination = ? "
+                    f"AND NOT EXISTS (SELECT 1 FROM {delta.table} s WHERE s.path = transfers.path)",
+                    (delta.destination,),
+                )
+            self._conn.commit()
+
+    def forget(self, destination: str, namespace: str = None):
+        """Drop everything recorded for a destination in a namespace, forcing a full transfer next time."""
+        with self._lock:
+            self._conn.execute("DELETE FROM transfers WHERE destination = ?", (destination_key(destination, namespace),))
+            self._conn.commit()
+
+    def _scalar(self, sql: str, params: tuple = ()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def _iter_column(self, sql: str, params: tuple = (), batch_size: int = SCAN_CHUNK):
+        # Fetch in batches so a long result never holds the lock or memory for long
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0]
+
+    def _drop(self, table: str):
+        with self._lock:
+            self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
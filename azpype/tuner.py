@@ -0,0 +1,258 @@
+import math
+import os
+from azpype.config import save_profile
+from azpype.system import cpu_count, physical_memory_gb
+from azpype.transfer_index import scan_tree
+
+MIB = 1024 ** 2
+GIB = 1024 ** 3
+
+# Files below this size are dominated by per-request overhead rather than bandwidth
+SMALL_FILE_BYTES = 1 * MIB
+# Azure block blobs hold at most this many blocks
+MAX_BLOCKS_PER_BLOB = 50000
+# Files sampled by profile_source before the distribution is considered representative
+DEFAULT_SAMPLE_FILES = 100000
+
+
+class WorkloadProfile:
+    """File-size distribution of a transfer source."""
+
+    def __init__(self, sizes: list):
+        sizes = sorted(sizes)
+        self.file_count = len(sizes)
+        self.total_bytes = sum(sizes)
+        self.median_size = self._percentile(sizes, 0.5)
+        self.p90_size = self._percentile(sizes, 0.9)
+        self.max_size = sizes[-1] if sizes else 0
+        self.small_file_fraction = sum(1 for s in sizes if s < SMALL_FILE_BYTES) / len(sizes) if sizes else 0.0
+
+    @staticmethod
+    def _percentile(sorted_sizes: list, fraction: float) -> int:
+        if not sorted_sizes:
+            return 0
+        return sorted_sizes[min(len(sorted_sizes) - 1, int(fraction * len(sorted_sizes)))]
+
+    @property
+    def small_files(self) -> bool:
+        """True when most files are small enough that request overhead dominates."""
+        return self.small_file_fraction >= 0.5
+
+    def __repr__(self):
+        return (f"WorkloadProfile(files={self.file_count}, total_bytes={self.total_bytes}, "
+                f"median={self.median_size}, p90={self.p90_size}, max={self.max_size})")
+
+
+class Measurement:
+    """Outcome of one benchmark run at a given concurrency."""
+
+    def __init__(self, concurrency: int, buffer_gb: float, throughput_mbps: float, result):
+        self.concurrency = concurrency
+        self.buffer_gb = buffer_gb
+        self.throughput_mbps = throughput_mbps
+        self.result = result
+
+    @property
+    def succeeded(self) -> bool:
+        return self.result.exit_code == 0
+
+    def __repr__(self):
+        return f"Measurement(concurrency={self.concurrency}, throughput_mbps={self.throughput_mbps:.1f})"
+
+
+class TuningResult:
+    """Settings chosen by ``tune`` together with the evidence behind them."""
+
+    def __init__(self, workload: WorkloadProfile, settings: dict, measurements: list):
+        self.workload = workload
+        self.settings = settings
+        self.measurements = measurements
+
+    def to_profile(self) -> dict:
+        """The settings as a profile body for ~/.azpype/profiles.yaml; block size only applies to copy and sync."""
+        transfer_flags = {'block-size-mb': self.settings['block_size_mb']}
+        return {
+            'copy': transfer_flags,
+            'sync': dict(transfer_flags),
+            'env': {
+                'AZCOPY_CONCURRENCY_VALUE': self.settings['concurrency'],
+                'AZCOPY_BUFFER_GB': self.settings['buffer_gb'],
+            },
+        }
+
+
+def profile_source(source: str, sample_files: int = DEFAULT_SAMPLE_FILES) -> WorkloadProfile:
+    """
+    Sample the file sizes of a local source.
+
+    Parameters
+    ----------
+    source : str
+        Local file or directory.
+    sample_files : int, optional
+        Stop after this many files. Default is 100000.
+
+    Returns
+    -------
+    WorkloadProfile
+        The sampled size distribution.
+    """
+    if os.path.isfile(source):
+        return WorkloadProfile([os.path.getsize(source)])
+    sizes = []
+    for _, size, _ in scan_tree(source):
+        sizes.append(size)
+        if len(sizes) >= sample_files:
+            break
+    if not sizes:
+        raise ValueError(f"No files found to profile in: {source}")
+    return WorkloadProfile(sizes)
+
+
+def buffer_for(concurrency: int, block_size_mb: float, memory_gb: float = None) -> float:
+    """
+    Buffer size in GB that keeps every connection supplied with two blocks in flight,
+    bounded by half of the machine's memory and at least 0.5 GB.
+    """
+    memory_gb = memory_gb or physical_memory_gb() or 4
+    wanted = concurrency * block_size_mb * 2 / 1024
+    return round(max(0.5, min(memory_gb / 2, wanted)), 2)
+
+
+def recommend(workload: WorkloadProfile, cpus: int = None, memory_gb: float = None) -> dict:
+    """
+    Derive starting settings from a workload and the machine's resources.
+
+    Small files need many connections to hide per-request latency; large files need
+    blocks big enough to stay under the service's block limit and fewer connections
+    to avoid memory pressure.
+
+    Parameters
+    ----------
+    workload : WorkloadProfile
+        The source's size distribution.
+    cpus : int, optional
+        Logical cores. Default is the current machine's.
+    memory_gb : float, optional
+        Physical memory. Default is the current machine's.
+
+    Returns
+    -------
+    dict
+        ``concurrency``, ``block_size_mb`` and ``buffer_gb``.
+    """
+    cpus = cpus or cpu_count()
+    memory_gb = memory_gb or physical_memory_gb() or 4
+
+    if workload.small_files:
+        concurrency = min(1000, max(64, 32 * cpus))
+    else:
+        concurrency = min(300, max(32, 16 * cpus))
+
+    if workload.p90_size < 256 * MIB:
+        block_size_mb = 8
+    elif workload.p90_size < 4 * GIB:
+        block_size_mb = 16
+    elif workload.p90_size < 64 * GIB:
+        block_size_mb = 32
+    else:
+        block_size_mb = 100
+    block_size_mb = min(4000, max(block_size_mb, math.ceil(workload.max_size / MAX_BLOCKS_PER_BLOB / MIB)))
+
+    return {
+        'concurrency': concurrency,
+        'block_size_mb': block_size_mb,
+        'buffer_gb': buffer_for(concurrency, block_size_mb, memory_gb),
+    }
+
+
+def candidate_concurrency(recommended: int) -> list:
+    """Concurrency values benchmarked around a recommendation."""
+    values = {max(8, recommended // 4), max(8, recommended // 2), recommended, min(1000, recommended * 2)}
+    return sorted(values)
+
+
+def _size_arg(size: int) -> str:
+    """Format a byte count the way ``azcopy bench --size-per-file`` expects it."""
+    for suffix, unit in (('G', GIB), ('M', MIB)):
+        if size >= unit and size % unit == 0:
+            return f"{size // unit}{suffix}"
+    return f"{max(1, math.ceil(size / 1024))}K"
+
+
+def bench_data(workload: WorkloadProfile, sample_mb: int = 1024) -> tuple:
+    """
+    Test data resembling the workload, limited to about ``sample_mb`` in total.
+
+    Returns
+    -------
+    tuple
+        (size-per-file, file-count) arguments for ``azcopy bench``.
+    """
+    sample_bytes = sample_mb * MIB
+    size = min(max(1024, workload.median_size), sample_bytes)
+    count = max(1, min(workload.file_count, sample_bytes // size, 10000))
+    return _size_arg(size), count
+
+
+def tune(source: str, destination: str, sas_token: str = None, candidates: list = None, sample_mb: int = 1024, profile_name: str = None, **options) -> TuningResult:
+    """
+    Pick concurrency, block size and buffer size for a source by benchmarking.
+
+    The source's file sizes are sampled to derive starting settings, then
+    ``azcopy bench`` uploads test data of a similar shape to ``destination`` once per
+    candidate concurrency. The fastest successful run wins.
+
+    Parameters
+    ----------
+    source : str
+        Local file or directory whose workload is being tuned for.
+    destination : str
+        Container or directory URL to benchmark against. Test data is deleted afterwards.
+    sas_token : str, optional
+        SAS token for the destination (without the leading '?').
+    candidates : list, optional
+        Concurrency values to try. Default is ``candidate_concurrency`` of the recommendation.
+    sample_mb : int, optional
+        Approximate size of the test data per run in MiB. Default is 1024.
+    profile_name : str, optional
+        Save the result under this name in ~/.azpype/profiles.yaml, for use as
+        ``Copy(..., profile=profile_name)``.
+    **options : dict
+        Extra flags for each Bench run.
+
+    Returns
+    -------
+    TuningResult
+        The chosen settings and every measurement.
+
+    Raises
+    ------
+    Exception
+        If no benchmark run succeeded.
+    """
+    from azpype.commands.bench import Bench, throughput_mbps
+
+    workload = profile_source(source)
+    settings = recommend(workload)
+    size_per_file, file_count = bench_data(workload, sample_mb)
+
+    measurements = []
+    for concurrency in candidates or candidate_concurrency(settings['concurrency']):
+        buffer_gb = buffer_for(concurrency, settings['block_size_mb'])
+        bench = Bench(destination, sas_token=sas_token, block_size_mb=settings['block_size_mb'],
+                      size_per_file=size_per_file, file_count=file_count, **options)
+        bench.env.update({'AZCOPY_CONCURRENCY_VALUE': concurrency, 'AZCOPY_BUFFER_GB': buffer_gb})
+        result = bench.execute()
+        measurements.append(Measurement(concurrency, buffer_gb, throughput_mbps(result), result))
+
+    successful = [m for m in measurements if m.succeeded and m.throughput_mbps > 0]
+    if not successful:
+        raise Exception(f"Every benchmark run failed; no settings could be chosen. Measurements: {measurements}")
+    best = max(successful, key=lambda m: m.throughput_mbps)
+    settings = {**settings, 'concurrency': best.concurrency, 'buffer_gb': best.buffer_gb}
+
+    tuned = TuningResult(workload, settings, measurements)
+    if profile_name:
+        save_profile(profile_name, tuned.to_profile())
+    return tuned
@@ -1,12 +1,49 @@
 import os
-from urllib.parse import urlparse
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs
 from pathlib import Path
 from typing import Any
 import socket
 from logging import Logger
 
 # Source Desination formatting validators
-def validate_azure_blob_url(url: str, logger: Logger) -> bool:
+def validate_sas_token(token: str, logger: Logger) -> bool:
+    """
+    Checks that a SAS token is well formed: given without the leading '?', signed,
+    and not past its expiry (``se``) when that can be read.
+    """
+    if token.startswith('?'):
+        logger.info("Invalid SAS token: pass it without the leading '?'")
+        return False
+    params = parse_qs(token, keep_blank_values=True)
+    if not params.get('sig', [''])[0]:
+        logger.info("Invalid SAS token: no signature (sig) found")
+        return False
+    expiry = params.get('se', [''])[0]
+    if expiry:
+        try:
+            expires = datetime.fromisoformat(expiry.replace('Z', '+00:00'))
+        except ValueError:
+            expires = None
+        if expires is not None:
+            if expires.tzinfo is None:
+                expires = expires.replace(tzinfo=timezone.utc)
+            if expires <= datetime.now(timezone.utc):
+                logger.info(f"Invalid SAS token: expired at {expiry}")
+                return False
+    return True
+
+def validate_azure_blob_url(url: str, logger: Logger, sas_token: str = None) -> bool:
+    """
+    Checks that ``url`` is an Azure Storage URL and that its SAS token, either in the
+    URL's query string or passed as ``sas_token``, is well formed. Each endpoint of a
+    URL-to-URL transfer carries its own token.
+    """
+    if sas_token:
+        if urlparse(url).query:
+            logger.info(f"Invalid URL: {url.split('?')[0]}\nA SAS token was passed for a URL that already has a query string.")
+            return False
+        url = f"{url}?{sas_token}"
     parsed_url = urlparse(url)
     if not parsed_url.scheme or not parsed_url.netloc:
         logger.info(f"Invalid URL: {url}")
@@ -17,6 +54,12 @@ def validate_azure_blob_url(url: str, logger: Logger) -> bool:
     if not any(domain in parsed_url.netloc for domain in ('blob.core.windows.net', 'dfs.core.windows.net', 'file.core.windows.net')):
         logger.info(f"Invalid URL: {url}\nURL must be a valid Azure Blob Storage URL.")
         return False
+    if '?' in parsed_url.query:
+        logger.info(f"Invalid URL: {url.split('?')[0]}\nA SAS token was appended more than once.")
+        return False
+    query = parse_qs(parsed_url.query)
+    if ('sig' in query or 'sv' in query) and not validate_sas_token(parsed_url.query, logger):
+        return False
     logger.info(f"Provided URL appears to be valid: {url}")
     return True
 
@@ -27,9 +70,32 @@ def validate_local_path(path: str, logger: Logger) -> bool:
     logger.info(f"Found File or Directory locally at path: {path}")
     return True
 
-def is_valid_path_or_url(path:str, logger: Logger) -> bool:
+def is_url(path: str) -> bool:
+    return urlparse(path).scheme in ('https', 'http')
+
+def is_valid_path_or_url(path:str, logger: Logger, sas_token: str = None) -> bool:
+    if sas_token:
+        # A SAS token only applies to URLs
+        return validate_azure_blob_url(path, logger, sas_token)
     return validate_local_path(path, logger) or validate_azure_blob_url(path, logger)
 
+def validate_transfer_pair(source: str, destination: str, logger: Logger) -> bool:
+    """
+    Checks that azcopy can transfer between the two endpoints: at least one of them
+    must be a URL, and a URL-to-URL (service-to-service) copy must not point back at
+    its own source. SAS tokens in the query strings are ignored for the comparison.
+    """
+    if not is_url(source) and not is_url(destination):
+        logger.info(f"Invalid transfer: {source} -> {destination}\nazcopy does not transfer between two local paths.")
+        return False
+    if is_url(source) and is_url(destination):
+        source_url = urlparse(source)._replace(query='')
+        destination_url = urlparse(destination)._replace(query='')
+        if source_url.geturl().rstrip('/*') == destination_url.geturl().rstrip('/*'):
+            logger.info(f"Invalid transfer: {source_url.geturl()} is both the source and the destination.")
+            return False
+    return True
+
 
 # Auth validators   
 def validate_azcopy_envs(vars:list, logger: Logger):
@@ -62,16 +128,14 @@ def validate_network_available(logger: Logger, host="8.8.8.8", port=53, timeout=
     Host: 8.8.8.8 (google-public-dns-a.google.com)
     OpenPort: 53/tcp
     Service: domain (DNS/TCP)
+
+    The probe uses its own timeout and closes its socket; process-wide socket
+    defaults are left untouched.
     """
     try:
-        socket.setdefaulttimeout(timeout)
-        socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-        return True
-    except socket.error as ex:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError as ex:
         logger.info("No internet connection.")
         logger.info(f"Socket error:{ex}")
         return False
-        
-
-
-
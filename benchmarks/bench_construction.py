@@ -0,0 +1,71 @@
+"""
+Time how long importing azpype and constructing Copy objects take.
+
+Usage:
+    python benchmarks/bench_construction.py [--count N]
+
+Import time is measured in fresh interpreters so module caching does not hide it.
+Construction builds N Copy objects from a temporary local directory to a blob URL
+with console output discarded; nothing is executed.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DESTINATION = "https://benchaccount.blob.core.windows.net/bench/"
+
+
+def time_import(statement: str, repeat: int = 5) -> float:
+    """Median wall time in milliseconds of running ``statement`` in a new interpreter."""
+    baseline = []
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True, cwd=REPO_ROOT)
+        baseline.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, cwd=REPO_ROOT)
+        samples.append(time.perf_counter() - start)
+    return (statistics.median(samples) - statistics.median(baseline)) * 1000
+
+
+def time_construction(count: int, show_config: bool = True) -> tuple:
+    """Total and per-object wall time in milliseconds of constructing ``count`` Copy objects."""
+    sys.path.insert(0, REPO_ROOT)
+    from azpype.commands.copy import Copy
+    if hasattr(Copy, "show_config"):
+        Copy.show_config = show_config
+
+    with tempfile.TemporaryDirectory() as source:
+        # Discard Rich output so terminal speed does not skew the numbers
+        with contextlib.redirect_stdout(io.StringIO()):
+            Copy(source, DESTINATION)  # warm-up: first construction pays one-time setup
+            start = time.perf_counter()
+            for _ in range(count):
+                Copy(source, DESTINATION)
+            elapsed = time.perf_counter() - start
+    return elapsed * 1000, elapsed * 1000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200, help="number of Copy objects to construct")
+    args = parser.parse_args()
+
+    print(f"import azpype.commands              {time_import('import azpype.commands'):8.1f} ms")
+    print(f"from azpype.commands.copy import Copy {time_import('from azpype.commands.copy import Copy'):6.1f} ms")
+    total, per_object = time_construction(args.count)
+    print(f"construct {args.count} Copy objects         {total:8.1f} ms ({per_object:.3f} ms each)")
+    total, per_object = time_construction(args.count, show_config=False)
+    print(f"  ... with show_config = False      {total:8.1f} ms ({per_object:.3f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
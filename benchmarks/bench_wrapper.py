@@ -0,0 +1,154 @@
+"""
+Measure the overhead azpype adds around azcopy, using a stand-in azcopy binary.
+
+Usage:
+    python benchmarks/bench_wrapper.py [--lines N] [--jobs N] [--repeat N]
+                                       [--save FILE] [--baseline FILE] [--tolerance PCT]
+
+Each case runs against benchmarks/fake_azcopy.py (via AZPYPE_AZCOPY_PATH), so the
+numbers reflect the wrapper: spawning, reading, logging, rendering and parsing
+output. Wall time is the median of ``--repeat`` runs; peak memory is measured by
+tracemalloc in a separate run so its overhead does not distort the timings.
+
+With ``--baseline``, results are compared against a file written earlier by
+``--save`` and the script exits with status 1 if any case became slower or
+hungrier than the tolerance allows, so it can gate a release.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import fake_azcopy  # noqa: E402
+
+DESTINATION = "https://benchaccount.blob.core.windows.net/bench/"
+
+
+def build_cases(source: str, lines: int, jobs: int) -> dict:
+    """name -> callable running the case."""
+    from azpype.commands.base_command import BaseCommand
+    from azpype.commands.copy import Copy
+    from azpype.commands.jobs import Jobs
+    from azpype.commands.stdout_parser import AzCopyStdoutParser, AzCopyJsonParser
+    from azpype.retry import RetryPolicy
+
+    BaseCommand.show_config = False
+    no_retry = RetryPolicy(max_retries=0)
+    text_output = _capture_output(lines, [])
+    json_output = _capture_output(lines, ['--output-type=json'])
+
+    return {
+        'construct Copy x100': lambda: [Copy(source, DESTINATION) for _ in range(100)],
+        f'execute dry-run ({lines} lines)': lambda: Copy(source, DESTINATION, dry_run=True, retry_policy=no_retry).execute(),
+        f'execute stream dry-run ({lines} lines)': lambda: Copy(source, DESTINATION, dry_run=True, retry_policy=no_retry).execute(stream=True),
+        f'execute dry-run, quiet output ({lines} lines)': lambda: Copy(source, DESTINATION, dry_run=True, retry_policy=no_retry, output='quiet').execute(),
+        f'execute progress ({lines} updates)': lambda: Copy(source, DESTINATION, retry_policy=no_retry).execute(),
+        f'execute stream json ({lines} updates)': lambda: Copy(source, DESTINATION, retry_policy=no_retry, output_type='json').execute(on_progress=lambda s: None),
+        f'AzCopyStdoutParser ({lines} lines)': lambda: AzCopyStdoutParser(text_output),
+        f'AzCopyJsonParser ({lines} messages)': lambda: AzCopyJsonParser(json_output),
+        f'Jobs.list + failed ({jobs} jobs)': lambda: Jobs().list(refresh=True).failed(),
+        f'Jobs.last_failed cached ({jobs} jobs)': lambda: Jobs().last_failed(),
+    }
+
+
+def _capture_output(lines: int, flags: list) -> str:
+    """What the stand-in prints for a copy, for the parser-only cases."""
+    out = io.StringIO()
+    fake_azcopy.transfer('copy', fake_azcopy._flags(flags)[0], [], lines, 0, out)
+    return out.getvalue()
+
+
+@contextlib.contextmanager
+def _environment(values: dict):
+    saved = {k: os.environ.get(k) for k in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def measure(case, repeat: int) -> dict:
+    """Median wall time in ms over ``repeat`` runs, then peak traced memory in MiB of one more run."""
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            case()
+            samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'ms': statistics.median(samples) * 1000, 'peak_mib': peak / (1024 * 1024)}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Describe every case that regressed by more than ``tolerance`` percent."""
+    regressions = []
+    limit = 1 + tolerance / 100
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ('ms', 'peak_mib'):
+            if previous[metric] > 0 and current[metric] > previous[metric] * limit:
+                regressions.append(f"{name}: {metric} {previous[metric]:.2f} -> {current[metric]:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20000, help="output lines per transfer, e.g. 1000000 for a 1M-file dry run")
+    parser.add_argument("--jobs", type=int, default=2000, help="jobs reported by 'jobs list'")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--save", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against results saved earlier with --save")
+    parser.add_argument("--tolerance", type=float, default=20.0, help="allowed regression in percent (default 20)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as shim_dir, tempfile.TemporaryDirectory() as source:
+        env = {
+            'AZPYPE_AZCOPY_PATH': fake_azcopy.install_shim(shim_dir),
+            'FAKE_AZCOPY_LINES': str(args.lines),
+            'FAKE_AZCOPY_JOBS': str(args.jobs),
+        }
+        with _environment(env):
+            for name, case in build_cases(source, args.lines, args.jobs).items():
+                results[name] = measure(case, args.repeat)
+                print(f"{name:<50} {results[name]['ms']:10.1f} ms {results[name]['peak_mib']:10.2f} MiB peak")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
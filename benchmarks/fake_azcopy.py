@@ -0,0 +1,164 @@
+"""
+Stand-in for the azcopy executable that emits realistic output at scale.
+
+Point azpype at it with AZPYPE_AZCOPY_PATH (see ``install_shim``). The volume of
+output is controlled through environment variables:
+
+    FAKE_AZCOPY_LINES      dry-run or progress lines per copy/sync (default 1000)
+    FAKE_AZCOPY_JOBS       jobs reported by ``jobs list`` (default 100)
+    FAKE_AZCOPY_EXIT       exit code of copy/sync (default 0)
+
+``copy``/``sync`` with ``--dry-run`` print one DRYRUN line per file; otherwise they
+print a progress stream followed by the job summary. ``--output-type=json``
+switches to azcopy's JSON message stream. ``jobs list`` lists completed jobs with
+a single failed job last (and oldest).
+"""
+import json
+import os
+import stat
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+FILE_SIZE = 4096
+STARTED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _flags(argv):
+    flags, positional = {}, []
+    for arg in argv:
+        if arg.startswith('--'):
+            name, _, value = arg[2:].partition('=')
+            flags[name] = value or 'true'
+        else:
+            positional.append(arg)
+    return flags, positional
+
+
+def _message(kind, content, at):
+    return json.dumps({
+        "TimeStamp": at.isoformat().replace("+00:00", "Z"),
+        "MessageType": kind,
+        "MessageContent": json.dumps(content) if isinstance(content, dict) else content,
+        "PromptDetails": {"PromptType": "", "ResponseOptions": None, "PromptTarget": ""},
+    })
+
+
+def _summary(job_id, files, failed=0):
+    return {
+        "JobID": job_id, "JobStatus": "Failed" if failed else "Completed",
+        "TotalTransfers": str(files), "TransfersCompleted": str(files - failed),
+        "TransfersFailed": str(failed), "TransfersSkipped": "0",
+        "TotalBytesTransferred": str((files - failed) * FILE_SIZE), "BytesOverWire": str(files * FILE_SIZE),
+        "FileTransfers": str(files), "FolderPropertyTransfers": "0", "SymlinkTransfers": "0",
+        "PercentComplete": "100",
+    }
+
+
+def transfer(command, flags, positional, lines, exit_code, out):
+    job_id = str(uuid.UUID(int=lines))
+    source = positional[0] if positional else '.'
+    destination = positional[1] if len(positional) > 1 else 'https://account.blob.core.windows.net/c'
+    failed = 1 if exit_code else 0
+    as_json = flags.get('output-type') == 'json'
+
+    if flags.get('dry-run') == 'true':
+        for i in range(lines):
+            out.write(f"DRYRUN: {command} {source}/dir{i % 100}/file-{i:07d}.bin to {destination}/dir{i % 100}/file-{i:07d}.bin\n")
+        return 0
+
+    if as_json:
+        out.write(_message("Init", {"LogFileLocation": f"/tmp/{job_id}.log", "JobID": job_id, "IsCleanupJob": False}, STARTED) + "\n")
+        for i in range(lines):
+            progress = _summary(job_id, lines, 0)
+            progress.update({"JobStatus": "InProgress", "TransfersCompleted": str(i), "PercentComplete": str(100 * i / lines),
+                             "BytesOverWire": str(i * FILE_SIZE), "TotalBytesTransferred": str(i * FILE_SIZE)})
+            out.write(_message("Progress", progress, STARTED + timedelta(seconds=2 * i)) + "\n")
+        out.write(_message("EndOfJob", _summary(job_id, lines, failed), STARTED + timedelta(seconds=2 * lines)) + "\n")
+        return exit_code
+
+    out.write(f"INFO: Scanning...\n\nJob {job_id} has started\nLog file is located at: /tmp/{job_id}.log\n\n")
+    for i in range(lines):
+        out.write(f"{100 * i / lines:.1f} %, {i} Done, 0 Failed, {lines - i} Pending, 0 Skipped, {lines} Total, 2-sec Throughput (Mb/s): 812.4312\r")
+    out.write("\n\n")
+    status = "Failed" if failed else "Completed"
+    out.write(
+        f"Job {job_id} summary\n"
+        f"Elapsed Time (Minutes): {lines / 30:.4f}\n"
+        f"Number of File Transfers: {lines}\n"
+        f"Number of Folder Property Transfers: 0\n"
+        f"Number of Symlink Transfers: 0\n"
+        f"Total Number of Transfers: {lines}\n"
+        f"Number of File Transfers Completed: {lines - failed}\n"
+        f"Number of Folder Transfers Completed: 0\n"
+        f"Number of File Transfers Failed: {failed}\n"
+        f"Number of Folder Transfers Failed: 0\n"
+        f"Number of File Transfers Skipped: 0\n"
+        f"Number of Folder Transfers Skipped: 0\n"
+        f"TotalBytesTransferred: {(lines - failed) * FILE_SIZE}\n"
+        f"Final Job Status: {status}\n"
+    )
+    return exit_code
+
+
+def jobs_list(flags, jobs, out):
+    details = []
+    for i in range(jobs):
+        details.append({
+            "JobId": str(uuid.UUID(int=i + 1)),
+            "StartTime": (STARTED + timedelta(minutes=jobs - i)).isoformat().replace("+00:00", "Z"),
+            "CommandString": f"copy /data/export-{i} https://account.blob.core.windows.net/c/export-{i}",
+            "JobStatus": "Failed" if i == jobs - 1 else "Completed",
+        })
+    if flags.get('output-type') == 'json':
+        out.write(_message("EndOfJob", {"ErrorMessage": "", "JobIDDetails": details}, STARTED) + "\n")
+        return 0
+    out.write("Existing Jobs \n")
+    for job in details:
+        start = datetime.fromisoformat(job["StartTime"].replace("Z", "+00:00"))
+        out.write(
+            f"JobId: {job['JobId']}\n"
+            f"Start Time: {start.strftime('%A, %d-%b-%y %H:%M:%S UTC')}\n"
+            f"Status: {job['JobStatus']}\n"
+            f"Command: {job['CommandString']}\n\n"
+        )
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    lines = int(os.environ.get('FAKE_AZCOPY_LINES', 1000))
+    jobs = int(os.environ.get('FAKE_AZCOPY_JOBS', 100))
+    exit_code = int(os.environ.get('FAKE_AZCOPY_EXIT', 0))
+    flags, positional = _flags(argv[1:])
+    out = sys.stdout
+    command = argv[0] if argv else ''
+
+    if command in ('copy', 'sync'):
+        return transfer(command, flags, positional, lines, exit_code, out)
+    if command == 'jobs' and positional[:1] == ['list']:
+        return jobs_list(flags, jobs, out)
+    if command == 'jobs' and positional[:1] == ['resume']:
+        return transfer('copy', flags, [], lines, 0, out)
+    out.write(f"fake azcopy: unsupported command {' '.join(argv)}\n")
+    return 1
+
+
+def install_shim(directory) -> str:
+    """
+    Write an executable that runs this script with the current interpreter.
+
+    Returns
+    -------
+    str
+        Path to set as AZPYPE_AZCOPY_PATH.
+    """
+    path = os.path.join(str(directory), 'azcopy')
+    with open(path, 'w') as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1 +1,19 @@
-from .test_basecommand import TestBaseCommand
\ No newline at end of file
+from .test_basecommand import TestBaseCommand
+from .test_stdout_parser import TestAzCopyStdoutParser, TestAzCopyJsonParser
+from .test_batch import TestTransferBatch
+from .test_config import TestConfig
+from .test_prechecks import TestPrechecks
+from .test_copy import TestCopy
+from .test_watch import TestChangeBatcher
+from .test_transfer_index import TestTransferIndex
+from .test_sync import TestSync
+from .test_tuner import TestTuner
+from .test_packing import TestPacking
+from .test_metrics import TestMetrics
+from .test_sinks import TestSinks
+from .test_log_analyzer import TestLogAnalyzer
+from .test_jobs import TestJobs
+from .test_housekeeping import TestHousekeeping
+from .test_pipe import TestPipe
+from .test_list import TestList
+from .test_remove import TestRemove
\ No newline at end of file
@@ -0,0 +1,48 @@
+import os
+import stat
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+from azpype.housekeeping import RunIndex
+
+
+def start_patches(test, *patchers):
+    """Start each patcher and stop it when ``test`` finishes, whatever the outcome."""
+    for patcher in patchers:
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+
+def install_fake_azcopy(test, script: str) -> Path:
+    """
+    Run azpype against ``script`` instead of azcopy for the rest of ``test``.
+
+    The script is written to a temporary directory, which is removed when the test
+    finishes; tests keep their own files there too.
+
+    Returns
+    -------
+    Path
+        The temporary directory.
+    """
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    directory = Path(tmp.name)
+    azcopy = directory / "azcopy"
+    azcopy.write_text(script)
+    azcopy.chmod(azcopy.stat().st_mode | stat.S_IXUSR)
+    start_patches(test, patch.dict(os.environ, {"AZPYPE_AZCOPY_PATH": str(azcopy)}))
+    return directory
+
+
+def use_temporary_run_index(test) -> RunIndex:
+    """Record the jobs started during ``test`` in a throwaway run index instead of ~/.azpype/run_index.db."""
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    index = RunIndex(Path(tmp.name) / "runs.db")
+    test.addCleanup(index.close)
+    start_patches(test,
+        patch("azpype.commands.transfer_command.default_run_index", return_value=index),
+        patch("azpype.commands.jobs.default_run_index", return_value=index),
+    )
+    return index
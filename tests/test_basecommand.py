@@ -1,11 +1,17 @@
 import sys
 sys.path.append('../')
 import unittest
-from unittest.mock import patch, Mock, mock_open
+from unittest.mock import patch, Mock, MagicMock, mock_open
 from azpype.commands.base_command import BaseCommand
 from azpype.resource_paths import get_azcopy_path
+from azpype.logging_config import output_section
+from azpype.sinks import QuietSink
 import subprocess
 import yaml
+import asyncio
+import os
+import stat
+import tempfile
 
 
 # Create a concrete implementation for testing
@@ -43,6 +49,93 @@ class TestBaseCommand(unittest.TestCase):
         expected_output = (1, "Error")
         self.assertEqual(self.command.execute(args, options), expected_output)
 
+    @patch("subprocess.Popen")
+    def test_execute_stream_keeps_tail(self, mock_popen):
+        args = ["arg1", "arg2"]
+        lines = [f"line {i}\n" for i in range(10)]
+        stdout = MagicMock()
+        stdout.__iter__.return_value = iter(lines)
+        mock_popen.return_value = Mock(stdout=stdout, wait=Mock(return_value=0), poll=Mock(return_value=0))
+        seen = []
+        with patch.object(self.command, "build_command", wraps=self.command.build_command) as build_command:
+            exit_code, tail = self.command.execute_stream(args, {}, on_output=seen.append, tail_lines=3)
+        build_command.assert_called_once_with(args, {})
+        self.assertEqual(mock_popen.call_args.args[0], self.command.build_command(args, {}))
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(tail, "line 7\nline 8\nline 9")
+        self.assertEqual(len(seen), 10)
+
+    @unittest.skipIf(os.name == "nt", "requires a POSIX shell")
+    def test_execute_async_and_cancel(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "fake_azcopy")
+            with open(script, "w") as f:
+                f.write('#!/bin/sh\nprintf "10 %%\\r20 %%\\rdone\\n"\nif [ "$2" = "slow" ]; then exec sleep 30; fi\n')
+            os.chmod(script, os.stat(script).st_mode | stat.S_IXUSR)
+            self.command.azcopy_path = script
+
+            exit_code, tail = asyncio.run(self.command.execute_async(["fast"], {}))
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(tail.split("\n"), ["10 %", "20 %", "done"])
+
+            async def cancel_slow():
+                task = asyncio.create_task(self.command.execute_async(["slow"], {}))
+                await asyncio.sleep(0.5)
+                task.cancel()
+                await task
+
+            with self.assertRaises(asyncio.CancelledError):
+                asyncio.run(asyncio.wait_for(cancel_slow(), 10))
+
+    @unittest.skipIf(os.name == "nt", "requires a POSIX shell")
+    def test_execute_async_stops_azcopy_on_errors_and_splits_progress(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "fake_azcopy")
+            pid_file = os.path.join(tmp, "pid")
+            with open(script, "w") as f:
+                f.write(f'#!/bin/sh\necho $$ > {pid_file}\nif [ "$2" = "progress" ]; then seq 200000 | tr "\\n" "\\r"; exit 0; fi\necho start\nexec sleep 30\n')
+            os.chmod(script, os.stat(script).st_mode | stat.S_IXUSR)
+            self.command.azcopy_path = script
+            self.command.output = QuietSink()
+
+            # More than STREAM_LINE_LIMIT of carriage-return separated progress, with no newline
+            exit_code, tail = asyncio.run(self.command.execute_async(["progress"], {}, tail_lines=2))
+            self.assertEqual((exit_code, tail), (0, "199999\n200000"))
+
+            def fail(line):
+                raise RuntimeError(line)
+
+            with self.assertRaisesRegex(RuntimeError, "start"):
+                asyncio.run(asyncio.wait_for(self.command.execute_async(["slow"], {}, on_output=fail), 10))
+            with open(pid_file) as f:
+                pid = int(f.read())
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+
+    @patch("subprocess.Popen")
+    def test_streamed_output_is_logged_in_batches(self, mock_popen):
+        lines = [f"line {i}\n" for i in range(1200)]
+        stdout = MagicMock()
+        stdout.__iter__.return_value = iter(lines)
+        mock_popen.return_value = Mock(stdout=stdout, wait=Mock(return_value=0), poll=Mock(return_value=0))
+        self.command.output = QuietSink()
+        self.command.logger = Mock()
+        self.command.execute_stream(["arg1"], {})
+        # Header, three batches of at most 500 lines, footer
+        self.assertEqual(self.command.logger.info.call_count, 5)
+        self.assertTrue(self.command.logger.info.call_args_list[3].args[0].endswith("line 1199"))
+
+    @patch("azpype.logging_config.OUTPUT_ATTACH_CHARS", 10)
+    def test_large_output_is_attached_as_file(self):
+        section = output_section("STDOUT", "x" * 20)
+        path = section.split("written to ")[1]
+        try:
+            with open(path) as f:
+                self.assertEqual(f.read(), "x" * 20)
+        finally:
+            os.remove(path)
+        self.assertEqual(output_section("STDERR", "a\nb\n"), "STDERR:\n  a\n  b")
+
     def test_build_command_with_underscores(self):
         """Test that underscores in option names are preserved in build_command"""
         args = ["source", "dest"]
@@ -0,0 +1,46 @@
+import sys
+sys.path.append('../')
+import unittest
+from unittest.mock import patch, Mock
+from azpype.commands.batch import TransferBatch, BatchResult, split_budget
+
+
+class TestTransferBatch(unittest.TestCase):
+    def test_split_budget(self):
+        env = split_budget(4, total_concurrency=128, total_buffer_gb=8)
+        self.assertEqual(env, {"AZCOPY_CONCURRENCY_VALUE": 32, "AZCOPY_BUFFER_GB": 2.0})
+
+    def test_batch_result_aggregates(self):
+        ok = Mock(exit_code=0, total_bytes_transferred=300, number_of_file_transfers_failed=0)
+        bad = Mock(exit_code=1, total_bytes_transferred=100, number_of_file_transfers_failed=2)
+        result = BatchResult([ok, bad, None], {2: ValueError("boom")}, elapsed_seconds=2.0)
+        self.assertEqual(result.total_bytes_transferred, 400)
+        self.assertEqual(result.number_of_file_transfers_failed, 2)
+        self.assertEqual(result.throughput, 200.0)
+        self.assertEqual(result.failed, [1, 2])
+        self.assertFalse(result.succeeded)
+
+    @patch("azpype.commands.batch.Copy")
+    def test_run_applies_budget_per_process(self, mock_copy):
+        copies = []
+
+        def make_copy(*args, **kwargs):
+            copy = Mock(env={})
+            copy.execute.return_value = Mock(exit_code=0, total_bytes_transferred=10)
+            copies.append(copy)
+            return copy
+
+        mock_copy.side_effect = make_copy
+        batch = TransferBatch(max_processes=2, total_concurrency=64, total_buffer_gb=4)
+        for i in range(3):
+            batch.add(f"./src{i}", "https://acct.blob.core.windows.net/c/")
+        result = batch.run()
+
+        self.assertTrue(result.succeeded)
+        self.assertEqual(result.total_bytes_transferred, 30)
+        for copy in copies:
+            self.assertEqual(copy.env, {"AZCOPY_CONCURRENCY_VALUE": 32, "AZCOPY_BUFFER_GB": 2.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+sys.path.append('../')
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from azpype import config
+
+
+PROFILES = """
+huge-blobs:
+  flags:
+    block-size-mb: 100
+    log-level: 'WARNING'
+  env:
+    AZCOPY_CONCURRENCY_VALUE: 64
+  sync:
+    compare-hash: 'MD5'
+"""
+
+
+class TestConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.profiles = self.dir / "profiles.yaml"
+        self.profiles.write_text(PROFILES)
+        self.copy_config = self.dir / "copy_config.yaml"
+        self.copy_config.write_text("overwrite: 'ifSourceNewer'\nlog-level: 'INFO'\ndry-run: NULL\n")
+        config.clear_config_cache()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        config.clear_config_cache()
+
+    def test_load_config_reloads_on_change(self):
+        self.assertEqual(config.load_config(self.copy_config), {"overwrite": "ifSourceNewer", "log-level": "INFO"})
+        self.copy_config.write_text("overwrite: 'false'\n")
+        os.utime(self.copy_config, ns=(1, 1))
+        self.assertEqual(config.load_config(self.copy_config), {"overwrite": "false"})
+
+    def test_load_profile(self):
+        with patch("azpype.config.ensure_user_profiles", return_value=self.profiles):
+            profile = config.load_profile("huge-blobs")
+            self.assertEqual(profile.env, {"AZCOPY_CONCURRENCY_VALUE": "64"})
+            self.assertEqual(profile.flags_for("sync")["compare-hash"], "MD5")
+            self.assertNotIn("compare-hash", profile.flags_for("copy"))
+            with self.assertRaises(ValueError):
+                config.load_profile("missing")
+            with patch.dict(os.environ, {config.PROFILE_ENV_VAR: "huge-blobs"}):
+                self.assertEqual(config.load_profile().name, "huge-blobs")
+
+    def test_resolve_flags_precedence(self):
+        with patch("azpype.config.ensure_user_profiles", return_value=self.profiles), \
+             patch("azpype.config.ensure_user_config", return_value=self.copy_config):
+            flags = config.resolve_flags("copy", config.load_profile("huge-blobs"), {"log-level": "ERROR"})
+        self.assertEqual(flags, {"overwrite": "ifSourceNewer", "log-level": "ERROR", "block-size-mb": 100})
+
+
+if __name__ == "__main__":
+    unittest.main()
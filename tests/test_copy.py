@@ -0,0 +1,227 @@
+import sys
+sys.path.append('../')
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from azpype.commands.base_command import BaseCommand
+from azpype import metrics
+from azpype.commands.copy import Copy
+from azpype.retry import RetryPolicy
+from azpype.transfer_index import TransferIndex
+from tests.helpers import start_patches, use_temporary_run_index
+
+DESTINATION = "https://account.blob.core.windows.net/container/"
+
+
+class TestCopy(unittest.TestCase):
+    def setUp(self):
+        self.index = use_temporary_run_index(self)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        start_patches(self,
+            patch("azpype.commands.base_command.run_prechecks", return_value={}),
+            patch.object(BaseCommand, "show_config", False),
+        )
+
+    def make_copy(self, **kwargs):
+        return Copy(self.tmp.name, DESTINATION, retry_policy=RetryPolicy(max_retries=2, initial_wait_time=0), **kwargs)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_failed_copy_is_resumed(self, mock_execute):
+        mock_execute.side_effect = [
+            (1, "Job job-1 has started\nFinal Job Status: Failed"),
+            (0, "Job job-1 summary\nFinal Job Status: Completed"),
+        ]
+        result = self.make_copy(sas_token="sv=1&sig=abc").execute()
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.retries, 1)
+        self.assertEqual(result.job_id, "job-1")
+        resume_call = mock_execute.call_args_list[1]
+        self.assertEqual(resume_call.args[0].command_name, "jobs")
+        self.assertEqual(resume_call.args[1], ["resume", "job-1"])
+        self.assertEqual(resume_call.args[2], {"destination-sas": "sv=1&sig=abc"})
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_retries_stop_at_policy_limit(self, mock_execute):
+        mock_execute.return_value = (1, "Job job-2 has started\nFinal Job Status: Failed")
+        result = self.make_copy().execute()
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(result.retries, 2)
+        self.assertEqual(mock_execute.call_count, 3)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_no_resume_without_job_id(self, mock_execute):
+        mock_execute.return_value = (1, "failed to parse user input")
+        result = self.make_copy().execute()
+        self.assertEqual(result.retries, 0)
+        self.assertEqual(mock_execute.call_count, 1)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_run_index_errors_do_not_fail_the_copy(self, mock_execute):
+        mock_execute.return_value = (0, "Job job-1 summary\nFinal Job Status: Completed")
+        copy = self.make_copy()
+        copy.execute()
+        self.assertEqual(self.index.job_ids(copy.run_name), ["job-1"])
+        with patch("azpype.commands.transfer_command.default_run_index", side_effect=OSError("Read-only file system")):
+            self.assertEqual(copy.execute().exit_code, 0)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_execute_list_writes_list_of_files(self, mock_execute):
+        captured = {}
+
+        def fake_execute(command, args, options):
+            with open(options["list-of-files"]) as f:
+                captured["entries"] = f.read().splitlines()
+            captured["options"] = options
+            return 0, "Final Job Status: Completed"
+
+        mock_execute.side_effect = fake_execute
+        copy = self.make_copy()
+        copy._execute_list(["a.txt", "sub/b.txt"], block_size_mb=8)
+
+        self.assertEqual(captured["entries"], ["a.txt", "sub/b.txt"])
+        self.assertEqual(captured["options"]["block-size-mb"], 8)
+        self.assertNotIn("list-of-files", copy.options)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_dry_run_delta_leaves_index_unchanged(self, mock_execute):
+        for name in ("a.txt", "b.txt"):
+            with open(os.path.join(self.tmp.name, name), "w") as f:
+                f.write(name)
+        sent = []
+
+        def fake_execute(command, args, options):
+            with open(options["list-of-files"]) as f:
+                sent.append(sorted(f.read().splitlines()))
+            return 0, "Final Job Status: Completed"
+
+        mock_execute.side_effect = fake_execute
+        with tempfile.TemporaryDirectory() as tmp:
+            index = TransferIndex(os.path.join(tmp, "index.db"))
+            self.make_copy(dry_run=True).execute_delta(index=index)
+            self.make_copy().execute_delta(index=index)
+            result = self.make_copy().execute_delta(index=index)
+            index.close()
+        self.assertEqual(sent, [["a.txt", "b.txt"], ["a.txt", "b.txt"]])
+        self.assertEqual(result.number_of_file_transfers, 0)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_execute_sharded_resumes_only_failed_shard(self, mock_execute):
+        for name, size in [("big.bin", 300), ("mid.bin", 150), ("a.bin", 100), ("b.bin", 50)]:
+            with open(os.path.join(self.tmp.name, name), "wb") as f:
+                f.write(b"x" * size)
+        shards = {}
+        lock = threading.Lock()
+
+        def fake_execute(command, args, options):
+            if args[0] == "resume":
+                return 0, f"Job {args[1]} summary\nNumber of File Transfers Completed: 1\nFinal Job Status: Completed"
+            with open(options["list-of-files"]) as f:
+                entries = sorted(f.read().splitlines())
+            with lock:
+                job_id = f"job-{len(shards)}"
+                shards[job_id] = (entries, command.env["AZCOPY_CONCURRENCY_VALUE"])
+            if "big.bin" in entries:
+                return 1, f"Job {job_id} has started\nNumber of File Transfers Completed: 0\nFinal Job Status: Failed"
+            return 0, f"Job {job_id} summary\nNumber of File Transfers Completed: {len(entries)}\nFinal Job Status: Completed"
+
+        mock_execute.side_effect = fake_execute
+        result = self.make_copy().execute_sharded(shards=2, total_concurrency=64)
+
+        self.assertEqual(sorted(entries for entries, _ in shards.values()), [["a.bin", "b.bin", "mid.bin"], ["big.bin"]])
+        self.assertEqual({concurrency for _, concurrency in shards.values()}, {32})
+        resumes = [c.args[1] for c in mock_execute.call_args_list if c.args[1][0] == "resume"]
+        self.assertEqual(len(resumes), 1)
+        self.assertEqual(shards[resumes[0][1]][0], ["big.bin"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.final_job_status, "Completed")
+        self.assertEqual(result.number_of_file_transfers_completed, 4)
+        self.assertEqual(result.retries, 1)
+        self.assertEqual(len(result.parts), 2)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_execute_sharded_records_only_the_merged_result(self, mock_execute):
+        for name in ("a.bin", "b.bin"):
+            with open(os.path.join(self.tmp.name, name), "wb") as f:
+                f.write(b"x" * 100)
+        mock_execute.return_value = (0, "Number of File Transfers Completed: 1\nFinal Job Status: Completed")
+        exported = []
+        metrics.register_exporter(exported.append)
+        self.addCleanup(metrics.unregister_exporter, exported.append)
+
+        copy = self.make_copy()
+        first = copy.execute_sharded(shards=2)
+        second = copy.execute_sharded(shards=2)
+
+        self.assertEqual([m.files_completed for m in exported], [2, 2])
+        self.assertEqual(second.timings.seconds["config"], first.timings.seconds["config"])
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    @patch.object(BaseCommand, "iter_output", autospec=True)
+    def test_retry_failed_sends_only_failed_transfers(self, mock_iter_output, mock_execute):
+        shown = [
+            "----------- Transfers for JobId job-1 -----------",
+            f"transfer--> source: {self.tmp.name}/sub/b.txt destination: {DESTINATION}sub/b.txt status Failed",
+            f"transfer--> source: {self.tmp.name}/a.txt destination: {DESTINATION}a.txt status Failed",
+        ]
+
+        def fake_iter_output(command, args, options):
+            self.assertEqual((args, options), (["show", "job-1"], {"with-status": "Failed"}))
+            yield from shown
+            command.last_exit_code = 0
+
+        captured = {}
+
+        def fake_execute(command, args, options):
+            with open(options["list-of-files"]) as f:
+                captured["entries"] = f.read().splitlines()
+            captured["args"], captured["options"] = args, options
+            return 0, "Final Job Status: Completed"
+
+        mock_iter_output.side_effect = fake_iter_output
+        mock_execute.side_effect = fake_execute
+        other = "https://other.blob.core.windows.net/backup/"
+        result = self.make_copy().retry_failed("job-1", destination=other, sas_token="sig=x", block_size_mb=4)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(captured["entries"], ["sub/b.txt", "a.txt"])
+        self.assertEqual(captured["args"], [self.tmp.name, other + "?sig=x"])
+        self.assertEqual(captured["options"]["block-size-mb"], 4)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    @patch.object(BaseCommand, "iter_output", autospec=True)
+    def test_retry_failed_validates_the_new_destination(self, mock_iter_output, mock_execute):
+        other = "https://other.blob.core.windows.net/backup/"
+        expired = "sv=2022-11-02&se=2020-01-01T00:00:00Z&sig=x"
+        with self.assertRaisesRegex(Exception, r"Invalid options passed to Copy command. Failed checks: \['destination'\]"):
+            self.make_copy().retry_failed("job-1", destination=other, sas_token=expired)
+        mock_iter_output.assert_not_called()
+        mock_execute.assert_not_called()
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_fanout_uploads_once_then_replicates(self, mock_execute):
+        calls = []
+
+        def fake_execute(command, args, options):
+            calls.append((args, options))
+            return 0, f"Job job-{len(calls)} has started\nTotalBytesTransferred: 100\nFinal Job Status: Completed"
+
+        mock_execute.side_effect = fake_execute
+        replicas = [("https://west.blob.core.windows.net/mirror/", "sv=1&sig=w"), "not-a-url"]
+        result = self.make_copy(sas_token="sv=1&sig=abc").execute_fanout(replicas, primary_sas_token="sv=1&sig=read")
+
+        name = os.path.basename(self.tmp.name)
+        self.assertEqual(calls[0][0], [self.tmp.name, DESTINATION + "?sv=1&sig=abc"])
+        self.assertEqual(calls[1][0], [f"{DESTINATION}{name}?sv=1&sig=read", "https://west.blob.core.windows.net/mirror/?sv=1&sig=w"])
+        self.assertTrue(calls[1][1]["recursive"])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(result.parts), 3)
+        self.assertEqual(result.total_bytes_transferred, 200)
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(result.destinations[1], "https://west.blob.core.windows.net/mirror/")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+sys.path.append('../')
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.copy import Copy
+from azpype.commands.jobs import Jobs
+from azpype.housekeeping import RetentionPolicy, RunIndex, job_files, prune
+
+DESTINATION = "https://account.blob.core.windows.net/container/"
+DAY = 86400
+
+
+def job_id(n):
+    return f"{n:08x}-0000-0000-0000-000000000000"
+
+
+class TestHousekeeping(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.plans = Path(self.tmp.name) / "plans"
+        self.plans.mkdir()
+        self.now = time.time()
+        # Job n was last touched n days ago and holds n * 1 KiB
+        for n in range(1, 6):
+            for name in (f"{job_id(n)}--00000.steV17", f"{job_id(n)}--00001.steV17"):
+                path = self.plans / name
+                path.write_bytes(b"x" * 512 * n)
+                os.utime(path, (self.now - n * DAY, self.now - n * DAY))
+        (self.plans / "notes.txt").write_text("not a job")
+        self.index = RunIndex(Path(self.tmp.name) / "runs.db")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def selected(self, policy):
+        return [job.job_id for job in policy.select(job_files(self.plans), now=self.now)]
+
+    def test_policies_by_age_count_and_size(self):
+        self.assertEqual(self.selected(RetentionPolicy(max_age_days=3.5)), [job_id(4), job_id(5)])
+        self.assertEqual(self.selected(RetentionPolicy(max_jobs=2)), [job_id(3), job_id(4), job_id(5)])
+        self.assertEqual(self.selected(RetentionPolicy(max_total_mb=3 / 1024)), [job_id(3), job_id(4), job_id(5)])
+        self.assertEqual(self.selected(RetentionPolicy(max_jobs=0, min_age_minutes=2.5 * 24 * 60)), [job_id(3), job_id(4), job_id(5)])
+
+    def test_prune_removes_only_selected_job_files(self):
+        dry = prune(self.plans, RetentionPolicy(max_jobs=3), dry_run=True)
+        self.assertEqual((dry.job_ids, dry.files, dry.bytes_freed), ([job_id(4), job_id(5)], 4, 9 * 1024))
+        self.assertEqual(len(list(self.plans.iterdir())), 11)
+
+        prune(self.plans, RetentionPolicy(max_jobs=3))
+        self.assertEqual([job.job_id for job in job_files(self.plans)], [job_id(1), job_id(2), job_id(3)])
+        self.assertTrue((self.plans / "notes.txt").exists())
+
+    @patch("azpype.commands.base_command.run_prechecks", return_value={})
+    @patch.object(BaseCommand, "show_config", False)
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_resume_by_run_id_is_an_index_lookup(self, mock_execute, _):
+        mock_execute.return_value = (0, f"Job {job_id(7)} summary\nFinal Job Status: Completed")
+        with patch("azpype.commands.transfer_command.default_run_index", return_value=self.index), \
+                patch("azpype.commands.jobs.default_run_index", return_value=self.index):
+            copy = Copy(self.tmp.name, DESTINATION)
+            copy.execute()
+            self.assertEqual(self.index.job_ids(copy.run_name + "/"), [job_id(7)])
+
+            Jobs().resume(run_id=copy.run_name)
+            self.assertEqual(mock_execute.call_args.args[1], ["resume", job_id(7)])
+            with self.assertRaises(ValueError):
+                Jobs().resume(run_id="2020-01-01/00-00-00--unknown")
+
+            mock_execute.return_value = (0, "")
+            Jobs().remove(job_id(7))
+            self.assertEqual(mock_execute.call_args.args[1], ["rm", job_id(7)])
+            self.assertIsNone(self.index.latest_job(copy.run_name))
+
+
+if __name__ == '__main__':
+    unittest.main()
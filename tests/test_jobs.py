@@ -0,0 +1,71 @@
+import sys
+sys.path.append('../')
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.jobs import Jobs, JobIndex, job_list_cache
+from tests.helpers import start_patches
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def listing(*jobs):
+    details = [
+        {"JobId": job_id, "StartTime": (NOW - age).isoformat().replace("+00:00", "Z"), "CommandString": f"copy {job_id}", "JobStatus": status}
+        for job_id, age, status in jobs
+    ]
+    content = json.dumps({"ErrorMessage": "", "JobIDDetails": details})
+    return json.dumps({"TimeStamp": NOW.isoformat(), "MessageType": "EndOfJob", "MessageContent": content}) + "\n"
+
+
+class TestJobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        start_patches(self, patch.dict(os.environ, {"AZCOPY_JOB_PLAN_LOCATION": self.tmp.name}))
+        job_list_cache.invalidate()
+        self.addCleanup(job_list_cache.invalidate)
+
+    def test_index_queries_by_status_and_start_time(self):
+        index = JobIndex.from_json(listing(
+            ("old-failed", timedelta(hours=3), "Failed"),
+            ("done", timedelta(minutes=30), "Completed"),
+            ("cancelled", timedelta(minutes=20), "Cancelled"),
+            ("recent-failed", timedelta(minutes=10), "Failed"),
+        ))
+        self.assertEqual([r.job_id for r in index], ["recent-failed", "cancelled", "done", "old-failed"])
+        self.assertEqual(index[0].start_time, NOW - timedelta(minutes=10))
+        self.assertEqual([r.job_id for r in index.failed(since=timedelta(hours=1))], ["recent-failed", "cancelled"])
+        self.assertEqual([r.job_id for r in index.query("Failed")], ["recent-failed", "old-failed"])
+        self.assertEqual(index.get("done").command, "copy done")
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_list_is_cached_until_plans_change(self, mock_execute):
+        mock_execute.return_value = (0, listing(("job-1", timedelta(minutes=5), "Failed")))
+        jobs = Jobs()
+
+        self.assertEqual(jobs.last_failed(), "job-1")
+        self.assertEqual(jobs.last_failed(), "job-1")
+        self.assertEqual(mock_execute.call_count, 1)
+        self.assertEqual(mock_execute.call_args.args[2], {"output-type": "json"})
+
+        # A new job plan invalidates the listing
+        plan = os.path.join(self.tmp.name, "job-2.steV0")
+        open(plan, "w").close()
+        os.utime(self.tmp.name, ns=(0, os.stat(self.tmp.name).st_mtime_ns + 1_000_000))
+        mock_execute.return_value = (0, listing(("job-1", timedelta(minutes=5), "Failed"), ("job-2", timedelta(minutes=1), "Completed")))
+        self.assertEqual(len(jobs.list()), 2)
+        self.assertEqual(mock_execute.call_count, 2)
+
+    @patch.object(BaseCommand, "execute", autospec=True, return_value=(1, "error"))
+    def test_failed_listing_raises(self, _):
+        with self.assertRaises(Exception):
+            Jobs().list()
+
+
+if __name__ == '__main__':
+    unittest.main()
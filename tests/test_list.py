@@ -0,0 +1,87 @@
+import sys
+sys.path.append('../')
+import json
+import os
+import types
+import unittest
+from unittest.mock import patch
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.listing import List
+from tests.helpers import install_fake_azcopy, start_patches
+
+CONTAINER = "https://account.blob.core.windows.net/container/"
+
+# Stands in for azcopy: prints $LIST_OUTPUT and exits with $LIST_EXIT
+FAKE_AZCOPY = '#!/bin/sh\necho "$*" > "$LIST_OUTPUT.args"\ncat "$LIST_OUTPUT"\nexit ${LIST_EXIT:-0}\n'
+
+
+def list_object(path, size, md5=None):
+    content = {"Path": path, "LastModifiedTime": "2024-01-02T03:04:05.123456789Z", "ContentLength": str(size)}
+    if md5:
+        content["ContentMD5"] = md5
+    return json.dumps({"TimeStamp": "2024-01-02T03:04:06Z", "MessageType": "ListObject", "MessageContent": json.dumps(content)})
+
+
+@unittest.skipIf(os.name == "nt", "requires a POSIX shell")
+class TestList(unittest.TestCase):
+    def setUp(self):
+        self.dir = install_fake_azcopy(self, FAKE_AZCOPY)
+        self.listing = str(self.dir / "listing.jsonl")
+        start_patches(self,
+            patch.dict(os.environ, {"LIST_OUTPUT": self.listing}),
+            patch("azpype.commands.base_command.run_prechecks", return_value={}),
+            patch.object(BaseCommand, "show_config", False),
+        )
+
+    def write_listing(self, lines):
+        with open(self.listing, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def test_entries_are_streamed_lazily(self):
+        lines = ["INFO: Scanning...", list_object("a.txt", 11, "XrY7u+Ae7tCTyyK7j1rNww==")]
+        lines += [list_object(f"dir/{i}.bin", i) for i in range(1000)]
+        lines.append(json.dumps({"MessageType": "ListSummary", "MessageContent": "{}"}))
+        self.write_listing(lines)
+
+        entries = List(CONTAINER, sas_token="sv=1&sig=abc", output="quiet", properties="ContentType").execute()
+        self.assertIsInstance(entries, types.GeneratorType)
+        self.assertFalse(os.path.exists(self.listing + ".args"))
+
+        first = next(entries)
+        self.assertEqual((first.name, first.size, first.content_md5), ("a.txt", 11, "XrY7u+Ae7tCTyyK7j1rNww=="))
+        self.assertEqual(first.last_modified.year, 2024)
+        self.assertEqual(sum(entry.size for entry in entries), sum(range(1000)))
+        with open(self.listing + ".args") as f:
+            args = f.read()
+        self.assertIn("--properties=LastModifiedTime;ContentMD5;BlobType;BlobAccessTier;ContentType", args)
+        self.assertIn("--output-type=json", args)
+
+    def test_failure_raises_after_entries(self):
+        self.write_listing([list_object("a.txt", 1), json.dumps({"MessageType": "Error", "MessageContent": "AuthorizationFailure"})])
+        with patch.dict(os.environ, {"LIST_EXIT": "1"}), self.assertRaisesRegex(Exception, "AuthorizationFailure"):
+            list(List(CONTAINER, output="quiet"))
+
+    def test_package_exports_list(self):
+        import azpype.commands as commands
+        self.assertIs(commands.List, List)
+        self.assertIn("List", dir(commands))
+
+    def test_copy_tuned_profile_leaves_list_command_valid(self):
+        profiles = self.dir / "profiles.yaml"
+        profiles.write_text("copy-tuned:\n  flags:\n    block-size-mb: 8\n    log-level: 'ERROR'\n")
+        self.write_listing([list_object("a.txt", 1)])
+        with patch("azpype.config.ensure_user_profiles", return_value=profiles):
+            entries = list(List(CONTAINER, output="quiet", profile="copy-tuned").execute())
+        self.assertEqual([entry.name for entry in entries], ["a.txt"])
+        with open(self.listing + ".args") as f:
+            args = f.read()
+        self.assertIn("--log-level=ERROR", args)
+        self.assertNotIn("--block-size-mb", args)
+
+    def test_local_path_is_rejected(self):
+        with self.assertRaises(Exception):
+            List(str(self.dir), output="quiet")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import sys
+sys.path.append('../')
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.copy import Copy
+from azpype.log_analyzer import JobLogReport, iter_log_events, job_log_path
+from tests.helpers import use_temporary_run_index
+
+DESTINATION = "https://account.blob.core.windows.net/container/"
+JOB_LOG = """2024/01/01 10:00:00 AzcopyVersion  10.25.0
+2024/01/01 10:00:00 Job-Command copy {source} https://account.blob.core.windows.net/container/
+2024/01/01 10:00:01 ==> REQUEST/RESPONSE (Try=1/3.5s[SLOW >3s], OpTime=3.6s) -- RESPONSE SUCCESSFULLY RECEIVED
+   PUT https://account.blob.core.windows.net/container/big.bin?blockid=AAA&comp=block
+   --------------------------------------------------------------------------------
+   RESPONSE Status: 201 Created
+2024/01/01 10:00:02 ==> REQUEST/RESPONSE (Try=2/120.5ms, OpTime=1m2.5s) -- RESPONSE STATUS CODE ERROR
+   PUT https://account.blob.core.windows.net/container/sub/b.txt
+   --------------------------------------------------------------------------------
+   RESPONSE Status: 503 The server is busy.
+      X-Ms-Error-Code: [ServerBusy]
+2024/01/01 10:00:03 ERR: [P#0-T#1] UPLOADFAILED: {source}/sub/b.txt : 503 : 503 The server is busy.. When Staging block. X-Ms-Request-Id: 1
+
+   Dst: https://account.blob.core.windows.net/container/sub/b.txt
+2024/01/01 10:00:04 ERR: [P#0-T#2] UPLOADFAILED: {source}/a.txt : 000 : dial tcp: i/o timeout Dst: https://account.blob.core.windows.net/container/a.txt
+2024/01/01 10:00:05 ERR: [P#0-T#3] UPLOADFAILED: /elsewhere/c.txt : 403 : 403 This request is not authorized.
+"""
+
+
+class TestLogAnalyzer(unittest.TestCase):
+    def setUp(self):
+        use_temporary_run_index(self)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "data")
+        os.mkdir(self.source)
+        self.log_dir = Path(self.tmp.name) / "azcopy_logs"
+        self.log_dir.mkdir()
+        self.log = self.log_dir / "job-1.log"
+        self.log.write_text(JOB_LOG.format(source=self.source))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_report_extracts_failures_statuses_and_throttling(self):
+        report = JobLogReport.for_job("job-1", log_dir=self.log_dir)
+
+        self.assertEqual([f.status for f in report.failures], [503, 0, 403])
+        self.assertEqual(report.failures[0].destination, "https://account.blob.core.windows.net/container/sub/b.txt")
+        self.assertEqual(report.failures[1].message, "dial tcp: i/o timeout")
+        self.assertEqual(report.status_counts, {201: 1, 503: 1})
+        self.assertEqual(len(report.throttled), 1)
+        self.assertEqual(report.throttled[0].error_code, "ServerBusy")
+        self.assertEqual(report.throttled[0].op_seconds, 62.5)
+        self.assertEqual([e.try_seconds for e in report.slow], [3.5])
+        self.assertEqual(report.relative_paths(self.source), ["sub/b.txt", "a.txt"])
+
+    def test_empty_and_missing_logs(self):
+        empty = self.log_dir / "job-2.log"
+        empty.touch()
+        self.assertEqual(list(iter_log_events(empty)), [])
+        with self.assertRaises(FileNotFoundError):
+            job_log_path("job-3", self.log_dir)
+
+    @patch("azpype.commands.base_command.run_prechecks", return_value={})
+    @patch.object(BaseCommand, "show_config", False)
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_retry_from_log_sends_only_failed_files(self, mock_execute, _):
+        captured = {}
+
+        def fake_execute(command, args, options):
+            with open(options["list-of-files"]) as f:
+                captured["entries"] = f.read().splitlines()
+            captured["options"] = options
+            return 0, "Final Job Status: Completed"
+
+        mock_execute.side_effect = fake_execute
+        result = Copy(self.source, DESTINATION).retry_from_log(log_path=self.log, block_size_mb=4)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(captured["entries"], ["sub/b.txt", "a.txt"])
+        self.assertEqual(captured["options"]["block-size-mb"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
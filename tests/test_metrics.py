@@ -0,0 +1,76 @@
+import sys
+sys.path.append('../')
+import time
+import unittest
+from unittest.mock import patch
+from azpype import metrics
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.copy import Copy
+from azpype.metrics import PhaseTimings, PrometheusTextfileExporter
+from tests.helpers import install_fake_azcopy, start_patches, use_temporary_run_index
+
+DESTINATION = "https://account.blob.core.windows.net/container/"
+FAKE_AZCOPY = """#!/bin/sh
+echo "Job job-1 has started"
+echo "Job job-1 summary"
+echo "Elapsed Time (Minutes): 0.5"
+echo "Number of File Transfers Completed: 60"
+echo "TotalBytesTransferred: 3000"
+echo "Final Job Status: Completed"
+"""
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        use_temporary_run_index(self)
+        self.dir = install_fake_azcopy(self, FAKE_AZCOPY)
+        start_patches(self, patch("azpype.commands.base_command.run_prechecks", return_value={}))
+
+    def test_nested_phases_exclude_inner_time(self):
+        timings = PhaseTimings()
+        with timings.phase("transfer"):
+            time.sleep(0.02)
+            with timings.phase("parse"):
+                time.sleep(0.02)
+        self.assertGreaterEqual(timings.seconds["parse"], 0.02)
+        self.assertLess(timings.seconds["transfer"], 0.035)
+        self.assertAlmostEqual(timings.overhead, timings.seconds["parse"])
+
+    def test_results_carry_timings_and_are_exported(self):
+        received = []
+        textfile = self.dir / "azpype.prom"
+        prometheus = PrometheusTextfileExporter(textfile)
+        metrics.register_exporter(received.append)
+        metrics.register_exporter(prometheus)
+        try:
+            for stream in (False, True):
+                result = Copy(str(self.dir), DESTINATION).execute(stream=stream)
+                self.assertTrue({"config", "render", "transfer", "parse", "logging"} <= set(result.timings.seconds))
+                self.assertEqual(result.bytes_per_second, 100.0)
+                self.assertEqual(result.files_per_second, 2.0)
+        finally:
+            metrics.unregister_exporter(received.append)
+            metrics.unregister_exporter(prometheus)
+
+        self.assertIn("spawn", result.timings.seconds)
+        self.assertEqual(len(received), 2)
+        self.assertEqual(received[0].as_dict()["bytes_transferred"], 3000)
+        exported = textfile.read_text()
+        self.assertIn('azpype_bytes_per_second{command="copy"} 100.0', exported)
+        self.assertIn('azpype_phase_seconds{command="copy",phase="transfer"}', exported)
+
+    def test_exporter_errors_do_not_fail_the_copy(self):
+        def broken(_):
+            raise RuntimeError("collector down")
+
+        metrics.register_exporter(broken)
+        try:
+            with patch.object(BaseCommand, "show_config", False):
+                result = Copy(str(self.dir), DESTINATION).execute()
+        finally:
+            metrics.unregister_exporter(broken)
+        self.assertEqual(result.exit_code, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import sys
+sys.path.append('../')
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from azpype import packing
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.copy import Copy
+from azpype.packing import PackManifest, pack_directory, unpack_directory
+from tests.helpers import use_temporary_run_index
+
+DESTINATION = "https://account.blob.core.windows.net/archive/"
+
+
+class TestPacking(unittest.TestCase):
+    def setUp(self):
+        use_temporary_run_index(self)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.source = self.dir / "src"
+        self.files = {f"d{i % 3}/file-{i:03d}.txt": os.urandom(700 + i) for i in range(40)}
+        self.files["empty.txt"] = b""
+        for name, content in self.files.items():
+            path = self.source / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_member_reads(self):
+        for archive_format in packing.ARCHIVE_FORMATS:
+            with self.subTest(archive_format=archive_format):
+                staging = self.dir / f"staging-{archive_format}"
+                # A tiny target size forces several archives
+                manifest = pack_directory(str(self.source), str(staging), archive_mb=0.01, archive_format=archive_format)
+                self.assertGreater(len(manifest.archives), 1)
+                self.assertEqual(manifest.member_count, len(self.files))
+
+                loaded = PackManifest.load(staging)
+                for name in ("d0/file-000.txt", "d2/file-038.txt", "empty.txt"):
+                    self.assertEqual(loaded.read_member(name), self.files[name])
+                with self.assertRaises(KeyError):
+                    loaded.locate("missing.txt")
+
+                target = self.dir / f"out-{archive_format}"
+                self.assertEqual(unpack_directory(str(staging), str(target)), len(self.files))
+                for name, content in self.files.items():
+                    self.assertEqual((target / name).read_bytes(), content)
+
+    def test_remote_member_read_uses_byte_range(self):
+        staging = self.dir / "staging"
+        pack_directory(str(self.source), str(staging))
+        requests = []
+
+        def fake_get(url, sas_token=None, byte_range=None):
+            requests.append((url, sas_token, byte_range))
+            name = url.rsplit("/", 1)[1]
+            data = (staging / name).read_bytes()
+            return data if byte_range is None else data[byte_range[0]:byte_range[1] + 1]
+
+        with patch.object(packing, "_http_get", side_effect=fake_get):
+            manifest = PackManifest.load(DESTINATION + "?sv=1", sas_token="sv=1")
+            content = manifest.read_member("d1/file-004.txt")
+        self.assertEqual(content, self.files["d1/file-004.txt"])
+        self.assertEqual(requests[0][0], DESTINATION + packing.MANIFEST_NAME)
+        url, sas_token, byte_range = requests[-1]
+        self.assertEqual((url, sas_token), (DESTINATION + "pack-00000.tar", "sv=1"))
+        self.assertEqual(byte_range[1] - byte_range[0] + 1, len(content))
+
+    @patch("azpype.commands.base_command.run_prechecks", return_value={})
+    @patch.object(BaseCommand, "show_config", False)
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_execute_packed_uploads_archives(self, mock_execute, _):
+        uploaded = []
+
+        def fake_execute(command, args, options):
+            uploaded.extend(sorted(os.listdir(os.path.dirname(args[0]))))
+            return 0, "Final Job Status: Completed"
+
+        mock_execute.side_effect = fake_execute
+        result, manifest = Copy(str(self.source), DESTINATION).execute_packed()
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(uploaded, [packing.MANIFEST_NAME, "pack-00000.tar", "pack-00000.tar.index.json"])
+        self.assertEqual(mock_execute.call_args.args[1][0].rsplit(os.sep, 1)[1], "*")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+sys.path.append('../')
+import io
+import os
+import unittest
+from unittest.mock import Mock, patch
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.copy import Copy
+from azpype.commands.pipe import iter_chunks
+from azpype.sinks import QuietSink
+from tests.helpers import install_fake_azcopy, start_patches, use_temporary_run_index
+
+BLOB = "https://account.blob.core.windows.net/container/data.bin"
+
+# Stands in for azcopy: PipeBlob stores stdin in $PIPE_STORE, BlobPipe writes it back
+FAKE_AZCOPY = """#!/bin/sh
+case "$*" in
+  *PipeBlob*) cat > "$PIPE_STORE"; echo "Final Job Status: Completed";;
+  *BlobPipe*)
+    if [ ! -f "$PIPE_STORE" ]; then echo "RESPONSE 404: BlobNotFound" >&2; exit 1; fi
+    exec cat "$PIPE_STORE";;
+esac
+"""
+
+
+@unittest.skipIf(os.name == "nt", "requires a POSIX shell")
+class TestPipe(unittest.TestCase):
+    def setUp(self):
+        use_temporary_run_index(self)
+        self.store = str(install_fake_azcopy(self, FAKE_AZCOPY) / "blob")
+        start_patches(self,
+            patch.dict(os.environ, {"PIPE_STORE": self.store}),
+            patch("azpype.commands.base_command.run_prechecks", return_value={}),
+            patch.object(BaseCommand, "show_config", False),
+        )
+
+    def test_round_trip_in_chunks(self):
+        payload = os.urandom(10 * 1024 * 1024 + 7)
+        chunks = (payload[i:i + 1024 * 1024] for i in range(0, len(payload), 1024 * 1024))
+        result = Copy.from_stream(chunks, BLOB, sas_token="sv=1&sig=abc", output="quiet", recursive=True, block_size_mb=8)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.final_job_status, "Completed")
+        with open(self.store, "rb") as f:
+            self.assertEqual(f.read(), payload)
+
+        received = list(Copy.to_stream(BLOB, output="quiet", chunk_size=256 * 1024))
+        self.assertTrue(all(len(chunk) <= 256 * 1024 for chunk in received))
+        self.assertEqual(b"".join(received), payload)
+
+    def test_only_single_blob_flags_are_passed(self):
+        with patch("subprocess.Popen", side_effect=OSError("stop")) as mock_popen, self.assertRaises(OSError):
+            Copy.from_stream(b"abc", BLOB, output="quiet", recursive=True, overwrite="ifSourceNewer", put_md5=True)
+        command = mock_popen.call_args.args[0]
+        self.assertIn("--from-to=PipeBlob", command)
+        self.assertIn("--put-md5=true", command)
+        self.assertFalse(any(part.startswith(("--recursive", "--overwrite")) for part in command))
+
+    def test_failed_download_raises(self):
+        with self.assertRaisesRegex(Exception, "BlobNotFound"):
+            b"".join(Copy.to_stream(BLOB, output="quiet"))
+
+    def test_sink_runs_finish_on_errors_and_early_close(self):
+        sink = QuietSink()
+        sink.open = Mock()
+
+        def broken():
+            yield b"abc"
+            raise OSError("source went away")
+
+        with self.assertRaisesRegex(OSError, "source went away"):
+            Copy.from_stream(broken(), BLOB, output=sink)
+        self.assertEqual(sink.open.return_value.finish.call_count, 1)
+
+        with open(self.store, "wb") as f:
+            f.write(os.urandom(1024 * 1024))
+        chunks = Copy.to_stream(BLOB, output=sink, chunk_size=1024)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(sink.open.return_value.finish.call_count, 2)
+
+    def test_non_http_urls_are_rejected(self):
+        for url in ("ftp://account.blob.core.windows.net/container/data.bin", "/tmp/data.bin"):
+            with self.assertRaisesRegex(Exception, r"Failed checks: \['url'\]"):
+                Copy.from_stream(b"abc", url, output="quiet")
+
+    def test_iter_chunks_accepts_files_and_text(self):
+        self.assertEqual([bytes(c) for c in iter_chunks(b"abcde", 2)], [b"ab", b"cd", b"e"])
+        self.assertEqual(list(iter_chunks(io.BytesIO(b"abcde"), 3)), [b"abc", b"de"])
+        self.assertEqual(list(iter_chunks(["é", b"x"])), ["é".encode("utf-8"), b"x"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+sys.path.append('../')
+import socket
+import unittest
+from unittest.mock import Mock
+from azpype import prechecks
+from azpype.validators import validate_network_available, validate_azure_blob_url, validate_transfer_pair
+
+
+class TestPrechecks(unittest.TestCase):
+    def setUp(self):
+        self.logger = Mock()
+        self.saved_probes = dict(prechecks._probes)
+        prechecks.precheck_cache.invalidate()
+
+    def tearDown(self):
+        prechecks._probes.clear()
+        prechecks._probes.update(self.saved_probes)
+        prechecks.precheck_cache.invalidate()
+
+    def test_cache_honours_ttl(self):
+        cache = prechecks.PrecheckCache(ttl=60)
+        probe = Mock(return_value=True)
+        self.assertTrue(cache.get("network", probe))
+        self.assertTrue(cache.get("network", probe))
+        self.assertEqual(probe.call_count, 1)
+
+        cache.ttl = 0
+        cache.get("network", probe)
+        self.assertEqual(probe.call_count, 2)
+
+    def test_registered_probes_run_once(self):
+        prechecks._probes.clear()
+        probe = Mock(return_value=True)
+        prechecks.register_probe("endpoint", probe)
+        for _ in range(100):
+            self.assertEqual(prechecks.run_prechecks(self.logger), {"endpoint": True})
+        self.assertEqual(probe.call_count, 1)
+
+    def test_network_probe_against_local_listener(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen(1)
+            port = server.getsockname()[1]
+            self.assertTrue(prechecks.network_probe("127.0.0.1", port, timeout=1)(self.logger))
+        self.assertIsNone(socket.getdefaulttimeout())
+
+    def test_network_unavailable(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as unused:
+            unused.bind(("127.0.0.1", 0))
+            port = unused.getsockname()[1]
+        self.assertFalse(validate_network_available(self.logger, host="127.0.0.1", port=port, timeout=1))
+
+
+    def test_url_pairs_and_per_endpoint_sas(self):
+        blob = "https://account.blob.core.windows.net/container/dir"
+        self.assertTrue(validate_azure_blob_url(blob, self.logger, sas_token="sv=2022-11-02&se=2999-01-01T00:00:00Z&sig=abc"))
+        self.assertFalse(validate_azure_blob_url(blob, self.logger, sas_token="?sv=1&sig=abc"))
+        self.assertFalse(validate_azure_blob_url(blob + "?sv=1", self.logger))
+        self.assertFalse(validate_azure_blob_url(blob + "?sv=1&se=2001-01-01&sig=abc", self.logger))
+        self.assertFalse(validate_azure_blob_url(blob + "?sig=a", self.logger, sas_token="sig=b"))
+
+        other = "https://other.blob.core.windows.net/container/dir"
+        self.assertTrue(validate_transfer_pair(blob + "?sig=a", other + "?sig=b", self.logger))
+        self.assertFalse(validate_transfer_pair(blob + "?sig=a", blob + "/?sig=b", self.logger))
+        self.assertFalse(validate_transfer_pair("./a", "./b", self.logger))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+sys.path.append('../')
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.remove import AsyncRemove, Remove
+from azpype.resource_paths import _assets_root
+from azpype.retry import RetryPolicy
+from tests.helpers import start_patches, use_temporary_run_index
+
+TARGET = "https://account.blob.core.windows.net/container/logs"
+# A profile written for uploads, with flags that azcopy remove and azcopy list reject
+COPY_TUNED_PROFILE = """
+copy-tuned:
+  flags:
+    block-size-mb: 8
+    put-md5: true
+    log-level: 'ERROR'
+"""
+
+
+class TestRemove(unittest.TestCase):
+    def setUp(self):
+        use_temporary_run_index(self)
+        start_patches(self,
+            patch("azpype.commands.base_command.run_prechecks", return_value={}),
+            patch.object(BaseCommand, "show_config", False),
+        )
+
+    def make_remove(self, **options):
+        return Remove(TARGET, sas_token="sv=1&sig=abc", output="quiet", retry_policy=RetryPolicy(max_retries=1, initial_wait_time=0), **options)
+
+    def test_shipped_profiles_keep_transfer_flags_off_remove(self):
+        profiles = _assets_root() / "config_templates" / "profiles.yaml"
+        with patch("azpype.config.ensure_user_profiles", return_value=profiles):
+            remove = self.make_remove(profile="huge-blobs")
+        command = remove.build_command([remove.target], remove.options)
+        self.assertIn("--log-level=WARNING", command)
+        self.assertFalse(any(part.startswith("--block-size-mb") for part in command))
+
+    def test_copy_tuned_profile_leaves_remove_command_valid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiles = Path(tmp) / "profiles.yaml"
+            profiles.write_text(COPY_TUNED_PROFILE)
+            with patch("azpype.config.ensure_user_profiles", return_value=profiles):
+                remove = self.make_remove(profile="copy-tuned", recursive=True)
+        command = remove.build_command([remove.target], remove.options)
+        self.assertIn("--log-level=ERROR", command)
+        self.assertIn("--recursive=true", command)
+        self.assertFalse(any(part.startswith(("--block-size-mb", "--put-md5")) for part in command))
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_paths_are_sent_as_list_of_files(self, mock_execute):
+        captured = {}
+
+        def fake_execute(command, args, options):
+            with open(options["list-of-files"]) as f:
+                captured["entries"] = f.read().splitlines()
+            captured["args"], captured["options"] = args, options
+            return 0, "Final Job Status: Completed"
+
+        mock_execute.side_effect = fake_execute
+        result = self.make_remove(recursive=True).execute(paths=(name for name in ["a.log", "b/c.log"]), include_pattern="*.log")
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(captured["entries"], ["a.log", "b/c.log"])
+        self.assertEqual(captured["args"], [TARGET + "?sv=1&sig=abc"])
+        self.assertEqual(captured["options"]["include-pattern"], "*.log")
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_failed_remove_is_resumed_with_source_sas(self, mock_execute):
+        mock_execute.side_effect = [
+            (1, "Job job-9 has started\nFinal Job Status: Failed"),
+            (0, "Job job-9 summary\nFinal Job Status: Completed"),
+        ]
+        result = self.make_remove(exclude_pattern="*.keep").execute()
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(mock_execute.call_args_list[0].args[2]["exclude-pattern"], "*.keep")
+        resume_call = mock_execute.call_args_list[1]
+        self.assertEqual(resume_call.args[1], ["resume", "job-9"])
+        self.assertEqual(resume_call.args[2], {"source-sas": "sv=1&sig=abc"})
+
+    @patch.object(BaseCommand, "execute_async", autospec=True)
+    def test_async_remove_is_resumed_like_remove(self, mock_execute_async):
+        outputs = iter([(1, "Job job-9 has started\nFinal Job Status: Failed"), (0, "Job job-9 summary\nFinal Job Status: Completed")])
+
+        async def fake_execute_async(command, args, options, on_output=None):
+            exit_code, stdout = next(outputs)
+            for line in stdout.splitlines():
+                on_output(line)
+            return exit_code, stdout
+
+        mock_execute_async.side_effect = fake_execute_async
+        remove = AsyncRemove(TARGET, sas_token="sv=1&sig=abc", output="quiet", retry_policy=RetryPolicy(max_retries=1, initial_wait_time=0))
+        result = asyncio.run(remove.execute())
+
+        self.assertEqual((result.exit_code, result.retries, result.job_id), (0, 1, "job-9"))
+        resume_call = mock_execute_async.call_args_list[1]
+        self.assertEqual(resume_call.args[0].command_name, "jobs")
+        self.assertEqual(resume_call.args[1:3], (["resume", "job-9"], {"source-sas": "sv=1&sig=abc"}))
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_no_paths_skips_azcopy(self, mock_execute):
+        result = self.make_remove().execute(paths=[])
+        self.assertEqual(result.exit_code, 0)
+        mock_execute.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
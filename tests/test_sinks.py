@@ -0,0 +1,86 @@
+import sys
+sys.path.append('../')
+import contextlib
+import io
+import os
+import unittest
+from unittest.mock import patch
+from azpype.commands.copy import Copy
+from azpype.sinks import FileSink, QuietSink, RichSink, SummarySink, TailSink, TeeSink, resolve_sink
+from tests.helpers import install_fake_azcopy, start_patches, use_temporary_run_index
+
+DESTINATION = "https://account.blob.core.windows.net/container/"
+FAKE_AZCOPY = """#!/bin/sh
+echo "Job job-1 has started"
+echo "Job job-1 summary"
+echo "Elapsed Time (Minutes): 0.5"
+echo "Number of File Transfers Completed: 60"
+echo "TotalBytesTransferred: 3000"
+echo "Final Job Status: Completed"
+"""
+
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        use_temporary_run_index(self)
+        self.dir = install_fake_azcopy(self, FAKE_AZCOPY)
+        start_patches(self, patch("azpype.commands.base_command.run_prechecks", return_value={}))
+
+    def _copy(self, output, stream=False):
+        shown = io.StringIO()
+        with contextlib.redirect_stdout(shown):
+            result = Copy(str(self.dir), DESTINATION, output=output).execute(stream=stream)
+        return result, shown.getvalue()
+
+    def test_quiet_sink_shows_nothing(self):
+        for stream in (False, True):
+            result, shown = self._copy('quiet', stream)
+            self.assertEqual(shown, '')
+            self.assertEqual(result.final_job_status, 'Completed')
+
+    def test_tail_sink_shows_only_last_lines(self):
+        for stream in (False, True):
+            _, shown = self._copy(TailSink(lines=2), stream)
+            self.assertIn("Final Job Status: Completed", shown)
+            self.assertIn("TotalBytesTransferred: 3000", shown)
+            self.assertNotIn("Elapsed Time", shown)
+
+    def test_summary_sink_shows_result_table(self):
+        _, shown = self._copy('summary')
+        self.assertIn("Transfer Summary", shown)
+        self.assertNotIn("Executing Command", shown)
+
+    def test_file_sink_writes_raw_output(self):
+        path = self.dir / "output.log"
+        for stream in (False, True):
+            _, shown = self._copy(TeeSink(QuietSink(), FileSink(path)), stream)
+            self.assertEqual(shown, '')
+        written = path.read_text()
+        self.assertEqual(written.count("Final Job Status: Completed\n"), 2)
+        self.assertTrue(written.startswith("Job job-1 has started\n"))
+
+    def test_file_sink_runs_do_not_block_each_other(self):
+        path = self.dir / "out.log"
+        sink = FileSink(path)
+        first, second = sink.open(None, [], {}), sink.open(None, [], {})
+        second.line("b")
+        second.finish(0)
+        first.line("a")
+        first.finish(1, "done\n")
+        # A run that is never finished does not hold up later ones
+        sink.open(None, [], {}).line("lost")
+        sink.open(None, [], {}).finish(0, "c\n")
+        self.assertEqual(path.read_text(), "b\na\ndone\nc\n")
+
+    def test_resolve_sink(self):
+        self.assertIsInstance(resolve_sink(), RichSink)
+        with patch.dict(os.environ, {"AZPYPE_OUTPUT": "summary"}):
+            self.assertIsInstance(resolve_sink(), SummarySink)
+        sink = TailSink()
+        self.assertIs(resolve_sink(sink), sink)
+        with self.assertRaises(ValueError):
+            resolve_sink('loud')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+sys.path.append('../')
+import json
+import unittest
+from azpype.commands.stdout_parser import AzCopyStdoutParser, AzCopyJsonParser
+
+
+TEXT_OUTPUT = """INFO: Scanning...
+Job 3c1ff5a0-3a4e-9a47-6f2e-1b2c3d4e5f60 has started
+Log file is located at: /home/user/.azpype/azcopy_logs/3c1ff5a0-3a4e-9a47-6f2e-1b2c3d4e5f60.log
+
+Job 3c1ff5a0-3a4e-9a47-6f2e-1b2c3d4e5f60 summary
+Elapsed Time (Minutes): 0.0334
+Number of File Transfers: 12
+Number of Folder Property Transfers: 0
+Number of Symlink Transfers: 0
+Total Number of Transfers: 12
+Number of File Transfers Completed: 10
+Number of Folder Transfers Completed: 0
+Number of File Transfers Failed: 1
+Number of Folder Transfers Failed: 0
+Number of File Transfers Skipped: 1
+Number of Folder Transfers Skipped: 0
+TotalBytesTransferred: 4096
+Final Job Status: CompletedWithErrors
+"""
+
+
+def _message(message_type, content, timestamp):
+    if isinstance(content, dict):
+        content = json.dumps(content)
+    return json.dumps({"TimeStamp": timestamp, "MessageType": message_type, "MessageContent": content})
+
+
+class TestAzCopyStdoutParser(unittest.TestCase):
+    def test_text_summary(self):
+        parsed = AzCopyStdoutParser(TEXT_OUTPUT)
+        self.assertEqual(parsed.job_id, "3c1ff5a0-3a4e-9a47-6f2e-1b2c3d4e5f60")
+        self.assertEqual(parsed.final_job_status, "CompletedWithErrors")
+        self.assertEqual(parsed.elapsed_time, 0.0334)
+        self.assertEqual(parsed.number_of_file_transfers_completed, 10)
+        self.assertEqual(parsed.number_of_file_transfers_failed, 1)
+        self.assertEqual(parsed.total_bytes_transferred, 4096)
+
+    def test_text_value_with_colon_is_not_truncated(self):
+        parsed = AzCopyStdoutParser("Final Job Status: Failed: see log")
+        self.assertEqual(parsed.final_job_status, "Failed: see log")
+
+
+class TestAzCopyJsonParser(unittest.TestCase):
+    def test_message_stream(self):
+        summary = {
+            "JobID": "job-1", "JobStatus": "InProgress", "TotalTransfers": "4",
+            "FileTransfers": "4", "TransfersCompleted": "2", "TransfersFailed": "0",
+            "TransfersSkipped": "0", "BytesOverWire": "1000000", "TotalBytesTransferred": "1000000",
+            "PercentComplete": "50",
+        }
+        lines = [
+            _message("Init", {"LogFileLocation": "/tmp/job-1.log", "JobID": "job-1"}, "2024-01-01T00:00:00.123456789Z"),
+            _message("Progress", summary, "2024-01-01T00:00:02Z"),
+            _message("Progress", {**summary, "BytesOverWire": "3000000", "PercentComplete": "75"}, "2024-01-01T00:00:04Z"),
+            _message("EndOfJob", {**summary, "JobStatus": "Completed", "TransfersCompleted": "4",
+                                  "TotalBytesTransferred": "4000000"}, "2024-01-01T00:01:00.123456789Z"),
+        ]
+        snapshots = []
+        parsed = AzCopyJsonParser()
+        for line in lines:
+            snapshot = parsed.feed(line)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+
+        self.assertEqual(len(snapshots), 2)
+        self.assertEqual(snapshots[1].percent_complete, 75.0)
+        self.assertAlmostEqual(snapshots[1].throughput_mbps, 8.0)
+        self.assertEqual(parsed.job_id, "job-1")
+        self.assertEqual(parsed.log_file_location, "/tmp/job-1.log")
+        self.assertEqual(parsed.final_job_status, "Completed")
+        self.assertEqual(parsed.number_of_file_transfers_completed, 4)
+        self.assertEqual(parsed.total_bytes_transferred, 4000000)
+        self.assertEqual(parsed.elapsed_time, 1.0)
+        self.assertFalse(hasattr(parsed, "__dict__"))
+
+    def test_error_message(self):
+        parsed = AzCopyJsonParser(_message("Error", "failed to perform copy command", "2024-01-01T00:00:00Z"))
+        self.assertEqual(parsed.errors, ["failed to perform copy command"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import sys
+sys.path.append('../')
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from azpype.commands.base_command import BaseCommand
+from azpype.commands.copy import Copy
+from azpype.commands.sync import Sync
+from azpype.retry import RetryPolicy
+from azpype.transfer_index import TransferIndex
+from tests.helpers import start_patches, use_temporary_run_index
+
+DESTINATION = "https://account.blob.core.windows.net/container/"
+COMPLETED = "Job job-1 summary\nFinal Job Status: Completed"
+
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        use_temporary_run_index(self)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = os.path.join(self.tmp.name, "src")
+        os.makedirs(self.source)
+        with open(os.path.join(self.source, "a.txt"), "w") as f:
+            f.write("a")
+        self.index = TransferIndex(os.path.join(self.tmp.name, "index.db"))
+        self.addCleanup(self.index.close)
+        start_patches(self,
+            patch("azpype.commands.base_command.run_prechecks", return_value={}),
+            patch.object(BaseCommand, "show_config", False),
+        )
+
+    def make_sync(self, **options):
+        return Sync(self.source, DESTINATION, retry_policy=RetryPolicy(max_retries=1, initial_wait_time=0), **options)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_flags_and_rerun_on_failure(self, mock_execute):
+        mock_execute.side_effect = [(1, "Job job-1 has started\nFinal Job Status: Failed"), (0, COMPLETED)]
+        sync = self.make_sync(delete_destination="true", compare_hash="MD5", mirror_mode=True)
+        result = sync.execute()
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.retries, 1)
+        second = mock_execute.call_args_list[1]
+        self.assertEqual(second.args[0].command_name, "sync")
+        self.assertEqual(second.args[1], [self.source, DESTINATION])
+        self.assertEqual(second.args[2]["delete-destination"], "true")
+        self.assertEqual(second.args[2]["compare-hash"], "MD5")
+        self.assertTrue(second.args[2]["mirror-mode"])
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_skip_unchanged(self, mock_execute):
+        mock_execute.return_value = (0, COMPLETED)
+        self.make_sync().execute(skip_unchanged=True, index=self.index)
+        result = self.make_sync().execute(skip_unchanged=True, index=self.index)
+        self.assertEqual(mock_execute.call_count, 1)
+        self.assertEqual(result.total_number_of_transfers, 0)
+
+        os.remove(os.path.join(self.source, "a.txt"))
+        self.make_sync().execute(skip_unchanged=True, index=self.index)
+        self.assertEqual(mock_execute.call_count, 1)
+        self.make_sync(delete_destination="true").execute(skip_unchanged=True, index=self.index)
+        self.assertEqual(mock_execute.call_count, 2)
+
+    @patch.object(BaseCommand, "execute", autospec=True)
+    def test_skip_unchanged_ignores_delta_copies(self, mock_execute):
+        mock_execute.return_value = (0, COMPLETED)
+        Copy(self.source, DESTINATION).execute_delta(index=self.index)
+        self.make_sync().execute(skip_unchanged=True, index=self.index)
+        self.assertEqual(mock_execute.call_count, 2)
+
+        # Nor does a sync make the next delta copy skip its files
+        self.index.forget(DESTINATION)
+        Copy(self.source, DESTINATION).execute_delta(index=self.index)
+        self.assertEqual(mock_execute.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
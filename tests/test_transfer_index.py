@@ -0,0 +1,67 @@
+import sys
+sys.path.append('../')
+import os
+import tempfile
+import unittest
+from azpype.transfer_index import TransferIndex, destination_key
+
+DESTINATION = "https://account.blob.core.windows.net/container/"
+
+
+class TestTransferIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "src")
+        os.makedirs(os.path.join(self.source, "sub"))
+        self.index = TransferIndex(os.path.join(self.tmp.name, "index.db"))
+        for name in ("a.txt", "sub/b.txt"):
+            self.write(name, "hello")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def write(self, name, content, mtime_ns=None):
+        path = os.path.join(self.source, name)
+        with open(path, "w") as f:
+            f.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def diff(self, use_hash=False):
+        return self.index.diff(self.source, DESTINATION + "?sv=1&sig=x", use_hash=use_hash)
+
+    def test_delta_lifecycle(self):
+        with self.diff() as delta:
+            self.assertEqual(list(delta.changed_paths()), ["a.txt", "sub/b.txt"])
+            delta.commit()
+        with self.diff() as delta:
+            self.assertEqual(delta.changed, 0)
+
+        self.write("a.txt", "hello world")
+        self.write("c.txt", "new")
+        os.remove(os.path.join(self.source, "sub", "b.txt"))
+        with self.diff() as delta:
+            self.assertEqual(list(delta.changed_paths()), ["a.txt", "c.txt"])
+            self.assertEqual(list(delta.deleted_paths()), ["sub/b.txt"])
+            delta.commit(include_deleted=True)
+        with self.diff() as delta:
+            self.assertEqual((delta.changed, delta.deleted), (0, 0))
+
+    def test_hash_skips_touched_but_identical_files(self):
+        with self.diff(use_hash=True) as delta:
+            delta.commit()
+        self.write("a.txt", "hello", mtime_ns=10 ** 18)
+        self.write("sub/b.txt", "jello", mtime_ns=10 ** 18)
+        with self.diff(use_hash=True) as delta:
+            self.assertEqual(list(delta.changed_paths()), ["sub/b.txt"])
+            delta.commit()
+        with self.diff() as delta:
+            self.assertEqual(delta.changed, 0)
+
+    def test_destination_key_ignores_sas(self):
+        self.assertEqual(destination_key(DESTINATION + "?sig=1"), destination_key(DESTINATION))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+sys.path.append('../')
+import unittest
+from unittest.mock import patch
+from azpype import config
+from azpype.commands.base_command import BaseCommand
+from azpype.tuner import WorkloadProfile, recommend, tune, MIB, GIB
+from tests.helpers import install_fake_azcopy, start_patches
+
+# Stand-in for azcopy whose bench throughput peaks at a concurrency of 128
+FAKE_AZCOPY = """#!{python}
+import os, sys
+args = dict(a[2:].split('=', 1) for a in sys.argv[2:] if a.startswith('--'))
+units = {{'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}}
+size = args['size-per-file']
+total = int(size[:-1]) * units[size[-1].upper()] * int(args['file-count'])
+concurrency = int(os.environ['AZCOPY_CONCURRENCY_VALUE'])
+mbps = max(10.0, 1000.0 - 4 * abs(concurrency - 128))
+print("Job bench-1 has started")
+print("Job bench-1 summary")
+print("Elapsed Time (Minutes): %r" % (total * 8 / 1e6 / mbps / 60))
+print("TotalBytesTransferred: %d" % total)
+print("Final Job Status: Completed")
+"""
+
+
+class TestTuner(unittest.TestCase):
+    def setUp(self):
+        self.dir = install_fake_azcopy(self, FAKE_AZCOPY.format(python=sys.executable))
+        self.source = self.dir / "src"
+        self.source.mkdir()
+        for i in range(4):
+            (self.source / f"{i}.bin").write_bytes(b"x" * 2048)
+        self.profiles = self.dir / "profiles.yaml"
+        self.profiles.write_text("# tuned profiles\n")
+        start_patches(self,
+            patch("azpype.commands.bench.check_path_or_url", return_value=True),
+            patch("azpype.config.ensure_user_profiles", return_value=self.profiles),
+            patch.object(BaseCommand, "show_config", False),
+        )
+        config.clear_config_cache()
+        self.addCleanup(config.clear_config_cache)
+
+    def test_recommend(self):
+        small = recommend(WorkloadProfile([4096] * 10), cpus=8, memory_gb=32)
+        self.assertEqual(small["concurrency"], 256)
+        self.assertEqual(small["block_size_mb"], 8)
+        huge = recommend(WorkloadProfile([8 * GIB, 10 * GIB, 6000 * GIB]), cpus=8, memory_gb=32)
+        self.assertEqual(huge["concurrency"], 128)
+        # 6000 GiB in at most 50000 blocks needs blocks of at least 123 MiB
+        self.assertEqual(huge["block_size_mb"], 123)
+        self.assertLessEqual(huge["buffer_gb"], 16)
+
+    def test_tune_against_fake_azcopy(self):
+        result = tune(str(self.source), "https://account.blob.core.windows.net/bench",
+                      candidates=[32, 128, 512], profile_name="tuned")
+        self.assertEqual(result.settings["concurrency"], 128)
+        self.assertEqual([m.concurrency for m in result.measurements], [32, 128, 512])
+        self.assertTrue(all(m.succeeded for m in result.measurements))
+
+        self.assertTrue(self.profiles.read_text().startswith("# tuned profiles\n"))
+        profile = config.load_profile("tuned")
+        self.assertEqual(profile.env["AZCOPY_CONCURRENCY_VALUE"], "128")
+        self.assertEqual(profile.flags_for("copy")["block-size-mb"], result.settings["block_size_mb"])
+        self.assertEqual(profile.flags_for("sync")["block-size-mb"], result.settings["block_size_mb"])
+        self.assertNotIn("block-size-mb", profile.flags_for("remove"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+sys.path.append('../')
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from watchdog.events import FileCreatedEvent, FileModifiedEvent, DirCreatedEvent
+from azpype.commands.watch import ChangeBatcher, watch_directory
+
+
+class TestChangeBatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "sub"))
+        self.batcher = ChangeBatcher(self.root)
+        self.stop = threading.Event()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def touch(self, relative):
+        path = os.path.join(self.root, relative)
+        with open(path, "w") as f:
+            f.write("x")
+        return path
+
+    def test_events_are_deduplicated_and_debounced(self):
+        a = self.touch("a.txt")
+        b = self.touch("sub/b.txt")
+        self.batcher.on_created(FileCreatedEvent(a))
+        self.batcher.on_modified(FileModifiedEvent(a))
+        self.batcher.on_created(FileCreatedEvent(b))
+        self.batcher.on_created(DirCreatedEvent(os.path.join(self.root, "sub")))
+
+        started = time.monotonic()
+        batch = self.batcher.next_batch(debounce=0.2, max_latency=10, max_batch=100, stop_event=self.stop)
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+        self.assertEqual(batch, ["a.txt", "sub/b.txt"])
+        self.assertEqual(self.batcher.pending, 0)
+
+    def test_max_batch_and_deleted_files(self):
+        paths = [self.touch(f"f{i}.txt") for i in range(5)]
+        for path in paths:
+            self.batcher.on_created(FileCreatedEvent(path))
+        os.remove(paths[0])
+        batch = self.batcher.next_batch(debounce=30, max_latency=30, max_batch=3, stop_event=self.stop)
+        self.assertEqual(batch, ["f1.txt", "f2.txt"])
+        self.assertEqual(self.batcher.pending, 2)
+
+    def test_watch_directory_flushes_on_stop(self):
+        sent = []
+        self.stop.set()
+        original = ChangeBatcher.__init__
+
+        def seeded(batcher, root):
+            original(batcher, root)
+            batcher.on_created(FileCreatedEvent(self.touch("late.txt")))
+
+        with patch.object(ChangeBatcher, "__init__", seeded):
+            count = watch_directory(self.root, sent.append, debounce=30, polling=True, stop_event=self.stop)
+        self.assertEqual(count, 1)
+        self.assertEqual(sent, [["late.txt"]])
+
+    def test_failed_batches_are_sent_again(self):
+        sent = []
+        original = ChangeBatcher.__init__
+        path = self.touch("a.txt")
+
+        def seeded(batcher, root):
+            original(batcher, root)
+            batcher.on_created(FileCreatedEvent(path))
+
+        def send(paths):
+            sent.append(paths)
+            if len(sent) == 1:
+                return False
+            self.stop.set()
+            return True
+
+        with patch.object(ChangeBatcher, "__init__", seeded):
+            count = watch_directory(self.root, send, debounce=0.05, polling=True, stop_event=self.stop)
+        self.assertEqual(count, 1)
+        self.assertEqual(sent, [["a.txt"], ["a.txt"]])
+
+        # A batch failing while stopping is not dropped silently
+        with patch.object(ChangeBatcher, "__init__", seeded), self.assertRaisesRegex(Exception, "a.txt"):
+            watch_directory(self.root, lambda paths: False, debounce=30, polling=True, stop_event=self.stop)
+
+
+if __name__ == "__main__":
+    unittest.main()